@@ -5,6 +5,7 @@ from flask import Flask, jsonify, send_from_directory
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from pymongo import MongoClient
+import atexit
 import os
 from dotenv import load_dotenv
 
@@ -16,12 +17,37 @@ from modelos.usuario import RepositorioUsuario
 from modelos.juego import RepositorioJuego
 from modelos.cliente import RepositorioCliente
 from modelos.registro_trabajo import RepositorioRegistroTrabajo
+from modelos.pago import RepositorioPago
+from modelos.tarea import RepositorioTarea
+from modelos.revocacion import RepositorioRevocacion
+from modelos.limite_login import RepositorioLimiteLogin
 
 # Importar rutas
 from rutas.autenticacion_rutas import crear_rutas_autenticacion
 from rutas.usuario_rutas import crear_rutas_usuarios
 from rutas.juego_rutas import crear_rutas_juegos
 from rutas.trabajo_rutas import crear_rutas_trabajos
+from rutas.reporte_rutas import crear_rutas_reportes
+from rutas.pago_rutas import crear_rutas_pagos
+from rutas.tarea_rutas import crear_rutas_tareas
+from rutas.metrica_rutas import crear_rutas_metricas
+from rutas.panel_rutas import crear_rutas_panel
+from rutas.lote_rutas import crear_rutas_lote
+
+# Importar servicios
+from servicios.acumulador import AcumuladorIncrementos
+from servicios.bitacora import configurar_bitacora
+from servicios.cache import CacheTTL
+from servicios.cache_tokens import CacheTokensVerificados
+from servicios.revocaciones import IndiceRevocaciones
+from servicios.limitador_login import AlmacenMemoria, LimitadorLogin
+from servicios.catalogo import CatalogoJuegos
+from servicios.contrasenas import EjecutorContrasenas, ServicioSaturado
+from servicios.paralelo import ConsultasParalelas
+from servicios.planificador import PlanificadorAsignacion
+from servicios.tareas import EjecutorTareas
+from servicios.archivo import ArchivadorTrabajos, TIPO_ARCHIVAR_TRABAJOS
+from servicios.eliminacion_usuarios import EliminadorUsuarios, TIPO_ELIMINAR_USUARIO
 
 load_dotenv()
 
@@ -35,27 +61,134 @@ def crear_app():
     app = Flask(__name__)
     app.config.from_object(config)
     
+    # Logs en JSON escritos desde un hilo de fondo
+    configurar_bitacora(app, config.LOG_NIVEL, config.LOG_MUESTREO)
+    
     # Configurar CORS
     CORS(app, resources={r"/api/*": {"origins": config.CORS_ORIGINS}})
     
     # Configurar JWT
     jwt = JWTManager(app)
     
+    # Tokens ya verificados, para no decodificar el JWT en cada petición
+    cache_tokens = CacheTokensVerificados(config.TOKENS_CACHE_MAX_ENTRADAS)
+    app.extensions['cache_tokens'] = cache_tokens
+    
     # Conectar a MongoDB
     cliente_mongo = MongoClient(config.MONGO_URI)
     db = cliente_mongo[config.MONGO_DB_NAME]
     
+    # Estadísticas de usuarios: TTL corto porque cada worker solo invalida sus escrituras
+    cache_estadisticas_usuarios = CacheTTL(max_entradas=8, ttl_segundos=config.USUARIOS_ESTADISTICAS_TTL)
+    # Series de reportes: cada escritura de trabajos las invalida en su worker; el TTL acota las demás
+    cache_reportes = CacheTTL(ttl_segundos=config.REPORTES_CACHE_TTL)
+    
     # Crear repositorios
-    repo_usuario = RepositorioUsuario(db)
+    repo_usuario = RepositorioUsuario(db, cache_estadisticas_usuarios)
+    repo_usuario.crear_indices()
     repo_juego = RepositorioJuego(db)
     repo_cliente = RepositorioCliente(db)
-    repo_trabajo = RepositorioRegistroTrabajo(db)
+    repo_cliente.crear_indices()
+    repo_trabajo = RepositorioRegistroTrabajo(db, cache_reportes)
+    repo_trabajo.crear_indices()
+    repo_pago = RepositorioPago(db, config.MONGO_TRANSACCIONES)
+    repo_pago.crear_indices()
+    repo_tarea = RepositorioTarea(db)
+    repo_tarea.crear_indices()
+    repo_revocacion = RepositorioRevocacion(db, config.JWT_ACCESS_TOKEN_EXPIRES)
+    repo_revocacion.crear_indices()
+    
+    # Usuarios revocados en memoria: token_requerido no consulta la base de datos
+    revocaciones = IndiceRevocaciones(repo_revocacion, config.REVOCACIONES_INTERVALO_MS)
+    revocaciones.iniciar()
+    atexit.register(revocaciones.detener)
+    app.extensions['revocaciones'] = revocaciones
+    
+    # Catálogo de juegos compartido
+    catalogo = CatalogoJuegos(
+        repo_juego, config.CATALOGO_RECARGA_SEGUNDOS, config.CATALOGO_RECARGA_POR_FALLO_SEGUNDOS
+    )
+    
+    # Contadores de clientes con escritura diferida; lo pendiente se escribe al apagar
+    contadores_cliente = AcumuladorIncrementos(
+        repo_cliente.incrementar_lote, config.CONTADORES_INTERVALO_MS, config.CONTADORES_MAXIMO_ENTRADAS
+    )
+    contadores_cliente.iniciar()
+    atexit.register(contadores_cliente.detener)
+    
+    # bcrypt en su propio pool acotado, para que una ráfaga de logins no ocupe todos los workers
+    ejecutor_contrasenas = EjecutorContrasenas(
+        config.BCRYPT_MAX_HILOS, config.BCRYPT_MAX_EN_COLA, config.BCRYPT_RONDAS
+    )
+    
+    # Límite de intentos de login; el almacén en mongo lo comparte entre workers
+    if config.LOGIN_LIMITE_ALMACEN == 'mongo':
+        almacen_login = RepositorioLimiteLogin(db)
+        almacen_login.crear_indices()
+    else:
+        almacen_login = AlmacenMemoria()
+    limitador_login = LimitadorLogin(
+        almacen_login,
+        ip_capacidad=config.LOGIN_IP_CAPACIDAD,
+        ip_recarga_por_minuto=config.LOGIN_IP_RECARGA_POR_MINUTO,
+        usuario_capacidad=config.LOGIN_USUARIO_CAPACIDAD,
+        usuario_recarga_por_minuto=config.LOGIN_USUARIO_RECARGA_POR_MINUTO,
+        fallos_libres=config.LOGIN_FALLOS_LIBRES,
+        espera_maxima_segundos=config.LOGIN_ESPERA_MAXIMA_SEGUNDOS
+    )
+    
+    # Pool para las consultas concurrentes de los paneles
+    consultas_panel = ConsultasParalelas(config.PANEL_MAX_HILOS)
+    # Pool propio para los lotes: una sub-petición puede ser un panel que usa el suyo
+    consultas_lote = ConsultasParalelas(config.LOTE_MAX_HILOS)
+    
+    # Tareas largas en segundo plano
+    ejecutor_tareas = EjecutorTareas(repo_tarea)
+    ejecutor_tareas.registrar(
+        TIPO_ARCHIVAR_TRABAJOS, ArchivadorTrabajos(repo_trabajo, config.ARCHIVO_TAMANO_LOTE)
+    )
+    ejecutor_tareas.registrar(TIPO_ELIMINAR_USUARIO, EliminadorUsuarios(
+        repo_usuario, repo_trabajo, repo_cliente, repo_pago,
+        config.USUARIOS_ELIMINACION_TAMANO_LOTE, config.USUARIOS_ELIMINACION_PAUSA_MS
+    ))
     
     # Registrar blueprints de rutas
-    app.register_blueprint(crear_rutas_autenticacion(repo_usuario))
-    app.register_blueprint(crear_rutas_usuarios(repo_usuario))
-    app.register_blueprint(crear_rutas_juegos(repo_juego))
-    app.register_blueprint(crear_rutas_trabajos(repo_trabajo, repo_cliente))
+    app.register_blueprint(crear_rutas_autenticacion(repo_usuario, ejecutor_contrasenas, limitador_login))
+    app.register_blueprint(crear_rutas_usuarios(
+        repo_usuario, ejecutor_contrasenas, repo_cliente, config.USUARIOS_IMPORTACION_MAXIMO, ejecutor_tareas
+    ))
+    app.register_blueprint(crear_rutas_juegos(repo_juego, catalogo))
+    app.register_blueprint(crear_rutas_trabajos(
+        repo_trabajo, repo_cliente, repo_pago, repo_usuario,
+        config.RECLAMO_DURACION_MINUTOS, repo_juego, catalogo, contadores_cliente
+    ))
+    app.register_blueprint(crear_rutas_reportes(repo_trabajo, cache_reportes))
+    app.register_blueprint(crear_rutas_pagos(repo_pago))
+    app.register_blueprint(crear_rutas_tareas(repo_tarea, ejecutor_tareas, config.ARCHIVO_ANTIGUEDAD_DIAS))
+    app.register_blueprint(crear_rutas_panel(
+        repo_trabajo, repo_usuario, consultas_panel, repo_cliente,
+        config.PANEL_LIMITE_HISTORIAL, repo_juego, config.PANEL_TAMANO_PAGINA
+    ))
+    app.register_blueprint(crear_rutas_lote(consultas_lote, config.LOTE_MAXIMO_PETICIONES))
+    app.register_blueprint(crear_rutas_metricas({
+        'contadores_cliente': contadores_cliente,
+        'cache_reportes': cache_reportes,
+        'cache_estadisticas_usuarios': cache_estadisticas_usuarios,
+        'contrasenas': ejecutor_contrasenas,
+        'cache_tokens': cache_tokens,
+        'revocaciones': revocaciones,
+        'limitador_login': limitador_login
+    }))
+    
+    # Retomar las tareas que quedaron a medias en un reinicio
+    ejecutor_tareas.reanudar_pendientes()
+    
+    # Asignación automática de trabajos en segundo plano
+    if config.PLANIFICADOR_ACTIVO:
+        planificador = PlanificadorAsignacion(
+            repo_trabajo, repo_usuario, config.PLANIFICADOR_INTERVALO_SEGUNDOS
+        )
+        planificador.iniciar()
     
     # Servir archivos estáticos del frontend
     @app.route('/')
@@ -84,6 +217,13 @@ def crear_app():
     def error_interno(error):
         return jsonify({'error': 'Error interno del servidor'}), 500
     
+    # Pool de contraseñas lleno: rechazar rápido para que el cliente reintente
+    @app.errorhandler(ServicioSaturado)
+    def servicio_saturado(error):
+        respuesta = jsonify({'error': str(error)})
+        respuesta.headers['Retry-After'] = str(error.reintentar_en)
+        return respuesta, 503
+    
     # Manejador de errores JWT
     @jwt.invalid_token_loader
     def token_invalido(error):
@@ -0,0 +1,135 @@
+"""
+ataque_login.py - Logins legítimos durante un ataque de fuerza bruta
+Ejecutar: python benchmarks/ataque_login.py [segundos] [rondas]
+
+Varios atacantes prueban contraseñas contra /api/auth/login desde sus IPs
+mientras un usuario legítimo entra desde otra. Se mide la latencia de los
+logins legítimos, cuántos intentos del ataque llegaron a bcrypt y cuántos
+recibieron 429, sin y con el limitador. Los usuarios viven en memoria, así
+que no necesita MongoDB.
+"""
+import sys
+import time
+import random
+import threading
+import statistics
+from pathlib import Path
+from bson.objectid import ObjectId
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from controladores.autenticacion_controlador import hash_contraseña
+from rutas.autenticacion_rutas import crear_rutas_autenticacion
+from servicios.contrasenas import EjecutorContrasenas
+from servicios.limitador_login import AlmacenMemoria, LimitadorLogin
+
+ATACANTES = 16
+# Pausa entre intentos de cada atacante: 16 atacantes a 5 intentos/s piden
+# más verificaciones bcrypt por segundo de las que el servidor puede hacer.
+# Sin pausa, los clientes de prueba (que corren en este mismo proceso) se
+# quedan con el GIL y la medición refleja al cliente, no al servidor.
+PAUSA_ATAQUE = 0.2
+USUARIOS_OBJETIVO = ['admin', 'legitimo', 'empleado1', 'cliente1']
+
+class UsuariosEnMemoria:
+    """Lo mínimo del repositorio de usuarios que usa el login"""
+    
+    def __init__(self, rondas):
+        hash_guardado = hash_contraseña('clave-correcta', rondas)
+        self.usuarios = {
+            nombre: {
+                '_id': ObjectId(),
+                'nombre_usuario': nombre,
+                'nombre_completo': nombre,
+                'rol': 'cliente',
+                'estado': 'activo',
+                'contraseña_hash': hash_guardado
+            }
+            for nombre in USUARIOS_OBJETIVO
+        }
+    
+    def obtener_por_nombre(self, nombre_usuario):
+        return self.usuarios.get(nombre_usuario)
+    
+    def reemplazar_hash_contraseña(self, usuario_id, hash_anterior, hash_nuevo):
+        return False
+
+def crear_app(rondas, con_limitador):
+    """App con solo las rutas de autenticación"""
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'clave-benchmark'
+    ejecutor = EjecutorContrasenas(max_hilos=4, max_en_cola=256, rondas=rondas)
+    limitador = LimitadorLogin(AlmacenMemoria()) if con_limitador else None
+    app.register_blueprint(crear_rutas_autenticacion(UsuariosEnMemoria(rondas), ejecutor, limitador))
+    return app, ejecutor, limitador
+
+def ataque(app, segundos, atacantes=ATACANTES):
+    """Ejecuta el ataque y los logins legítimos en paralelo"""
+    fin = time.time() + segundos
+    codigos_ataque = []
+    latencias_legitimas = []
+    codigos_legitimos = []
+    
+    def atacante(numero):
+        cliente = app.test_client()
+        ip = f'10.0.0.{numero}'
+        while time.time() < fin:
+            respuesta = cliente.post('/api/auth/login', json={
+                'nombre_usuario': random.choice(USUARIOS_OBJETIVO),
+                'contraseña': f'intento-{random.random()}'
+            }, environ_base={'REMOTE_ADDR': ip})
+            codigos_ataque.append(respuesta.status_code)
+            time.sleep(PAUSA_ATAQUE)
+    
+    def legitimo():
+        cliente = app.test_client()
+        while time.time() < fin:
+            inicio = time.perf_counter()
+            respuesta = cliente.post('/api/auth/login', json={
+                'nombre_usuario': 'legitimo',
+                'contraseña': 'clave-correcta'
+            }, environ_base={'REMOTE_ADDR': '192.168.1.10'})
+            latencias_legitimas.append((time.perf_counter() - inicio) * 1000)
+            codigos_legitimos.append(respuesta.status_code)
+            time.sleep(0.5)
+    
+    # El usuario legítimo ya había entrado antes desde su IP
+    app.test_client().post('/api/auth/login', json={
+        'nombre_usuario': 'legitimo',
+        'contraseña': 'clave-correcta'
+    }, environ_base={'REMOTE_ADDR': '192.168.1.10'})
+    
+    hilos = [threading.Thread(target=atacante, args=(i,)) for i in range(atacantes)]
+    hilos.append(threading.Thread(target=legitimo))
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    
+    return codigos_ataque, latencias_legitimas, codigos_legitimos
+
+def main():
+    segundos = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    rondas = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    
+    print("=" * 70)
+    print("    LOGIN LEGÍTIMO DURANTE UN ATAQUE DE FUERZA BRUTA")
+    print("=" * 70)
+    print(f"atacantes={ATACANTES}  segundos={segundos}  rondas={rondas}")
+    
+    escenarios = [('sin ataque', 0, False), ('sin limitador', ATACANTES, False), ('con limitador', ATACANTES, True)]
+    for nombre, atacantes, con_limitador in escenarios:
+        app, ejecutor, limitador = crear_app(rondas, con_limitador)
+        codigos_ataque, latencias, codigos_legitimos = ataque(app, segundos, atacantes)
+        
+        p95 = statistics.quantiles(latencias, n=20)[-1] if len(latencias) >= 2 else 0.0
+        print(f"\n{nombre}:")
+        print(f"  ataque:    {len(codigos_ataque)} intentos, "
+              f"{codigos_ataque.count(429)} rechazados (429), {ejecutor.completadas} verificaciones bcrypt")
+        print(f"  legítimo:  {codigos_legitimos.count(200)}/{len(codigos_legitimos)} logins correctos, "
+              f"mediana {statistics.median(latencias):.1f} ms, p95 {p95:.1f} ms")
+        if limitador:
+            print(f"  limitador: {limitador.estadisticas()}")
+
+if __name__ == '__main__':
+    main()
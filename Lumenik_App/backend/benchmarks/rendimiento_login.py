@@ -0,0 +1,91 @@
+"""
+rendimiento_login.py - Logins por segundo según el tamaño del pool de bcrypt
+Ejecutar: python benchmarks/rendimiento_login.py [rondas]
+
+Simula una ráfaga de logins (verificaciones bcrypt) desde muchos workers y
+mide el rendimiento, la latencia p95 y los rechazos (503) para cada tamaño
+de pool. También mide cuánto tarda una lectura barata durante la ráfaga, que
+es lo que el pool acotado protege. No necesita MongoDB.
+"""
+import sys
+import os
+import time
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from controladores.autenticacion_controlador import hash_contraseña
+from servicios.contrasenas import EjecutorContrasenas, ServicioSaturado
+
+WORKERS = 32
+LOGINS = 128
+
+def lectura_barata():
+    """Trabajo corto que representa una lectura del catálogo"""
+    return sum(range(2000))
+
+def rafaga(ejecutor, hash_guardado):
+    """Lanza LOGINS verificaciones desde WORKERS hilos y mide la ráfaga"""
+    latencias = []
+    rechazos = 0
+    
+    def login():
+        inicio = time.perf_counter()
+        try:
+            ejecutor.verificar('contraseña-de-prueba', hash_guardado)
+        except ServicioSaturado:
+            return None
+        return (time.perf_counter() - inicio) * 1000
+    
+    with ThreadPoolExecutor(max_workers=WORKERS) as workers:
+        inicio = time.perf_counter()
+        futuros = [workers.submit(login) for _ in range(LOGINS)]
+        
+        # Lecturas baratas mientras dura la ráfaga
+        lecturas = []
+        while not all(f.done() for f in futuros):
+            t = time.perf_counter()
+            lectura_barata()
+            lecturas.append((time.perf_counter() - t) * 1000)
+            time.sleep(0.005)
+        
+        duracion = time.perf_counter() - inicio
+    
+    for futuro in futuros:
+        resultado = futuro.result()
+        if resultado is None:
+            rechazos += 1
+        else:
+            latencias.append(resultado)
+    
+    p95 = statistics.quantiles(latencias, n=20)[-1] if len(latencias) >= 2 else 0.0
+    return {
+        'por_segundo': len(latencias) / duracion,
+        'p95_ms': p95,
+        'rechazos': rechazos,
+        'lectura_ms': statistics.mean(lecturas) if lecturas else 0.0
+    }
+
+def main():
+    rondas = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    hash_guardado = hash_contraseña('contraseña-de-prueba', rondas)
+    
+    print("=" * 70)
+    print("    RENDIMIENTO DE LOGIN SEGÚN EL POOL DE BCRYPT")
+    print("=" * 70)
+    print(f"rondas={rondas}  workers={WORKERS}  logins={LOGINS}  CPUs={os.cpu_count()}")
+    print(f"{'hilos':>6} {'cola':>6} {'logins/s':>10} {'p95 (ms)':>10} {'503':>6} {'lectura (ms)':>14}")
+    
+    for max_hilos in [1, 2, 4, 8]:
+        for max_en_cola in [LOGINS, 16]:
+            ejecutor = EjecutorContrasenas(max_hilos, max_en_cola, rondas)
+            r = rafaga(ejecutor, hash_guardado)
+            print(f"{max_hilos:>6} {max_en_cola:>6} {r['por_segundo']:>10.1f} {r['p95_ms']:>10.1f} "
+                  f"{r['rechazos']:>6} {r['lectura_ms']:>14.3f}")
+    
+    print("\nMás hilos que CPUs no sube los logins/s; solo alarga la cola de cada login.")
+    print("Una cola corta convierte la espera en 503 rápidos que el cliente puede reintentar.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+simulacion_planificador.py - Simulación del planificador de asignación
+Ejecutar: python benchmarks/simulacion_planificador.py
+
+Mide el costo de una pasada de planificar() y simula la cola de trabajos con
+llegadas de Poisson a distintas tasas para ver el tiempo de espera resultante.
+No necesita MongoDB.
+"""
+import sys
+import random
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from servicios.planificador import planificar
+
+CONSOLAS = ['PSP', 'PS2', 'PS3', 'PS4']
+PESO_PROMEDIO_GB = {'PSP': 1.5, 'PS2': 4.0, 'PS3': 45.0, 'PS4': 80.0}
+
+def generar_empleados(cantidad, semilla=7):
+    """Crea empleados con especialidades aleatorias (un tercio atiende todas)"""
+    aleatorio = random.Random(semilla)
+    empleados = []
+    for i in range(cantidad):
+        consolas = [] if i % 3 == 0 else aleatorio.sample(CONSOLAS, aleatorio.randint(1, 2))
+        empleados.append({'_id': f'emp{i}', 'consolas': consolas})
+    return empleados
+
+def generar_trabajo(indice, aleatorio, llegada=0.0):
+    """Crea un trabajo sintético"""
+    consola = aleatorio.choice(CONSOLAS)
+    return {
+        '_id': indice,
+        'consola': consola,
+        'gb_seleccion': aleatorio.uniform(0.5, 1.5) * PESO_PROMEDIO_GB[consola],
+        'llegada': llegada
+    }
+
+def medir_pasada(trabajos_en_cola, cantidad_empleados, repeticiones=5):
+    """Mide la duración de una pasada de planificar()"""
+    aleatorio = random.Random(1)
+    trabajos = [generar_trabajo(i, aleatorio) for i in range(trabajos_en_cola)]
+    empleados = generar_empleados(cantidad_empleados)
+    
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        planificar(trabajos, empleados, {})
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+def percentil(valores, p):
+    """Percentil simple (valores ordenados)"""
+    if not valores:
+        return 0.0
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+def simular(tasa_por_minuto, cantidad_empleados, minutos=480, intervalo_segundos=30,
+            gb_por_minuto=2.0, semilla=3):
+    """
+    Simula una jornada con llegadas de Poisson y pasadas periódicas del planificador
+    
+    Cada empleado atiende sus trabajos en orden; un trabajo tarda
+    gb_seleccion / gb_por_minuto más 5 minutos de preparación.
+    
+    Returns:
+        dict: Métricas de la simulación
+    """
+    aleatorio = random.Random(semilla)
+    empleados = generar_empleados(cantidad_empleados)
+    libre_desde = {e['_id']: 0.0 for e in empleados}
+    abiertos = {e['_id']: [] for e in empleados}  # (fin, gb)
+    
+    cola = []
+    esperas_asignacion = []
+    tiempos_totales = []
+    siguiente_llegada = aleatorio.expovariate(tasa_por_minuto)
+    indice = 0
+    paso = intervalo_segundos / 60.0
+    ahora = 0.0
+    
+    while ahora < minutos:
+        ahora += paso
+        
+        while siguiente_llegada <= ahora:
+            cola.append(generar_trabajo(indice, aleatorio, siguiente_llegada))
+            indice += 1
+            siguiente_llegada += aleatorio.expovariate(tasa_por_minuto)
+        
+        # Carga abierta de cada empleado en este instante
+        cargas = {}
+        for empleado_id, trabajos in abiertos.items():
+            trabajos[:] = [t for t in trabajos if t[0] > ahora]
+            cargas[empleado_id] = {'trabajos': len(trabajos), 'gb': sum(t[1] for t in trabajos)}
+        
+        asignaciones = planificar(cola, empleados, cargas)
+        asignados = set()
+        for trabajo, empleado_id in asignaciones:
+            inicio = max(ahora, libre_desde[empleado_id])
+            fin = inicio + trabajo['gb_seleccion'] / gb_por_minuto + 5
+            libre_desde[empleado_id] = fin
+            abiertos[empleado_id].append((fin, trabajo['gb_seleccion']))
+            esperas_asignacion.append(ahora - trabajo['llegada'])
+            tiempos_totales.append(fin - trabajo['llegada'])
+            asignados.add(trabajo['_id'])
+        cola = [t for t in cola if t['_id'] not in asignados]
+    
+    esperas_asignacion.sort()
+    tiempos_totales.sort()
+    completados = sum(1 for t in tiempos_totales if t <= minutos)
+    return {
+        'llegadas': indice,
+        'completados': completados,
+        'por_hora': completados / (minutos / 60),
+        'espera_asignacion_p50': percentil(esperas_asignacion, 0.5),
+        'espera_asignacion_p95': percentil(esperas_asignacion, 0.95),
+        'tiempo_total_p50': percentil(tiempos_totales, 0.5),
+        'tiempo_total_p95': percentil(tiempos_totales, 0.95)
+    }
+
+def main():
+    print("=" * 70)
+    print("    COSTO DE UNA PASADA DE planificar()")
+    print("=" * 70)
+    print(f"{'trabajos':>10} {'empleados':>10} {'ms/pasada':>12} {'trabajos/s':>14}")
+    for trabajos_en_cola, cantidad_empleados in [(100, 5), (1000, 20), (10000, 50), (50000, 200)]:
+        duracion = medir_pasada(trabajos_en_cola, cantidad_empleados)
+        print(f"{trabajos_en_cola:>10} {cantidad_empleados:>10} {duracion * 1000:>12.2f} "
+              f"{trabajos_en_cola / duracion:>14,.0f}")
+    
+    print("\n" + "=" * 70)
+    print("    JORNADA SIMULADA (8 h, pasadas cada 30 s, 10 empleados)")
+    print("=" * 70)
+    print(f"{'llegadas/min':>12} {'completados/h':>14} {'espera p50':>11} {'espera p95':>11} "
+          f"{'total p50':>10} {'total p95':>10}")
+    for tasa in [0.1, 0.2, 0.3, 0.4]:
+        r = simular(tasa, 10)
+        print(f"{tasa:>12.1f} {r['por_hora']:>14.1f} {r['espera_asignacion_p50']:>10.1f}m "
+              f"{r['espera_asignacion_p95']:>10.1f}m {r['tiempo_total_p50']:>9.1f}m {r['tiempo_total_p95']:>9.1f}m")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+sobrecarga_autenticacion.py - Costo de token_requerido con y sin la caché de tokens
+Ejecutar: python benchmarks/sobrecarga_autenticacion.py [peticiones]
+
+Monta una app Flask mínima con una ruta protegida por token_requerido y mide
+el tiempo por petición decodificando el JWT cada vez y usando la caché de
+tokens verificados. No necesita MongoDB.
+"""
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask, jsonify
+from controladores.autenticacion_controlador import generar_token_jwt, token_requerido
+from servicios.cache_tokens import CacheTokensVerificados
+
+def crear_app(con_cache):
+    """App mínima con una ruta protegida"""
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'clave-benchmark'
+    if con_cache:
+        app.extensions['cache_tokens'] = CacheTokensVerificados()
+    
+    @app.route('/protegida')
+    @token_requerido
+    def protegida():
+        return jsonify({'ok': True})
+    
+    return app
+
+def medir(app, token, peticiones):
+    """Microsegundos por petición a la ruta protegida"""
+    cliente = app.test_client()
+    cabeceras = {'Authorization': f'Bearer {token}'}
+    
+    cliente.get('/protegida', headers=cabeceras)  # Calentamiento
+    inicio = time.perf_counter()
+    for _ in range(peticiones):
+        respuesta = cliente.get('/protegida', headers=cabeceras)
+        assert respuesta.status_code == 200
+    duracion = time.perf_counter() - inicio
+    
+    return duracion / peticiones * 1_000_000
+
+def main():
+    peticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    
+    print("=" * 70)
+    print("    SOBRECARGA DE AUTENTICACIÓN POR PETICIÓN")
+    print("=" * 70)
+    print(f"peticiones={peticiones}")
+    
+    resultados = {}
+    for con_cache in [False, True]:
+        app = crear_app(con_cache)
+        with app.app_context():
+            token = generar_token_jwt('64b000000000000000000001', 'benchmark', 'cliente')
+        resultados[con_cache] = medir(app, token, peticiones)
+        
+        etiqueta = 'con caché' if con_cache else 'sin caché'
+        print(f"{etiqueta:>10}: {resultados[con_cache]:8.1f} µs/petición")
+        if con_cache:
+            print(f"            {app.extensions['cache_tokens'].estadisticas()}")
+    
+    ahorro = resultados[False] - resultados[True]
+    print(f"\nAhorro por petición: {ahorro:.1f} µs ({ahorro / resultados[False] * 100:.1f}%)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+sobrecarga_bitacora.py - Latencia que agrega la bitácora a cada petición
+Ejecutar: python benchmarks/sobrecarga_bitacora.py [peticiones]
+
+Mide una ruta protegida sin bitácora, con la bitácora de la aplicación (cola
+y hilo de fondo) y con los mismos filtros pero un StreamHandler síncrono que
+formatea y escribe en el hilo de la petición. Cada caso se mide con una
+salida rápida (/dev/null) y con una lenta, como un pipe cuyo lector se
+atrasa. No necesita MongoDB.
+"""
+import sys
+import os
+import time
+import logging
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask, jsonify
+from controladores.autenticacion_controlador import generar_token_jwt, token_requerido
+from servicios.bitacora import FormateadorJSON, FiltroContexto, QueueHandlerSinFormato, configurar_bitacora
+
+class SalidaLenta:
+    """Stream cuya escritura tarda, como stdout redirigido a un lector lento"""
+    
+    def __init__(self, demora_segundos=0.0002):
+        self.demora_segundos = demora_segundos
+    
+    def write(self, texto):
+        time.sleep(self.demora_segundos)
+    
+    def flush(self):
+        pass
+
+def crear_app():
+    """App mínima con una ruta protegida que escribe un log"""
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'clave-benchmark'
+    registro = logging.getLogger('benchmark')
+    
+    @app.route('/protegida')
+    @token_requerido
+    def protegida():
+        registro.info('Consulta protegida', extra={'cuerpo': {'contraseña': 'secreta', 'pagina': 1}})
+        return jsonify({'ok': True})
+    
+    return app
+
+def limpiar_raiz():
+    """Quita los manejadores de la raíz entre escenarios"""
+    raiz = logging.getLogger()
+    for manejador in list(raiz.handlers):
+        raiz.removeHandler(manejador)
+    raiz.setLevel(logging.WARNING)
+
+def medir(app, peticiones, rondas=5):
+    """Microsegundos por petición a la ruta protegida (la mejor de varias rondas, como timeit)"""
+    with app.app_context():
+        token = generar_token_jwt('64b000000000000000000001', 'benchmark', 'cliente')
+    cliente = app.test_client()
+    cabeceras = {'Authorization': f'Bearer {token}'}
+    
+    cliente.get('/protegida', headers=cabeceras)  # Calentamiento
+    tiempos = []
+    for _ in range(rondas):
+        inicio = time.perf_counter()
+        for _ in range(peticiones // rondas):
+            cliente.get('/protegida', headers=cabeceras)
+        tiempos.append((time.perf_counter() - inicio) / (peticiones // rondas) * 1_000_000)
+    return min(tiempos)
+
+def con_cola(destino, muestreo=1.0):
+    """Bitácora de la aplicación"""
+    limpiar_raiz()
+    app = crear_app()
+    return app, configurar_bitacora(app, 'INFO', muestreo, destino=destino)
+
+def sincrona(destino):
+    """Los mismos filtros y registros, pero formateados y escritos en el hilo de la petición"""
+    app, escucha = con_cola(destino)
+    escucha.stop()
+    raiz = logging.getLogger()
+    for manejador in [m for m in raiz.handlers if isinstance(m, QueueHandlerSinFormato)]:
+        raiz.removeHandler(manejador)
+    directo = logging.StreamHandler(destino)
+    directo.setFormatter(FormateadorJSON())
+    directo.addFilter(FiltroContexto())
+    raiz.addHandler(directo)
+    return app, None
+
+def main():
+    peticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    
+    print("=" * 70)
+    print("    SOBRECARGA DE LA BITÁCORA POR PETICIÓN")
+    print("=" * 70)
+    print(f"peticiones={peticiones}")
+    
+    limpiar_raiz()
+    base = medir(crear_app(), peticiones)
+    print(f"{'sin bitácora':>32}: {base:8.1f} µs/petición")
+    
+    destinos = [('/dev/null', open(os.devnull, 'w')), ('salida lenta', SalidaLenta())]
+    for nombre_destino, destino in destinos:
+        escenarios = [
+            ('síncrona', lambda: sincrona(destino)),
+            ('cola + hilo de fondo', lambda: con_cola(destino)),
+            ('cola, muestreo 10%', lambda: con_cola(destino, 0.1))
+        ]
+        for nombre, preparar in escenarios:
+            app, escucha = preparar()
+            micros = medir(app, peticiones)
+            if escucha:
+                escucha.stop()
+            etiqueta = f'{nombre} ({nombre_destino})'
+            print(f"{etiqueta:>32}: {micros:8.1f} µs/petición ({micros - base:+.1f})")
+    limpiar_raiz()
+
+if __name__ == '__main__':
+    main()
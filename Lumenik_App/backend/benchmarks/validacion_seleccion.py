@@ -0,0 +1,56 @@
+"""
+validacion_seleccion.py - Costo de validar una selección de juegos en el servidor
+Ejecutar: python benchmarks/validacion_seleccion.py
+
+Usa el catálogo en memoria con un repositorio falso, así que no necesita MongoDB.
+"""
+import sys
+import random
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bson.objectid import ObjectId
+from servicios.catalogo import CatalogoJuegos
+
+class RepositorioJuegoEnMemoria:
+    """Repositorio falso con un catálogo sintético de una sola consola"""
+    
+    def __init__(self, cantidad):
+        aleatorio = random.Random(5)
+        self.juegos = [
+            {'_id': ObjectId(), 'peso_gb': aleatorio.uniform(1, 80), 'consola': 'PS4', 'disponible': True}
+            for _ in range(cantidad)
+        ]
+    
+    def obtener_para_catalogo(self):
+        return self.juegos
+
+def medir(catalogo, seleccion, repeticiones=2000):
+    """Devuelve los microsegundos promedio por validación"""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        catalogo.evaluar_seleccion(seleccion, 'PS4', 100000)
+    return (time.perf_counter() - inicio) / repeticiones * 1e6
+
+def main():
+    print("=" * 60)
+    print("    VALIDACIÓN DE SELECCIÓN CON CATÁLOGO EN MEMORIA")
+    print("=" * 60)
+    print(f"{'catálogo':>10} {'selección':>10} {'carga (ms)':>12} {'µs/validación':>15}")
+    
+    for cantidad_catalogo in [500, 5000]:
+        repo = RepositorioJuegoEnMemoria(cantidad_catalogo)
+        catalogo = CatalogoJuegos(repo, recarga_segundos=None)
+        
+        inicio = time.perf_counter()
+        catalogo.recargar()
+        carga_ms = (time.perf_counter() - inicio) * 1000
+        
+        ids = [str(j['_id']) for j in repo.juegos]
+        for tamano in [10, 50, 200]:
+            seleccion = random.Random(tamano).sample(ids, tamano)
+            print(f"{cantidad_catalogo:>10} {tamano:>10} {carga_ms:>12.2f} {medir(catalogo, seleccion):>15.1f}")
+
+if __name__ == '__main__':
+    main()
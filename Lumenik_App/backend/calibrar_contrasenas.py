@@ -0,0 +1,40 @@
+"""
+calibrar_contrasenas.py - Elige el costo de bcrypt según la latencia objetivo en este equipo
+Ejecutar: python calibrar_contrasenas.py [latencia_objetivo_ms]
+
+Mide una verificación bcrypt con cada costo y recomienda el mayor que no
+supera la latencia objetivo (250 ms por defecto). El valor se configura en
+BCRYPT_RONDAS; los hashes existentes se actualizan solos en el siguiente
+login de cada usuario.
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from configuracion import obtener_config
+from servicios.politica_contrasenas import calibrar, COSTO_MINIMO
+
+def main():
+    objetivo_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 250.0
+    config = obtener_config()
+    
+    print("=" * 60)
+    print("    CALIBRACIÓN DEL COSTO DE BCRYPT")
+    print("=" * 60)
+    print(f"Latencia objetivo por verificación: {objetivo_ms:.0f} ms")
+    print(f"Costo actual (BCRYPT_RONDAS): {config.BCRYPT_RONDAS}")
+    print(f"\n{'costo':>6} {'ms/verificación':>16} {'logins/s por hilo':>18}")
+    
+    recomendado, mediciones = calibrar(objetivo_ms)
+    for costo, ms in mediciones:
+        marca = '  <- recomendado' if costo == recomendado else ''
+        print(f"{costo:>6} {ms:>16.1f} {1000 / ms:>18.1f}{marca}")
+    
+    if mediciones[0][1] > objetivo_ms:
+        print(f"\nNi el costo mínimo ({COSTO_MINIMO}) cumple el objetivo; se recomienda el mínimo.")
+    
+    print(f"\nConfigurar: BCRYPT_RONDAS={recomendado}")
+    print("Cada punto más de costo duplica el tiempo de login y la resistencia a fuerza bruta.")
+
+if __name__ == '__main__':
+    main()
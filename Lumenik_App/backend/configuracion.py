@@ -18,6 +18,9 @@ class Config:
     # MongoDB
     MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/lumenik_db')
     MONGO_DB_NAME = os.getenv('MONGO_DB_NAME', 'lumenik_db')
+    # Transacciones multi-documento (requieren un replica set); sin ellas un fallo entre
+    # el libro de pagos y el saldo se corrige con POST /api/pagos/recalcular-saldos
+    MONGO_TRANSACCIONES = os.getenv('MONGO_TRANSACCIONES', 'false').lower() == 'true'
     
     # JWT
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'lumenik-jwt-secret-key')
@@ -27,6 +30,74 @@ class Config:
     SERVIDOR_HOST = os.getenv('SERVIDOR_HOST', 'localhost')
     SERVIDOR_PUERTO = int(os.getenv('SERVIDOR_PUERTO', 5000))
     
+    # Reportes (segundos que se reutiliza la serie de un periodo cerrado si no hay escrituras)
+    REPORTES_CACHE_TTL = int(os.getenv('REPORTES_CACHE_TTL', 300))
+    
+    # Estadísticas de usuarios (segundos que se reutiliza el resultado si no hay escrituras)
+    USUARIOS_ESTADISTICAS_TTL = int(os.getenv('USUARIOS_ESTADISTICAS_TTL', 30))
+    
+    # Usuarios por importación en lote desde la API; los lotes mayores, con importar_usuarios.py
+    USUARIOS_IMPORTACION_MAXIMO = int(os.getenv('USUARIOS_IMPORTACION_MAXIMO', 500))
+    
+    # Borrado en segundo plano de los datos de un usuario (documentos por lote y pausa mínima entre lotes)
+    USUARIOS_ELIMINACION_TAMANO_LOTE = int(os.getenv('USUARIOS_ELIMINACION_TAMANO_LOTE', 500))
+    USUARIOS_ELIMINACION_PAUSA_MS = int(os.getenv('USUARIOS_ELIMINACION_PAUSA_MS', 100))
+    
+    # Cola de trabajos (minutos antes de que un trabajo reclamado vuelva a la cola)
+    RECLAMO_DURACION_MINUTOS = int(os.getenv('RECLAMO_DURACION_MINUTOS', 30))
+    
+    # Planificador de asignación automática
+    PLANIFICADOR_ACTIVO = os.getenv('PLANIFICADOR_ACTIVO', 'false').lower() == 'true'
+    PLANIFICADOR_INTERVALO_SEGUNDOS = int(os.getenv('PLANIFICADOR_INTERVALO_SEGUNDOS', 30))
+    
+    # Catálogo de juegos en memoria (segundos entre recargas completas)
+    CATALOGO_RECARGA_SEGUNDOS = int(os.getenv('CATALOGO_RECARGA_SEGUNDOS', 300))
+    # Antigüedad mínima del catálogo para recargarlo ante un juego desconocido o no disponible
+    CATALOGO_RECARGA_POR_FALLO_SEGUNDOS = int(os.getenv('CATALOGO_RECARGA_POR_FALLO_SEGUNDOS', 5))
+    
+    # Archivo de trabajos cerrados (antigüedad mínima y tamaño de lote)
+    ARCHIVO_ANTIGUEDAD_DIAS = int(os.getenv('ARCHIVO_ANTIGUEDAD_DIAS', 365))
+    ARCHIVO_TAMANO_LOTE = int(os.getenv('ARCHIVO_TAMANO_LOTE', 500))
+    
+    # Contadores de clientes con escritura diferida (ms máximos en memoria y clientes por lote)
+    CONTADORES_INTERVALO_MS = int(os.getenv('CONTADORES_INTERVALO_MS', 500))
+    CONTADORES_MAXIMO_ENTRADAS = int(os.getenv('CONTADORES_MAXIMO_ENTRADAS', 200))
+    
+    # Paneles (consultas concurrentes entre todas las peticiones, trabajos del historial
+    # del empleado y elementos por lista en el panel del administrador)
+    PANEL_MAX_HILOS = int(os.getenv('PANEL_MAX_HILOS', 8))
+    PANEL_LIMITE_HISTORIAL = int(os.getenv('PANEL_LIMITE_HISTORIAL', 20))
+    PANEL_TAMANO_PAGINA = int(os.getenv('PANEL_TAMANO_PAGINA', 25))
+    
+    # Lote de peticiones (sub-peticiones por lote y lecturas concurrentes entre todos los lotes)
+    LOTE_MAXIMO_PETICIONES = int(os.getenv('LOTE_MAXIMO_PETICIONES', 20))
+    LOTE_MAX_HILOS = int(os.getenv('LOTE_MAX_HILOS', 8))
+    
+    # Contraseñas (factor de trabajo de bcrypt, hilos dedicados y operaciones en espera
+    # antes de responder 503)
+    BCRYPT_RONDAS = int(os.getenv('BCRYPT_RONDAS', 12))
+    BCRYPT_MAX_HILOS = int(os.getenv('BCRYPT_MAX_HILOS', min(4, os.cpu_count() or 1)))
+    BCRYPT_MAX_EN_COLA = int(os.getenv('BCRYPT_MAX_EN_COLA', 32))
+    
+    # Límite de intentos de login (antes de buscar al usuario o calcular bcrypt)
+    LOGIN_LIMITE_ALMACEN = os.getenv('LOGIN_LIMITE_ALMACEN', 'memoria')  # memoria | mongo
+    LOGIN_IP_CAPACIDAD = int(os.getenv('LOGIN_IP_CAPACIDAD', 20))
+    LOGIN_IP_RECARGA_POR_MINUTO = float(os.getenv('LOGIN_IP_RECARGA_POR_MINUTO', 10))
+    LOGIN_USUARIO_CAPACIDAD = int(os.getenv('LOGIN_USUARIO_CAPACIDAD', 10))
+    LOGIN_USUARIO_RECARGA_POR_MINUTO = float(os.getenv('LOGIN_USUARIO_RECARGA_POR_MINUTO', 5))
+    LOGIN_FALLOS_LIBRES = int(os.getenv('LOGIN_FALLOS_LIBRES', 3))
+    LOGIN_ESPERA_MAXIMA_SEGUNDOS = int(os.getenv('LOGIN_ESPERA_MAXIMA_SEGUNDOS', 300))
+    
+    # Caché de tokens JWT verificados (tokens por worker)
+    TOKENS_CACHE_MAX_ENTRADAS = int(os.getenv('TOKENS_CACHE_MAX_ENTRADAS', 10000))
+    
+    # Cada cuánto trae cada worker las revocaciones registradas por los demás
+    REVOCACIONES_INTERVALO_MS = int(os.getenv('REVOCACIONES_INTERVALO_MS', 1000))
+    
+    # Bitácora: nivel mínimo y fracción de registros INFO/DEBUG que se escriben
+    LOG_NIVEL = os.getenv('LOG_NIVEL', 'INFO')
+    LOG_MUESTREO = float(os.getenv('LOG_MUESTREO', 1.0))
+    
     # CORS
     CORS_ORIGINS = ['http://localhost:5000', 'http://127.0.0.1:5000']
 
@@ -34,16 +105,21 @@ class DevelopmentConfig(Config):
     """Configuración de desarrollo"""
     DEBUG = True
     TESTING = False
+    LOG_NIVEL = os.getenv('LOG_NIVEL', 'DEBUG')
 
 class ProductionConfig(Config):
     """Configuración de producción"""
     DEBUG = False
     TESTING = False
+    # El registro de cada petición es INFO; WARNING y ERROR se escriben siempre
+    LOG_MUESTREO = float(os.getenv('LOG_MUESTREO', 0.1))
 
 class TestingConfig(Config):
     """Configuración de testing"""
     TESTING = True
     MONGO_URI = 'mongodb://localhost:27017/lumenik_test'
+    BCRYPT_RONDAS = 4
+    LOG_NIVEL = os.getenv('LOG_NIVEL', 'WARNING')
 
 # Seleccionar configuración según entorno
 config_actual = {
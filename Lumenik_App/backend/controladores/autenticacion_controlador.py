@@ -1,16 +1,21 @@
 """
 autenticacion_controlador.py - Controlador de Autenticación
 """
+import logging
 import bcrypt
 import jwt
 from datetime import datetime, timedelta
 from functools import wraps
 from flask import request, jsonify, current_app
-from modelos.usuario import RepositorioUsuario, Usuario
+from modelos.usuario import RepositorioUsuario, Usuario, ESTADO_ELIMINADO
+from servicios.lote import ENTORNO_USUARIO_VERIFICADO
+from servicios.politica_contrasenas import necesita_rehash
 
-def hash_contraseña(contraseña):
-    """Genera un hash de la contraseña"""
-    return bcrypt.hashpw(contraseña.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+logger = logging.getLogger(__name__)
+
+def hash_contraseña(contraseña, rondas=12):
+    """Genera un hash de la contraseña (rondas es el factor de trabajo de bcrypt)"""
+    return bcrypt.hashpw(contraseña.encode('utf-8'), bcrypt.gensalt(rondas)).decode('utf-8')
 
 def verificar_contraseña(contraseña, hash_contraseña):
     """Verifica si una contraseña coincide con su hash"""
@@ -29,42 +34,103 @@ def generar_token_jwt(usuario_id, nombre_usuario, rol):
     return token
 
 def verificar_token_jwt(token):
-    """Verifica y decodifica un token JWT"""
+    """Verifica y decodifica un token JWT (usa la caché de tokens verificados si existe)"""
+    cache_tokens = current_app.extensions.get('cache_tokens')
+    if cache_tokens:
+        payload = cache_tokens.obtener(token)
+        if payload is not None:
+            return payload
+    
     try:
         payload = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
+        if cache_tokens:
+            cache_tokens.guardar(token, payload)
         return payload
     except jwt.ExpiredSignatureError:
         return {'error': 'Token expirado'}
     except jwt.InvalidTokenError:
         return {'error': 'Token inválido'}
 
+def invalidar_tokens_usuario(usuario_id):
+    """Descarta de la caché los tokens verificados de un usuario"""
+    cache_tokens = current_app.extensions.get('cache_tokens')
+    if cache_tokens:
+        cache_tokens.invalidar_usuario(usuario_id)
+
+def revocar_tokens_usuario(usuario_id, revocado=True):
+    """
+    Registra la revocación de los tokens de un usuario y la aplica en este worker
+    
+    Args:
+        usuario_id (str): ID del usuario
+        revocado (bool): True al desactivar o eliminar, False al reactivar
+    """
+    revocaciones = current_app.extensions.get('revocaciones')
+    if revocaciones:
+        revocaciones.registrar(usuario_id, revocado)
+    invalidar_tokens_usuario(usuario_id)
+
+def token_revocado(payload):
+    """
+    Indica si un token verificado es de un usuario desactivado o eliminado,
+    o anterior a su último cambio de contraseña
+    
+    Args:
+        payload (dict): Payload del JWT
+    
+    Returns:
+        bool: True si el token ya no debe aceptarse
+    """
+    revocaciones = current_app.extensions.get('revocaciones')
+    return bool(revocaciones and revocaciones.token_revocado(payload))
+
+def invalidar_tokens_anteriores(usuario_id):
+    """
+    Invalida en todos los workers los tokens emitidos hasta ahora sin revocar al usuario
+    
+    Args:
+        usuario_id (str): ID del usuario
+    """
+    revocaciones = current_app.extensions.get('revocaciones')
+    if revocaciones:
+        revocaciones.invalidar_anteriores(usuario_id)
+    invalidar_tokens_usuario(usuario_id)
+
 def token_requerido(f):
     """Decorador para proteger rutas que requieren autenticación"""
     @wraps(f)
     def decorado(*args, **kwargs):
+        # Sub-petición de un lote: el token ya se verificó en la petición del lote
+        verificado = request.environ.get(ENTORNO_USUARIO_VERIFICADO)
+        if verificado:
+            request.usuario_actual = verificado
+            return f(*args, **kwargs)
+        
         token = None
         
         # Buscar token en headers
         if 'Authorization' in request.headers:
             auth_header = request.headers['Authorization']
-            print(f"[DEBUG] Authorization header: {auth_header}")
             try:
                 token = auth_header.split(" ")[1]
             except IndexError:
-                print("[ERROR] Token format inválido")
+                logger.info('Token rechazado', extra={'motivo': 'Formato de token inválido'})
                 return jsonify({'mensaje': 'Token inválido'}), 401
         
         if not token:
-            print("[ERROR] No token found")
             return jsonify({'mensaje': 'Token requerido'}), 401
         
         payload = verificar_token_jwt(token)
-        print(f"[DEBUG] Token payload: {payload}")
         
         if 'error' in payload:
-            print(f"[ERROR] Token error: {payload['error']}")
+            logger.info('Token rechazado', extra={'motivo': payload['error']})
             return jsonify({'mensaje': payload['error']}), 401
         
+        # Usuario desactivado o eliminado después de emitir el token
+        if token_revocado(payload):
+            logger.warning('Token revocado usado', extra={'usuario_id': payload.get('usuario_id')})
+            return jsonify({'mensaje': 'Token revocado'}), 401
+        
         # Guardar payload en request para uso posterior
         request.usuario_actual = payload
         return f(*args, **kwargs)
@@ -78,13 +144,11 @@ def rol_requerido(*roles_permitidos):
         @token_requerido
         def decorado(*args, **kwargs):
             rol_usuario = request.usuario_actual.get('rol')
-            print(f"[DEBUG] Verificando rol. Usuario: {rol_usuario}, Requerido: {roles_permitidos}")
             
             if rol_usuario not in roles_permitidos:
-                print(f"[ERROR] Acceso denegado. Rol '{rol_usuario}' no está en {roles_permitidos}")
+                logger.warning('Acceso denegado por rol', extra={'roles_permitidos': list(roles_permitidos)})
                 return jsonify({'mensaje': 'Acceso denegado - rol insuficiente'}), 403
             
-            print(f"[DEBUG] Acceso permitido para rol {rol_usuario}")
             return f(*args, **kwargs)
         return decorado
     return decorador
@@ -92,14 +156,17 @@ def rol_requerido(*roles_permitidos):
 class AutenticacionControlador:
     """Controlador para manejar la autenticación"""
     
-    def __init__(self, repo_usuario):
+    def __init__(self, repo_usuario, ejecutor_contrasenas=None):
         """
         Inicializa el controlador
         
         Args:
             repo_usuario: Repositorio de usuarios
+            ejecutor_contrasenas (EjecutorContrasenas): Pool acotado para bcrypt;
+                sin él, bcrypt corre en el hilo de la petición (opcional)
         """
         self.repo_usuario = repo_usuario
+        self.ejecutor_contrasenas = ejecutor_contrasenas
     
     def login(self, datos):
         """
@@ -120,16 +187,20 @@ class AutenticacionControlador:
         # Buscar usuario
         usuario = self.repo_usuario.obtener_por_nombre(nombre_usuario)
         
-        if not usuario:
+        # Un usuario dado de baja responde igual que uno inexistente
+        if not usuario or usuario.get('estado') == ESTADO_ELIMINADO:
             return {'error': 'Usuario o contraseña incorrectos'}, 401
         
         if usuario.get('estado') == 'inactivo':
             return {'error': 'Usuario inactivo'}, 401
         
         # Verificar contraseña
-        if not verificar_contraseña(contraseña, usuario.get('contraseña_hash')):
+        if not self._verificar(contraseña, usuario.get('contraseña_hash')):
             return {'error': 'Usuario o contraseña incorrectos'}, 401
         
+        # Llevar el hash al costo configurado, sin demorar la respuesta
+        self._actualizar_hash(usuario, contraseña)
+        
         # Generar token
         token = generar_token_jwt(
             usuario['_id'],
@@ -173,7 +244,7 @@ class AutenticacionControlador:
             return {'error': 'El nombre de usuario ya existe'}, 409
         
         # Crear usuario
-        hash_pwd = hash_contraseña(contraseña)
+        hash_pwd = self._hash(contraseña)
         usuario = Usuario(
             nombre_usuario=nombre_usuario,
             contraseña_hash=hash_pwd,
@@ -215,12 +286,14 @@ class AutenticacionControlador:
             return {'error': 'Usuario no encontrado'}, 404
         
         # Verificar contraseña actual
-        if not verificar_contraseña(contraseña_actual, usuario.get('contraseña_hash')):
+        if not self._verificar(contraseña_actual, usuario.get('contraseña_hash')):
             return {'error': 'Contraseña actual incorrecta'}, 401
         
         # Actualizar contraseña
-        hash_nueva = hash_contraseña(contraseña_nueva)
+        hash_nueva = self._hash(contraseña_nueva)
         self.repo_usuario.actualizar(usuario_id, {'contraseña_hash': hash_nueva})
+        # Los tokens emitidos con la contraseña anterior dejan de servir en todos los workers
+        invalidar_tokens_anteriores(usuario_id)
         
         return {'mensaje': 'Contraseña cambiad exitosamente'}, 200
     
@@ -246,3 +319,31 @@ class AutenticacionControlador:
         )
         
         return {'token': nuevo_token}, 200
+    
+    def _hash(self, contraseña):
+        """Genera el hash en el pool de contraseñas si existe"""
+        if self.ejecutor_contrasenas:
+            return self.ejecutor_contrasenas.hash(contraseña)
+        return hash_contraseña(contraseña)
+    
+    def _actualizar_hash(self, usuario, contraseña):
+        """Regenera en segundo plano un hash con parámetros distintos a los configurados"""
+        if not self.ejecutor_contrasenas:
+            return
+        
+        hash_anterior = usuario.get('contraseña_hash')
+        if not necesita_rehash(hash_anterior, self.ejecutor_contrasenas.rondas):
+            return
+        
+        usuario_id = str(usuario['_id'])
+        # Si el pool está ocupado se omite; se intentará en el próximo login
+        self.ejecutor_contrasenas.hash_en_segundo_plano(
+            contraseña,
+            lambda hash_nuevo: self.repo_usuario.reemplazar_hash_contraseña(usuario_id, hash_anterior, hash_nuevo)
+        )
+    
+    def _verificar(self, contraseña, hash_guardado):
+        """Verifica la contraseña en el pool de contraseñas si existe"""
+        if self.ejecutor_contrasenas:
+            return self.ejecutor_contrasenas.verificar(contraseña, hash_guardado)
+        return verificar_contraseña(contraseña, hash_guardado)
@@ -6,9 +6,16 @@ from modelos.juego import Juego
 class JuegoControlador:
     """Controlador para gestión de juegos"""
     
-    def __init__(self, repo_juego):
-        """Inicializa el controlador"""
+    def __init__(self, repo_juego, catalogo=None):
+        """
+        Inicializa el controlador
+        
+        Args:
+            repo_juego: Repositorio de juegos
+            catalogo (CatalogoJuegos): Mapa en memoria a mantener sincronizado (opcional)
+        """
         self.repo_juego = repo_juego
+        self.catalogo = catalogo
     
     def crear(self, datos):
         """Crea un nuevo juego"""
@@ -44,6 +51,9 @@ class JuegoControlador:
         
         juego_id = self.repo_juego.crear(juego)
         
+        if self.catalogo:
+            self.catalogo.sincronizar(juego_id, juego.a_diccionario())
+        
         return {
             'mensaje': 'Juego creado exitosamente',
             'juego_id': juego_id
@@ -96,11 +106,6 @@ class JuegoControlador:
     
     def actualizar(self, juego_id, datos):
         """Actualiza un juego"""
-        juego = self.repo_juego.obtener_por_id(juego_id)
-        
-        if not juego:
-            return {'error': 'Juego no encontrado'}, 404
-        
         # Campos que pueden actualizarse
         datos_actualizacion = {}
         
@@ -128,18 +133,24 @@ class JuegoControlador:
                 return {'error': f'Consola inválida. Debe ser: {", ".join(consolas_validas)}'}, 400
             datos_actualizacion['consola'] = datos['consola']
         
-        self.repo_juego.actualizar(juego_id, datos_actualizacion)
+        if not datos_actualizacion:
+            return {'error': 'No hay campos para actualizar'}, 400
+        
+        if not self.repo_juego.actualizar(juego_id, datos_actualizacion):
+            return {'error': 'Juego no encontrado'}, 404
+        
+        if self.catalogo:
+            self.catalogo.sincronizar(juego_id, datos_actualizacion)
         
         return {'mensaje': 'Juego actualizado exitosamente'}, 200
     
     def cambiar_disponibilidad(self, juego_id, disponible):
         """Cambia la disponibilidad de un juego"""
-        juego = self.repo_juego.obtener_por_id(juego_id)
-        
-        if not juego:
+        if not self.repo_juego.cambiar_disponibilidad(juego_id, disponible):
             return {'error': 'Juego no encontrado'}, 404
         
-        self.repo_juego.cambiar_disponibilidad(juego_id, disponible)
+        if self.catalogo:
+            self.catalogo.sincronizar(juego_id, {'disponible': disponible})
         
         estado = 'disponible' if disponible else 'no disponible'
         return {'mensaje': f'Juego marcado como {estado}'}, 200
@@ -154,12 +165,11 @@ class JuegoControlador:
     
     def eliminar(self, juego_id):
         """Elimina un juego completamente"""
-        juego = self.repo_juego.obtener_por_id(juego_id)
-        
-        if not juego:
+        if not self.repo_juego.eliminar(juego_id):
             return {'error': 'Juego no encontrado'}, 404
         
-        self.repo_juego.eliminar(juego_id)
+        if self.catalogo:
+            self.catalogo.quitar(juego_id)
         
         return {'mensaje': 'Juego eliminado exitosamente'}, 200
     
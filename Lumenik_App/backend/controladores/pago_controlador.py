@@ -0,0 +1,66 @@
+"""
+pago_controlador.py - Controlador del libro de Pagos
+"""
+
+class PagoControlador:
+    """Controlador para consultas del libro de pagos y saldos"""
+    
+    def __init__(self, repo_pago):
+        """Inicializa el controlador"""
+        self.repo_pago = repo_pago
+    
+    def obtener_deudores(self, limite=50):
+        """Obtiene los clientes con saldo pendiente"""
+        try:
+            limite = max(1, min(int(limite), 500))
+        except (TypeError, ValueError):
+            return {'error': 'El límite debe ser un número'}, 400
+        
+        deudores = [self._formato_saldo(s) for s in self.repo_pago.obtener_deudores(limite)]
+        
+        return {'deudores': deudores, 'total': len(deudores)}, 200
+    
+    def obtener_estado_cuenta(self, cliente_id, antes_de=None, limite=50):
+        """Obtiene el saldo y una página de movimientos de un cliente"""
+        try:
+            limite = max(1, min(int(limite), 200))
+        except (TypeError, ValueError):
+            return {'error': 'El límite debe ser un número'}, 400
+        
+        movimientos = self.repo_pago.obtener_estado_cuenta(cliente_id, antes_de, limite)
+        saldo = self.repo_pago.obtener_saldo(cliente_id)
+        
+        return {
+            'saldo': self._formato_saldo(saldo) if saldo else self._formato_saldo({'_id': cliente_id}),
+            'movimientos': [self._formato_movimiento(m) for m in movimientos],
+            # Cursor para pedir la siguiente página (None si no hay más)
+            'siguiente': str(movimientos[-1]['_id']) if len(movimientos) == limite else None
+        }, 200
+    
+    def recalcular_saldos(self):
+        """Reconstruye los saldos de clientes desde los registros de trabajo"""
+        self.repo_pago.recalcular_saldos()
+        return {'mensaje': 'Saldos recalculados exitosamente'}, 200
+    
+    @staticmethod
+    def _formato_saldo(saldo):
+        """Convierte un documento de saldo a formato de respuesta"""
+        return {
+            'cliente_id': saldo['_id'],
+            'facturado': saldo.get('facturado', 0.0),
+            'pagado': saldo.get('pagado', 0.0),
+            'pendiente': saldo.get('pendiente', 0.0),
+            'actualizado': saldo['actualizado'].isoformat() if saldo.get('actualizado') else None
+        }
+    
+    @staticmethod
+    def _formato_movimiento(movimiento):
+        """Convierte un movimiento del libro a formato de respuesta"""
+        return {
+            'id': str(movimiento['_id']),
+            'registro_id': movimiento.get('registro_id'),
+            'tipo': movimiento['tipo'],
+            'monto': movimiento['monto'],
+            'concepto': movimiento.get('concepto', ''),
+            'fecha': movimiento['fecha'].isoformat()
+        }
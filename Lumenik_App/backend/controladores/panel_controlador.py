@@ -0,0 +1,167 @@
+"""
+panel_controlador.py - Controlador de los paneles (una petición por dashboard)
+"""
+import time
+from modelos.registro_trabajo import PROYECCION_PANEL
+from modelos.usuario import PROYECCION_LISTADO
+from controladores.juego_controlador import JuegoControlador
+from controladores.trabajo_controlador import TrabajoControlador
+from controladores.usuario_controlador import UsuarioControlador
+from servicios.hidratacion import HidratadorRegistros
+
+PROYECCION_CLIENTE_PANEL = {'nombre_completo': 1, 'nombre_usuario': 1, 'telefono': 1}
+
+class PanelControlador:
+    """Arma los datos de un dashboard con consultas concurrentes"""
+    
+    def __init__(self, repo_trabajo, repo_usuario, consultas, repo_cliente=None,
+                 limite_historial=20, repo_juego=None, tamano_pagina=25):
+        """
+        Inicializa el controlador
+        
+        Args:
+            repo_trabajo: Repositorio de trabajos
+            repo_usuario: Repositorio de usuarios
+            consultas (ConsultasParalelas): Pool para ejecutar las consultas a la vez
+            repo_cliente: Repositorio de clientes, para la dirección (opcional)
+            limite_historial (int): Trabajos recientes que trae el historial
+            repo_juego: Repositorio de juegos, para el panel del administrador (opcional)
+            tamano_pagina (int): Elementos de cada lista en el panel del administrador
+        """
+        self.repo_trabajo = repo_trabajo
+        self.repo_usuario = repo_usuario
+        self.consultas = consultas
+        self.repo_cliente = repo_cliente
+        self.limite_historial = limite_historial
+        self.repo_juego = repo_juego
+        self.tamano_pagina = tamano_pagina
+        # Las estadísticas se calculan igual que en sus propios endpoints
+        self.controlador_usuario = UsuarioControlador(repo_usuario)
+        self.controlador_juego = JuegoControlador(repo_juego) if repo_juego else None
+        self.hidratador = HidratadorRegistros(repo_juego, repo_usuario)
+    
+    def panel_empleado(self, empleado_id):
+        """
+        Obtiene clientes, cola pendiente, trabajos en progreso e historial reciente del empleado
+        
+        Args:
+            empleado_id (str): ID del empleado autenticado
+        
+        Returns:
+            tuple: (datos del panel, código HTTP)
+        """
+        consultas = {
+            'clientes': lambda: self.repo_usuario.obtener_por_rol('cliente', PROYECCION_CLIENTE_PANEL),
+            'pendientes': lambda: self.repo_trabajo.listar_empleado(empleado_id, 'pendiente', proyeccion=PROYECCION_PANEL),
+            'en_progreso': lambda: self.repo_trabajo.listar_empleado(empleado_id, 'en_progreso', proyeccion=PROYECCION_PANEL),
+            'historial': lambda: self.repo_trabajo.listar_empleado(
+                empleado_id, limite=self.limite_historial, proyeccion=PROYECCION_PANEL
+            )
+        }
+        if self.repo_cliente:
+            consultas['contactos'] = self.repo_cliente.obtener_contactos
+        
+        resultados, _ = self.consultas.ejecutar(consultas)
+        
+        contactos = resultados.get('contactos', {})
+        clientes = [self._formato_cliente(u, contactos.get(str(u['_id']))) for u in resultados['clientes']]
+        nombres = {c['id']: c['nombre_completo'] for c in clientes}
+        
+        # La cola pendiente se atiende de la más antigua a la más reciente
+        pendientes = sorted(resultados['pendientes'], key=lambda r: r['fecha_creacion'])
+        
+        return {
+            'clientes': clientes,
+            'pendientes': [self._formato_trabajo(r, nombres) for r in pendientes],
+            'en_progreso': [self._formato_trabajo(r, nombres) for r in resultados['en_progreso']],
+            'historial': [self._formato_trabajo(r, nombres) for r in resultados['historial']],
+            'resumen': {
+                'clientes': len(clientes),
+                'pendientes': len(pendientes),
+                'en_progreso': len(resultados['en_progreso'])
+            }
+        }, 200
+    
+    def panel_admin(self):
+        """
+        Obtiene las estadísticas y la primera página de usuarios, juegos y trabajos
+        
+        Todas las consultas corren a la vez, así que la respuesta tarda lo que la
+        más lenta y no la suma de todas. Cada lista trae hay_mas para que el
+        cliente cargue el resto solo si lo necesita.
+        
+        Returns:
+            tuple: (datos del panel con tiempos_ms por sección, código HTTP)
+        """
+        # Se pide un elemento de más para saber si hay otra página
+        limite = self.tamano_pagina + 1
+        consultas = {
+            'estadisticas_usuarios': lambda: self.controlador_usuario.obtener_estadisticas()[0],
+            'estadisticas_trabajos': self.repo_trabajo.obtener_estadisticas,
+            'usuarios': lambda: self.repo_usuario.obtener_todos(
+                limite, excluir_rol='administrador', proyeccion=PROYECCION_LISTADO
+            ),
+            'trabajos': lambda: self.repo_trabajo.obtener_recientes(limite)
+        }
+        if self.controlador_juego:
+            consultas['estadisticas_juegos'] = lambda: self.controlador_juego.obtener_estadisticas()[0]
+            consultas['juegos'] = lambda: self.repo_juego.obtener_todos(limite)
+        
+        inicio = time.perf_counter()
+        resultados, tiempos = self.consultas.ejecutar(consultas)
+        tiempos['total'] = round((time.perf_counter() - inicio) * 1000, 2)
+        
+        # Los clientes de la página de trabajos se resuelven con una sola consulta $in
+        trabajos = self._pagina(resultados['trabajos'], TrabajoControlador._formato_registro)
+        self.hidratador.hidratar(trabajos['elementos'], {'cliente'})
+        
+        return {
+            'estadisticas': {
+                'usuarios': resultados['estadisticas_usuarios'],
+                'juegos': resultados.get('estadisticas_juegos'),
+                'trabajos': resultados['estadisticas_trabajos']
+            },
+            'usuarios': self._pagina(resultados['usuarios'], UsuarioControlador._formato_usuario),
+            'juegos': self._pagina(resultados.get('juegos', []), JuegoControlador._formato_juego),
+            'trabajos': trabajos,
+            'tiempos_ms': tiempos
+        }, 200
+    
+    def _pagina(self, documentos, formato):
+        """Formatea la primera página de una lista e indica si hay más"""
+        return {
+            'elementos': [formato(d) for d in documentos[:self.tamano_pagina]],
+            'hay_mas': len(documentos) > self.tamano_pagina
+        }
+    
+    @staticmethod
+    def _formato_cliente(usuario, contacto=None):
+        """Datos del cliente que muestra el panel"""
+        contacto = contacto or {}
+        return {
+            'id': str(usuario['_id']),
+            'nombre_completo': usuario.get('nombre_completo') or usuario.get('nombre_usuario', ''),
+            'telefono': usuario.get('telefono', ''),
+            'direccion': contacto.get('direccion', ''),
+            'ciudad': contacto.get('ciudad', '')
+        }
+    
+    @staticmethod
+    def _formato_trabajo(registro, nombres):
+        """Versión reducida de un registro para las tarjetas del panel"""
+        costo = float(registro.get('costo', 0))
+        return {
+            'id': str(registro['_id']),
+            'cliente_id': registro.get('cliente_id'),
+            'cliente': nombres.get(registro.get('cliente_id'), ''),
+            'tipo_servicio': registro.get('tipo_servicio', ''),
+            'descripcion': registro.get('descripcion', ''),
+            'estado': registro.get('estado'),
+            'consola': registro.get('consola', 'Desconocida'),
+            'juegos_instalados': [str(j) for j in registro.get('juegos_instalados', [])],
+            'prioridad': registro.get('prioridad', 0),
+            'costo': costo,
+            'saldo_pendiente': max(0, costo - float(registro.get('monto_pagado', 0))),
+            'fecha_creacion': registro['fecha_creacion'].isoformat() if registro.get('fecha_creacion') else None,
+            'reclamo_expira': registro['reclamo_expira'].isoformat() if registro.get('reclamo_expira') else None
+        }
@@ -0,0 +1,137 @@
+"""
+reporte_controlador.py - Controlador de Reportes
+"""
+from datetime import date, datetime, timedelta
+
+GRANULARIDADES = {'dia': 'day', 'semana': 'week', 'mes': 'month'}
+METRICAS = ['trabajos', 'ingresos', 'gb', 'duracion_promedio_horas']
+
+class ReporteControlador:
+    """Controlador para reportes agregados de trabajos"""
+    
+    def __init__(self, repo_trabajo, cache=None):
+        """
+        Inicializa el controlador
+        
+        Args:
+            repo_trabajo: Repositorio de trabajos
+            cache: CacheTTL para respuestas de periodos cerrados (opcional)
+        """
+        self.repo_trabajo = repo_trabajo
+        self.cache = cache
+    
+    def obtener_serie(self, desde, hasta, granularidad='dia', metrica=None):
+        """
+        Obtiene una serie temporal de trabajos agrupada por día, semana o mes
+        
+        Args:
+            desde (str): Fecha inicial (YYYY-MM-DD o ISO 8601)
+            hasta (str): Fecha final inclusiva (YYYY-MM-DD o ISO 8601)
+            granularidad (str): dia, semana o mes
+            metrica (str): Métrica a devolver (opcional, por defecto todas)
+        
+        Returns:
+            dict: {granularidad, desde, hasta, serie} o error
+        """
+        if not desde or not hasta:
+            return {'error': 'Parámetros requeridos: desde, hasta'}, 400
+        
+        if granularidad not in GRANULARIDADES:
+            return {'error': f'Granularidad inválida. Debe ser: {", ".join(GRANULARIDADES)}'}, 400
+        
+        if metrica and metrica not in METRICAS:
+            return {'error': f'Métrica inválida. Debe ser: {", ".join(METRICAS)}'}, 400
+        
+        try:
+            fecha_inicio, _ = self._parsear_fecha(desde)
+            fecha_fin, solo_dia = self._parsear_fecha(hasta)
+        except ValueError:
+            return {'error': 'Las fechas deben tener formato YYYY-MM-DD o ISO 8601'}, 400
+        
+        # Una fecha sin hora incluye el día completo
+        if solo_dia:
+            fecha_fin += timedelta(days=1)
+        
+        if fecha_fin <= fecha_inicio:
+            return {'error': 'La fecha hasta debe ser posterior a desde'}, 400
+        
+        # Solo se guarda un periodo cerrado; el repositorio de trabajos vacía la caché en cada escritura
+        cerrado = fecha_fin <= self._inicio_periodo(datetime.now(), granularidad)
+        clave = (fecha_inicio, fecha_fin, granularidad, metrica)
+        
+        if cerrado and self.cache:
+            respuesta = self.cache.obtener(clave)
+            if respuesta is not None:
+                return respuesta, 200
+        
+        documentos = self.repo_trabajo.obtener_serie_temporal(
+            fecha_inicio, fecha_fin, GRANULARIDADES[granularidad]
+        )
+        
+        serie = []
+        for doc in documentos:
+            punto = self._formato_punto(doc)
+            if metrica:
+                punto = {'periodo': punto['periodo'], metrica: punto[metrica]}
+            serie.append(punto)
+        
+        respuesta = {
+            'granularidad': granularidad,
+            'desde': fecha_inicio.isoformat(),
+            'hasta': fecha_fin.isoformat(),
+            'periodo_cerrado': cerrado,
+            'serie': serie
+        }
+        
+        if cerrado and self.cache:
+            self.cache.guardar(clave, respuesta)
+        
+        return respuesta, 200
+    
+    @staticmethod
+    def _parsear_fecha(texto):
+        """
+        Convierte YYYY-MM-DD o ISO 8601 en un datetime sin zona
+        
+        Las fechas guardadas son hora local sin zona (datetime.now()): una con
+        desplazamiento se pasa a la hora local del servidor y se le quita.
+        
+        Returns:
+            tuple: (datetime, True si el texto era solo una fecha)
+        
+        Raises:
+            ValueError: Si el texto no es una fecha válida
+        """
+        try:
+            dia = date.fromisoformat(texto)
+            return datetime(dia.year, dia.month, dia.day), True
+        except ValueError:
+            pass
+        
+        fecha = datetime.fromisoformat(texto)
+        if fecha.tzinfo is not None:
+            fecha = fecha.astimezone().replace(tzinfo=None)
+        return fecha, False
+    
+    @staticmethod
+    def _inicio_periodo(fecha, granularidad):
+        """Calcula el inicio del intervalo que contiene la fecha"""
+        inicio = fecha.replace(hour=0, minute=0, second=0, microsecond=0)
+        if granularidad == 'semana':
+            # $dateTrunc inicia las semanas en domingo por defecto
+            inicio -= timedelta(days=(inicio.weekday() + 1) % 7)
+        elif granularidad == 'mes':
+            inicio = inicio.replace(day=1)
+        return inicio
+    
+    @staticmethod
+    def _formato_punto(doc):
+        """Convierte un documento agregado a formato de respuesta"""
+        duracion_ms = doc.get('duracion_promedio_ms')
+        return {
+            'periodo': doc['_id'].isoformat() if doc.get('_id') else None,
+            'trabajos': doc.get('trabajos', 0),
+            'ingresos': doc.get('ingresos', 0.0),
+            'gb': doc.get('gb', 0.0),
+            'duracion_promedio_horas': round(duracion_ms / 3600000, 2) if duracion_ms is not None else None
+        }
@@ -0,0 +1,67 @@
+"""
+tarea_controlador.py - Controlador de Tareas en segundo plano
+"""
+from servicios.archivo import TIPO_ARCHIVAR_TRABAJOS, parametros_archivo
+
+class TareaControlador:
+    """Controlador para lanzar y consultar tareas en segundo plano"""
+    
+    def __init__(self, repo_tarea, ejecutor_tareas, antiguedad_archivo_dias=365):
+        """
+        Inicializa el controlador
+        
+        Args:
+            repo_tarea: Repositorio de tareas
+            ejecutor_tareas (EjecutorTareas): Ejecutor de tareas en segundo plano
+            antiguedad_archivo_dias (int): Antigüedad por defecto para archivar trabajos
+        """
+        self.repo_tarea = repo_tarea
+        self.ejecutor_tareas = ejecutor_tareas
+        self.antiguedad_archivo_dias = antiguedad_archivo_dias
+    
+    def archivar_trabajos(self, antiguedad_dias=None):
+        """Lanza el archivado de trabajos cerrados más antiguos que antiguedad_dias"""
+        try:
+            antiguedad_dias = int(antiguedad_dias if antiguedad_dias is not None else self.antiguedad_archivo_dias)
+            if antiguedad_dias < 1:
+                return {'error': 'La antigüedad debe ser de al menos 1 día'}, 400
+        except (TypeError, ValueError):
+            return {'error': 'La antigüedad debe ser un número entero de días'}, 400
+        
+        tarea_id = self.ejecutor_tareas.encolar(TIPO_ARCHIVAR_TRABAJOS, parametros_archivo(antiguedad_dias))
+        
+        return {
+            'mensaje': 'Archivado iniciado',
+            'tarea_id': tarea_id
+        }, 202
+    
+    def obtener_por_id(self, tarea_id):
+        """Obtiene el estado de una tarea"""
+        tarea = self.repo_tarea.obtener_por_id(tarea_id)
+        
+        if not tarea:
+            return {'error': 'Tarea no encontrada'}, 404
+        
+        return self._formato_tarea(tarea), 200
+    
+    def obtener_recientes(self, tipo=None):
+        """Obtiene las últimas tareas"""
+        tareas = [self._formato_tarea(t) for t in self.repo_tarea.obtener_recientes(tipo)]
+        return {'tareas': tareas, 'total': len(tareas)}, 200
+    
+    @staticmethod
+    def _formato_tarea(tarea):
+        """Convierte un documento tarea a formato de respuesta"""
+        return {
+            'id': str(tarea['_id']),
+            'tipo': tarea['tipo'],
+            'estado': tarea['estado'],
+            'procesados': tarea.get('procesados', 0),
+            # Fase y conteos de las tareas que los guardan en su cursor (el resto usa un _id)
+            'avance': tarea['cursor'] if isinstance(tarea.get('cursor'), dict) else None,
+            'resultado': tarea.get('resultado'),
+            'error': tarea.get('error'),
+            'fecha_creacion': tarea['fecha_creacion'].isoformat() if tarea.get('fecha_creacion') else None,
+            'fecha_inicio': tarea['fecha_inicio'].isoformat() if tarea.get('fecha_inicio') else None,
+            'fecha_fin': tarea['fecha_fin'].isoformat() if tarea.get('fecha_fin') else None
+        }
@@ -1,22 +1,42 @@
 """
 trabajo_controlador.py - Controlador de Registros de Trabajo
 """
-from datetime import datetime
 from modelos.registro_trabajo import RegistroTrabajo
+from modelos.pago import Pago
+from servicios.hidratacion import HidratadorRegistros, parsear_expandir
+
+ESTADOS_VALIDOS = ['pendiente', 'en_progreso', 'completado', 'cancelado']
+ACCIONES_LOTE = ['estado', 'asignar', 'pago', 'eliminar']
+MAXIMO_LOTE = 500
 
 class TrabajoControlador:
     """Controlador para gestión de registros de trabajo"""
     
-    def __init__(self, repo_trabajo, repo_cliente=None):
+    def __init__(self, repo_trabajo, repo_cliente=None, repo_pago=None,
+                 repo_usuario=None, duracion_reclamo=30,
+                 repo_juego=None, catalogo=None, contadores_cliente=None):
         """
         Inicializa el controlador
         
         Args:
             repo_trabajo: Repositorio de trabajos
             repo_cliente: Repositorio de clientes (opcional)
+            repo_pago: Repositorio del libro de pagos (opcional)
+            repo_usuario: Repositorio de usuarios (opcional)
+            duracion_reclamo (int): Minutos que dura el reclamo de un trabajo
+            repo_juego: Repositorio de juegos, para ?expandir=juegos (opcional)
+            catalogo (CatalogoJuegos): Mapa de juegos para validar selecciones (opcional)
+            contadores_cliente (AcumuladorIncrementos): Buffer de los contadores del
+                cliente; sin él se actualizan en la misma petición (opcional)
         """
         self.repo_trabajo = repo_trabajo
         self.repo_cliente = repo_cliente
+        self.repo_pago = repo_pago
+        self.repo_usuario = repo_usuario
+        self.duracion_reclamo = duracion_reclamo
+        self.hidratador = HidratadorRegistros(repo_juego, repo_usuario)
+        self.catalogo = catalogo
+        self.contadores_cliente = contadores_cliente
     
     def crear(self, datos):
         """Crea un nuevo registro de trabajo"""
@@ -40,6 +60,21 @@ class TrabajoControlador:
         except ValueError:
             return {'error': 'El costo debe ser un número'}, 400
         
+        try:
+            prioridad = int(datos.get('prioridad', 0))
+        except (TypeError, ValueError):
+            return {'error': 'La prioridad debe ser un número entero'}, 400
+        
+        try:
+            total_gb = float(datos.get('total_gb', 0.0))
+        except (TypeError, ValueError):
+            return {'error': 'El total_gb debe ser un número'}, 400
+        
+        # Tamaño, consola y espacio se calculan aquí, no se confía en lo que envía el navegador
+        seleccion, error = self._evaluar_seleccion(juegos_instalados, datos.get('consola'), total_gb)
+        if error:
+            return {'error': error}, 400
+        
         # Crear registro
         registro = RegistroTrabajo(
             cliente_id=cliente_id,
@@ -47,79 +82,103 @@ class TrabajoControlador:
             tipo_servicio=tipo_servicio,
             juegos_instalados=juegos_instalados,
             descripcion=descripcion,
-            costo=costo
+            costo=costo,
+            prioridad=prioridad
         )
         
-        # Asignar total_gb y consola desde los datos de la solicitud
-        registro.total_gb = float(datos.get('total_gb', 0.0))
-        registro.consola = datos.get('consola', 'PS4')
+        # total_gb es el espacio del dispositivo; gb_seleccion lo que ocupan los juegos
+        registro.total_gb = total_gb
+        registro.consola = seleccion.get('consola') or datos.get('consola') or 'PS4'
+        registro.gb_seleccion = seleccion.get('gb_seleccion', 0.0)
         
         registro_id = self.repo_trabajo.crear(registro)
         
-        # Actualizar estadísticas del cliente si existe repo
-        if self.repo_cliente:
+        # Actualizar estadísticas del cliente (diferido si hay buffer)
+        if self.contadores_cliente:
+            self.contadores_cliente.incrementar(cliente_id, {'servicios_realizados': 1, 'gasto_total': costo})
+        elif self.repo_cliente:
             self.repo_cliente.incrementar_servicios(cliente_id, costo)
         
+        if self.repo_pago:
+            self.repo_pago.registrar_movimiento(cliente_id, registro_id, 'cargo', costo, 'Trabajo registrado')
+        
         return {
             'mensaje': 'Registro de trabajo creado exitosamente',
             'registro_id': registro_id
         }, 201
     
-    def obtener_todos(self):
-        """Obtiene todos los registros de trabajo"""
-        registros = self.repo_trabajo.obtener_todos()
-        
-        registros_respuesta = [self._formato_registro(r) for r in registros]
-        
-        return {'registros': registros_respuesta, 'total': len(registros_respuesta)}, 200
+    def obtener_todos(self, expandir=None, incluir_historial=False):
+        """Obtiene todos los registros de trabajo (con los archivados si se pide el historial)"""
+        return self._respuesta_lista(lambda: self.repo_trabajo.obtener_todos(incluir_historial), expandir)
     
-    def obtener_por_id(self, registro_id):
+    def obtener_por_id(self, registro_id, expandir=None, incluir_historial=False):
         """Obtiene un registro por ID"""
-        registro = self.repo_trabajo.obtener_por_id(registro_id)
+        expansiones, error = parsear_expandir(expandir)
+        if error:
+            return {'error': error}, 400
+        
+        registro = self.repo_trabajo.obtener_por_id(registro_id, incluir_historial)
         
         if not registro:
             return {'error': 'Registro no encontrado'}, 404
         
-        return self._formato_registro(registro), 200
+        registro_respuesta = self._formato_registro(registro, incluir_pagos=True)
+        return self.hidratador.hidratar([registro_respuesta], expansiones)[0], 200
     
-    def obtener_por_cliente(self, cliente_id):
+    def obtener_por_cliente(self, cliente_id, expandir=None, incluir_historial=False):
         """Obtiene registros de un cliente"""
-        registros = self.repo_trabajo.obtener_por_cliente(cliente_id)
-        
-        registros_respuesta = [self._formato_registro(r) for r in registros]
-        
-        return {'registros': registros_respuesta, 'total': len(registros_respuesta)}, 200
+        return self._respuesta_lista(
+            lambda: self.repo_trabajo.obtener_por_cliente(cliente_id, incluir_historial), expandir
+        )
     
-    def obtener_por_empleado(self, empleado_id):
+    def obtener_por_empleado(self, empleado_id, expandir=None, incluir_historial=False):
         """Obtiene registros de un empleado"""
-        registros = self.repo_trabajo.obtener_por_empleado(empleado_id)
-        
-        registros_respuesta = [self._formato_registro(r) for r in registros]
-        
-        return {'registros': registros_respuesta, 'total': len(registros_respuesta)}, 200
+        return self._respuesta_lista(
+            lambda: self.repo_trabajo.obtener_por_empleado(empleado_id, incluir_historial), expandir
+        )
     
-    def obtener_pendientes(self, empleado_id=None):
+    def obtener_pendientes(self, empleado_id=None, expandir=None):
         """Obtiene registros pendientes"""
         if empleado_id:
-            registros = self.repo_trabajo.obtener_pendientes_empleado(empleado_id)
-        else:
-            registros = self.repo_trabajo.obtener_pendientes()
+            return self._respuesta_lista(lambda: self.repo_trabajo.obtener_pendientes_empleado(empleado_id), expandir)
+        return self._respuesta_lista(self.repo_trabajo.obtener_pendientes, expandir)
+    
+    def reclamar(self, empleado_id, consolas=None):
+        """
+        Asigna al empleado el siguiente trabajo de la cola
         
-        registros_respuesta = [self._formato_registro(r) for r in registros]
+        Args:
+            empleado_id (str): ID del empleado que reclama
+            consolas (list): Consolas a considerar (opcional, por defecto las del empleado)
         
-        return {'registros': registros_respuesta, 'total': len(registros_respuesta)}, 200
-    
-    def actualizar(self, registro_id, datos):
-        """Actualiza un registro de trabajo"""
-        registro = self.repo_trabajo.obtener_por_id(registro_id)
+        Returns:
+            dict: Registro reclamado o error
+        """
+        if consolas is not None and (
+            not isinstance(consolas, list) or not all(isinstance(c, str) for c in consolas)
+        ):
+            return {'error': 'consolas debe ser una lista de textos'}, 400
+        
+        if consolas is None and self.repo_usuario:
+            empleado = self.repo_usuario.obtener_por_id(empleado_id)
+            consolas = empleado.get('consolas', []) if empleado else []
+        
+        registro = self.repo_trabajo.reclamar_siguiente(empleado_id, consolas, self.duracion_reclamo)
         
         if not registro:
-            return {'error': 'Registro no encontrado'}, 404
+            return {'error': 'No hay trabajos disponibles en la cola'}, 404
         
-        # Solo permitir editar si está en estado pendiente
-        if registro.get('estado') != 'pendiente':
-            return {'error': f'No se puede editar un registro en estado {registro.get("estado")}. Solo se pueden editar registros pendientes.'}, 400
+        return self._formato_registro(registro), 200
+    
+    def renovar_reclamo(self, registro_id, empleado_id):
+        """Extiende el reclamo de un trabajo en curso del empleado"""
+        if not self.repo_trabajo.renovar_reclamo(registro_id, empleado_id, self.duracion_reclamo):
+            return {'error': 'El trabajo no está reclamado por este empleado'}, 409
         
+        return {'mensaje': 'Reclamo renovado', 'duracion_minutos': self.duracion_reclamo}, 200
+    
+    def actualizar(self, registro_id, datos):
+        """Actualiza un registro de trabajo (solo si está en estado pendiente)"""
         # Campos que pueden actualizarse
         datos_actualizacion = {}
         
@@ -134,9 +193,8 @@ class TrabajoControlador:
                 return {'error': 'El costo debe ser un número'}, 400
         
         if 'estado' in datos:
-            estados_validos = ['pendiente', 'en_progreso', 'completado', 'cancelado']
-            if datos['estado'] not in estados_validos:
-                return {'error': f'Estado inválido. Debe ser: {", ".join(estados_validos)}'}, 400
+            if datos['estado'] not in ESTADOS_VALIDOS:
+                return {'error': f'Estado inválido. Debe ser: {", ".join(ESTADOS_VALIDOS)}'}, 400
             datos_actualizacion['estado'] = datos['estado']
         
         # Campos adicionales para edición
@@ -153,47 +211,84 @@ class TrabajoControlador:
             except ValueError:
                 return {'error': 'El total_gb debe ser un número'}, 400
         
-        self.repo_trabajo.actualizar(registro_id, datos_actualizacion)
+        if not datos_actualizacion:
+            return {'error': 'No hay campos para actualizar'}, 400
+        
+        version = datos.get('version')
+        if version is not None:
+            try:
+                version = int(version)
+            except (TypeError, ValueError):
+                return {'error': 'La versión debe ser un número entero'}, 400
+        
+        campos_seleccion = ('juegos_instalados', 'consola', 'total_gb')
+        if self.catalogo and any(c in datos_actualizacion for c in campos_seleccion):
+            actuales = {}
+            if not all(c in datos_actualizacion for c in campos_seleccion):
+                # Completar con lo guardado y fijar esa versión para no validar contra datos viejos
+                registro = self.repo_trabajo.obtener_por_id(registro_id)
+                if not registro:
+                    return {'error': 'Registro no encontrado'}, 404
+                actuales = registro
+                if version is None:
+                    version = registro.get('version', 0)
+            
+            # Si cambian los juegos sin indicar consola, la consola sale de los juegos
+            consola = datos_actualizacion.get('consola')
+            if consola is None and 'juegos_instalados' not in datos_actualizacion:
+                consola = actuales.get('consola')
+            
+            seleccion, error = self._evaluar_seleccion(
+                datos_actualizacion.get('juegos_instalados', actuales.get('juegos_instalados', [])),
+                consola,
+                datos_actualizacion.get('total_gb', actuales.get('total_gb'))
+            )
+            if error:
+                return {'error': error}, 400
+            
+            datos_actualizacion['gb_seleccion'] = seleccion['gb_seleccion']
+            if seleccion.get('consola'):
+                datos_actualizacion['consola'] = seleccion['consola']
+        
+        # El estado pendiente y la versión se validan en el mismo filtro de la escritura
+        registro = self.repo_trabajo.actualizar_pendiente(registro_id, datos_actualizacion, version)
         
-        return {'mensaje': 'Registro actualizado exitosamente'}, 200
+        if not registro:
+            return self._error_escritura_rechazada(registro_id, 'editar', version)
+        
+        if self.repo_pago and 'costo' in datos_actualizacion:
+            diferencia = datos_actualizacion['costo'] - float(registro.get('costo', 0))
+            self.repo_pago.registrar_movimiento(registro.get('cliente_id'), registro_id, 'cargo', diferencia, 'Costo actualizado')
+        
+        return {
+            'mensaje': 'Registro actualizado exitosamente',
+            'version': registro.get('version', 0) + 1
+        }, 200
     
     def eliminar(self, registro_id):
         """Elimina un registro de trabajo (solo si está en estado pendiente)"""
-        registro = self.repo_trabajo.obtener_por_id(registro_id)
+        registro = self.repo_trabajo.eliminar_pendiente(registro_id)
         
         if not registro:
-            return {'error': 'Registro no encontrado'}, 404
-        
-        # Solo permitir eliminar si está en estado pendiente
-        if registro.get('estado') != 'pendiente':
-            return {'error': f'No se puede eliminar un registro en estado {registro.get("estado")}. Solo se pueden eliminar registros pendientes.'}, 400
+            return self._error_escritura_rechazada(registro_id, 'eliminar')
         
-        self.repo_trabajo.eliminar(registro_id)
+        if self.repo_pago:
+            self._reversar_movimientos(registro, registro_id, 'Trabajo eliminado')
         
         return {'mensaje': 'Registro eliminado exitosamente'}, 200
     
     def cambiar_estado(self, registro_id, nuevo_estado):
         """Cambia el estado de un registro"""
-        registro = self.repo_trabajo.obtener_por_id(registro_id)
+        if nuevo_estado not in ESTADOS_VALIDOS:
+            return {'error': f'Estado inválido. Debe ser: {", ".join(ESTADOS_VALIDOS)}'}, 400
         
-        if not registro:
+        if not self.repo_trabajo.cambiar_estado(registro_id, nuevo_estado):
             return {'error': 'Registro no encontrado'}, 404
         
-        estados_validos = ['pendiente', 'en_progreso', 'completado', 'cancelado']
-        if nuevo_estado not in estados_validos:
-            return {'error': f'Estado inválido. Debe ser: {", ".join(estados_validos)}'}, 400
-        
-        self.repo_trabajo.cambiar_estado(registro_id, nuevo_estado)
-        
         return {'mensaje': f'Estado cambiado a {nuevo_estado}'}, 200
     
     def registrar_pago(self, registro_id, monto):
         """Registra un pago para un trabajo"""
-        registro = self.repo_trabajo.obtener_por_id(registro_id)
-        
-        if not registro:
-            return {'error': 'Registro no encontrado'}, 404
-        
         try:
             monto = float(monto)
             if monto <= 0:
@@ -201,52 +296,37 @@ class TrabajoControlador:
         except ValueError:
             return {'error': 'El monto debe ser un número'}, 400
         
-        costo_total = float(registro.get('costo', 0))
-        monto_pagado_actual = float(registro.get('monto_pagado', 0))
-        monto_pagado_nuevo = monto_pagado_actual + monto
+        registro = self.repo_trabajo.registrar_pago(registro_id, monto)
         
-        # Validar que no se pague más de lo debido
-        if monto_pagado_nuevo > costo_total:
+        if not registro:
+            # El pago fue rechazado: distinguir registro inexistente de monto excedido
+            registro = self.repo_trabajo.obtener_por_id(registro_id)
+            
+            if not registro:
+                return {'error': 'Registro no encontrado'}, 404
+            
+            monto_adeudado = float(registro.get('costo', 0)) - float(registro.get('monto_pagado', 0))
             return {
-                'error': f'El monto a pagar ({monto}) excede lo adeudado ({costo_total - monto_pagado_actual})',
-                'monto_adeudado': costo_total - monto_pagado_actual
+                'error': f'El monto a pagar ({monto}) excede lo adeudado ({monto_adeudado})',
+                'monto_adeudado': monto_adeudado
             }, 400
         
-        # Crear entrada de pago
-        nuevo_pago = {
-            'monto': monto,
-            'fecha': datetime.now().isoformat(),
-            'saldo_pendiente': costo_total - monto_pagado_nuevo
-        }
-        
-        # Actualizar registro
-        datos_actualizacion = {
-            'monto_pagado': monto_pagado_nuevo,
-            'completamente_pagado': monto_pagado_nuevo >= costo_total
-        }
-        
-        # Agregar nuevo pago a la lista
-        pagos_actuales = registro.get('pagos', [])
-        pagos_actuales.append(nuevo_pago)
-        datos_actualizacion['pagos'] = pagos_actuales
+        costo_total = float(registro.get('costo', 0))
+        monto_pagado_nuevo = float(registro.get('monto_pagado', 0))
         
-        self.repo_trabajo.actualizar(registro_id, datos_actualizacion)
+        if self.repo_pago:
+            self.repo_pago.registrar_movimiento(registro.get('cliente_id'), registro_id, 'pago', monto, 'Pago registrado')
         
         return {
             'mensaje': f'Pago registrado exitosamente',
             'monto_pagado': monto_pagado_nuevo,
             'costo_total': costo_total,
             'saldo_pendiente': max(0, costo_total - monto_pagado_nuevo),
-            'completamente_pagado': monto_pagado_nuevo >= costo_total
+            'completamente_pagado': registro.get('completamente_pagado', False)
         }, 200
     
     def asignar_deuda_total(self, registro_id, nuevo_costo):
         """Asigna una deuda total nueva y limpia el historial de pagos"""
-        registro = self.repo_trabajo.obtener_por_id(registro_id)
-        
-        if not registro:
-            return {'error': 'Registro no encontrado'}, 404
-        
         try:
             nuevo_costo = float(nuevo_costo)
             if nuevo_costo < 0:
@@ -254,15 +334,15 @@ class TrabajoControlador:
         except ValueError:
             return {'error': 'El costo debe ser un número'}, 400
         
-        # Resetear pagos
-        datos_actualizacion = {
-            'costo': nuevo_costo,
-            'monto_pagado': 0.0,
-            'pagos': [],
-            'completamente_pagado': False
-        }
+        # Resetear pagos y asignar el nuevo costo en una sola escritura
+        registro = self.repo_trabajo.reiniciar_pagos(registro_id, nuevo_costo)
         
-        self.repo_trabajo.actualizar(registro_id, datos_actualizacion)
+        if not registro:
+            return {'error': 'Registro no encontrado'}, 404
+        
+        if self.repo_pago:
+            self._reversar_movimientos(registro, registro_id, 'Deuda reasignada')
+            self.repo_pago.registrar_movimiento(registro.get('cliente_id'), registro_id, 'cargo', nuevo_costo, 'Deuda reasignada')
         
         return {
             'mensaje': 'Deuda total asignada y historial de pagos limpiado',
@@ -273,21 +353,16 @@ class TrabajoControlador:
     
     def limpiar_historial_pagos(self, registro_id):
         """Limpia solo el historial de pagos manteniendo el costo"""
-        registro = self.repo_trabajo.obtener_por_id(registro_id)
+        registro = self.repo_trabajo.reiniciar_pagos(registro_id)
         
         if not registro:
             return {'error': 'Registro no encontrado'}, 404
         
         costo_total = float(registro.get('costo', 0))
         
-        # Limpiar pagos
-        datos_actualizacion = {
-            'monto_pagado': 0.0,
-            'pagos': [],
-            'completamente_pagado': False
-        }
-        
-        self.repo_trabajo.actualizar(registro_id, datos_actualizacion)
+        if self.repo_pago:
+            self.repo_pago.registrar_movimiento(registro.get('cliente_id'), registro_id, 'pago',
+                                                -float(registro.get('monto_pagado', 0)), 'Historial de pagos limpiado')
         
         return {
             'mensaje': 'Historial de pagos limpiado',
@@ -296,15 +371,239 @@ class TrabajoControlador:
             'saldo_pendiente': costo_total
         }, 200
     
+    def ejecutar_lote(self, operaciones):
+        """
+        Ejecuta un lote de operaciones sobre varios registros
+        
+        Lee todos los registros con una consulta, escribe con un solo bulk_write
+        y registra los movimientos del libro una sola vez por lote.
+        
+        Args:
+            operaciones (list): Dicts con accion (estado|asignar|pago|eliminar),
+                id y el valor de la acción (estado, empleado_id o monto)
+        
+        Returns:
+            dict: Resultado por operación, en el mismo orden
+        """
+        if not isinstance(operaciones, list) or not operaciones:
+            return {'error': 'Se requiere una lista de operaciones'}, 400
+        
+        if len(operaciones) > MAXIMO_LOTE:
+            return {'error': f'Máximo {MAXIMO_LOTE} operaciones por lote'}, 400
+        
+        resultados = [None] * len(operaciones)
+        validas = []
+        vistos = set()
+        
+        for indice, operacion in enumerate(operaciones):
+            operacion = operacion if isinstance(operacion, dict) else {}
+            registro_id = operacion.get('id')
+            accion = operacion.get('accion')
+            valor = None
+            error = None
+            
+            if not registro_id:
+                error = 'Campo requerido: id'
+            elif not isinstance(registro_id, (str, int)) or isinstance(registro_id, bool):
+                error = 'El id debe ser un texto o un número'
+            elif accion not in ACCIONES_LOTE:
+                error = f'Acción inválida. Debe ser: {", ".join(ACCIONES_LOTE)}'
+            elif registro_id in vistos:
+                # Con un bulk_write no ordenado no hay orden garantizado entre dos
+                # operaciones sobre el mismo registro
+                error = 'Solo se permite una operación por registro en cada lote'
+            elif accion == 'estado':
+                valor = operacion.get('estado')
+                if valor not in ESTADOS_VALIDOS:
+                    error = f'Estado inválido. Debe ser: {", ".join(ESTADOS_VALIDOS)}'
+            elif accion == 'asignar':
+                valor = operacion.get('empleado_id')
+                if not valor:
+                    error = 'Campo requerido: empleado_id'
+            elif accion == 'pago':
+                try:
+                    valor = float(operacion.get('monto'))
+                    if valor <= 0:
+                        error = 'El monto debe ser mayor a 0'
+                except (TypeError, ValueError):
+                    error = 'El monto debe ser un número'
+            
+            if error:
+                resultados[indice] = self._resultado_lote(indice, registro_id, accion, 400, error=error)
+                continue
+            
+            vistos.add(registro_id)
+            validas.append({'indice': indice, 'id': registro_id, 'accion': accion, 'valor': valor})
+        
+        # Una sola lectura de todos los registros del lote
+        registros = self.repo_trabajo.obtener_por_ids(
+            [o['id'] for o in validas],
+            {'cliente_id': 1, 'estado': 1, 'costo': 1, 'monto_pagado': 1, 'version': 1}
+        )
+        
+        empleados_activos = None
+        if self.repo_usuario and any(o['accion'] == 'asignar' for o in validas):
+            empleados_activos = {str(e['_id']) for e in self.repo_usuario.obtener_por_rol('empleado')}
+        
+        por_aplicar = []
+        for operacion in validas:
+            registro = registros.get(operacion['id'])
+            error = self._validar_operacion_lote(operacion, registro, empleados_activos)
+            
+            if error:
+                codigo, mensaje = error
+                resultados[operacion['indice']] = self._resultado_lote(
+                    operacion['indice'], operacion['id'], operacion['accion'], codigo, error=mensaje
+                )
+                continue
+            
+            operacion['registro'] = registro
+            por_aplicar.append(operacion)
+        
+        aplicadas = self.repo_trabajo.aplicar_lote(por_aplicar)
+        
+        movimientos = []
+        for operacion in por_aplicar:
+            indice, registro_id, accion = operacion['indice'], operacion['id'], operacion['accion']
+            
+            if registro_id not in aplicadas:
+                resultados[indice] = self._resultado_lote(
+                    indice, registro_id, accion, 409,
+                    error='El registro fue modificado por otra persona durante el lote'
+                )
+                continue
+            
+            resultados[indice] = self._resultado_lote(indice, registro_id, accion, 200, mensaje='Operación aplicada')
+            
+            registro = operacion['registro']
+            cliente_id = registro.get('cliente_id')
+            if accion == 'pago':
+                movimientos.append(Pago(cliente_id, registro_id, 'pago', operacion['valor'], 'Pago registrado (lote)'))
+            elif accion == 'eliminar':
+                movimientos.append(Pago(cliente_id, registro_id, 'cargo', -float(registro.get('costo', 0)), 'Trabajo eliminado (lote)'))
+                movimientos.append(Pago(cliente_id, registro_id, 'pago', -float(registro.get('monto_pagado', 0)), 'Trabajo eliminado (lote)'))
+        
+        # Libro y saldos se actualizan una vez por lote, no por operación
+        if self.repo_pago and movimientos:
+            self.repo_pago.registrar_lote(movimientos)
+        
+        return {
+            'resultados': resultados,
+            'aplicadas': len(aplicadas),
+            'fallidas': len(operaciones) - len(aplicadas)
+        }, 200
+    
     def obtener_estadisticas(self):
         """Obtiene estadísticas de trabajos"""
         stats = self.repo_trabajo.obtener_estadisticas()
         return stats, 200
     
-    @staticmethod
-    def _formato_registro(registro):
-        """Convierte un documento registro a formato de respuesta"""
+    def _error_escritura_rechazada(self, registro_id, accion, version=None):
+        """Lee el registro solo cuando una escritura condicional falla, para explicar el motivo"""
+        registro = self.repo_trabajo.obtener_por_id(registro_id)
+        
+        if not registro:
+            return {'error': 'Registro no encontrado'}, 404
+        
+        estado = registro.get('estado')
+        if estado != 'pendiente':
+            return {'error': f'No se puede {accion} un registro en estado {estado}. Solo se pueden {accion} registros pendientes.'}, 400
+        
         return {
+            'error': 'El registro fue modificado por otra persona. Recarga e intenta de nuevo.',
+            'version_actual': registro.get('version', 0),
+            'version_enviada': version
+        }, 409
+    
+    def _evaluar_seleccion(self, juegos_instalados, consola, capacidad_gb):
+        """
+        Valida una selección de juegos contra el catálogo en memoria
+        
+        Returns:
+            tuple: (resumen con gb_seleccion y consola, mensaje de error o None)
+        """
+        if not isinstance(juegos_instalados, list):
+            return None, 'juegos_instalados debe ser una lista'
+        
+        if not self.catalogo:
+            return {}, None
+        
+        return self.catalogo.evaluar_seleccion(juegos_instalados, consola, capacidad_gb)
+    
+    def _respuesta_lista(self, consultar, expandir):
+        """
+        Arma la respuesta de un listado, resolviendo las referencias pedidas en ?expandir
+        
+        Args:
+            consultar (callable): Devuelve los documentos del listado
+            expandir (str): Valor de ?expandir (opcional)
+        """
+        expansiones, error = parsear_expandir(expandir)
+        if error:
+            return {'error': error}, 400
+        
+        registros_respuesta = self.hidratador.hidratar(
+            [self._formato_registro(r) for r in consultar()], expansiones
+        )
+        
+        return {'registros': registros_respuesta, 'total': len(registros_respuesta)}, 200
+    
+    @staticmethod
+    def _validar_operacion_lote(operacion, registro, empleados_activos):
+        """
+        Valida una operación del lote contra el registro leído
+        
+        Returns:
+            tuple: (código, mensaje) del error o None si la operación es válida
+        """
+        if not registro:
+            return 404, 'Registro no encontrado'
+        
+        accion = operacion['accion']
+        estado = registro.get('estado')
+        
+        if accion == 'eliminar' and estado != 'pendiente':
+            return 400, f'No se puede eliminar un registro en estado {estado}. Solo se pueden eliminar registros pendientes.'
+        
+        if accion == 'asignar':
+            if estado not in ['pendiente', 'en_progreso']:
+                return 400, f'No se puede asignar un registro en estado {estado}'
+            if empleados_activos is not None and operacion['valor'] not in empleados_activos:
+                return 400, 'El empleado no existe o no está activo'
+        
+        if accion == 'pago':
+            monto_adeudado = float(registro.get('costo', 0)) - float(registro.get('monto_pagado', 0))
+            if operacion['valor'] > monto_adeudado:
+                return 400, f'El monto a pagar ({operacion["valor"]}) excede lo adeudado ({monto_adeudado})'
+        
+        return None
+    
+    @staticmethod
+    def _resultado_lote(indice, registro_id, accion, codigo, mensaje=None, error=None):
+        """Arma el resultado de una operación del lote"""
+        resultado = {'indice': indice, 'id': registro_id, 'accion': accion, 'codigo': codigo}
+        if error:
+            resultado['error'] = error
+        else:
+            resultado['mensaje'] = mensaje
+        return resultado
+    
+    def _reversar_movimientos(self, registro, registro_id, concepto):
+        """Anula en el libro el cargo y los pagos vigentes de un registro"""
+        cliente_id = registro.get('cliente_id')
+        self.repo_pago.registrar_movimiento(cliente_id, registro_id, 'cargo', -float(registro.get('costo', 0)), concepto)
+        self.repo_pago.registrar_movimiento(cliente_id, registro_id, 'pago', -float(registro.get('monto_pagado', 0)), concepto)
+    
+    @staticmethod
+    def _formato_registro(registro, incluir_pagos=False):
+        """
+        Convierte un documento registro a formato de respuesta
+        
+        Args:
+            registro (dict): Documento de MongoDB
+            incluir_pagos (bool): Incluir el historial de pagos (solo en el detalle)
+        """
+        formato = {
             'id': str(registro['_id']),
             'cliente_id': registro.get('cliente_id'),
             'empleado_id': registro.get('empleado_id'),
@@ -314,13 +613,22 @@ class TrabajoControlador:
             'descripcion': registro['descripcion'],
             'costo': registro['costo'],
             'estado': registro['estado'],
+            'prioridad': registro.get('prioridad', 0),
             'fecha_creacion': registro['fecha_creacion'].isoformat() if registro.get('fecha_creacion') else None,
             'fecha_inicio': registro['fecha_inicio'].isoformat() if registro.get('fecha_inicio') else None,
             'fecha_fin': registro['fecha_fin'].isoformat() if registro.get('fecha_fin') else None,
+            'reclamo_expira': registro['reclamo_expira'].isoformat() if registro.get('reclamo_expira') else None,
             'total_gb': registro.get('total_gb', 0.0),
+            'gb_seleccion': registro.get('gb_seleccion', 0.0),
             'consola': registro.get('consola', 'Desconocida'),
             'monto_pagado': registro.get('monto_pagado', 0.0),
-            'pagos': registro.get('pagos', []),
             'completamente_pagado': registro.get('completamente_pagado', False),
+            'version': registro.get('version', 0),
+            'archivado': registro.get('archivado') is not None,
             'saldo_pendiente': max(0, float(registro.get('costo', 0)) - float(registro.get('monto_pagado', 0)))
         }
+        
+        if incluir_pagos:
+            formato['pagos'] = registro.get('pagos', [])
+        
+        return formato
@@ -1,47 +1,99 @@
 """
 usuario_controlador.py - Controlador de Usuarios
 """
+import base64
+import json
+import logging
 from bson.objectid import ObjectId
-from modelos.usuario import Usuario
-from controladores.autenticacion_controlador import hash_contraseña
+from modelos.usuario import Usuario, ROLES_GESTIONABLES, ESTADOS_USUARIO, ESTADO_ELIMINADO, ORDENES_USUARIO
+from controladores.autenticacion_controlador import hash_contraseña, revocar_tokens_usuario
+from servicios.importacion_usuarios import ImportadorUsuarios
+from servicios.eliminacion_usuarios import TIPO_ELIMINAR_USUARIO
+
+logger = logging.getLogger(__name__)
 
 class UsuarioControlador:
     """Controlador para gestión de usuarios"""
     
-    def __init__(self, repo_usuario):
-        """Inicializa el controlador"""
+    LIMITE_LISTADO = 50
+    LIMITE_LISTADO_MAXIMO = 200
+    
+    def __init__(self, repo_usuario, ejecutor_contrasenas=None, repo_cliente=None, maximo_importacion=500,
+                 ejecutor_tareas=None):
+        """
+        Inicializa el controlador
+        
+        Args:
+            repo_usuario: Repositorio de usuarios
+            ejecutor_contrasenas (EjecutorContrasenas): Pool acotado para bcrypt (opcional)
+            repo_cliente: Repositorio de clientes, para los perfiles de la importación (opcional)
+            maximo_importacion (int): Filas por importación en lote
+            ejecutor_tareas (EjecutorTareas): Ejecutor del borrado en cascada (requerido para eliminar)
+        """
         self.repo_usuario = repo_usuario
+        self.ejecutor_contrasenas = ejecutor_contrasenas
+        self.maximo_importacion = maximo_importacion
+        self.ejecutor_tareas = ejecutor_tareas
+        self.importador = ImportadorUsuarios(repo_usuario, repo_cliente, ejecutor_contrasenas)
     
-    def obtener_todos(self):
-        """Obtiene todos los usuarios (excluyendo administradores)"""
-        usuarios = self.repo_usuario.obtener_todos()
+    def obtener_todos(self, parametros=None):
+        """
+        Lista los usuarios gestionables (sin administradores) de a una página
+        
+        Args:
+            parametros (dict): rol, estado, q (prefijo de nombre, usuario o
+                email), orden (reciente|antiguo|nombre|-nombre), limite y
+                despues (cursor 'siguiente' de la página anterior); todos opcionales
+        
+        Returns:
+            dict: {usuarios, siguiente} donde siguiente es None en la última página
+        """
+        parametros = parametros or {}
+        rol = parametros.get('rol')
+        estado = parametros.get('estado')
+        orden = parametros.get('orden') or 'reciente'
+        
+        if rol and rol not in ROLES_GESTIONABLES:
+            return {'error': f'Rol inválido. Debe ser: {", ".join(ROLES_GESTIONABLES)}'}, 400
+        if estado and estado not in ESTADOS_USUARIO:
+            return {'error': f'Estado inválido. Debe ser: {", ".join(ESTADOS_USUARIO)}'}, 400
+        if orden not in ORDENES_USUARIO:
+            return {'error': f'Orden inválido. Debe ser: {", ".join(ORDENES_USUARIO)}'}, 400
         
-        # Convertir a formato de respuesta sin mostrar hashes
-        # Filtrar para excluir administradores
-        usuarios_respuesta = []
-        for usuario in usuarios:
-            # No mostrar administradores en la lista de gestión
-            if usuario['rol'] == 'administrador':
-                continue
-                
-            usuarios_respuesta.append({
-                'id': str(usuario['_id']),
-                'nombre_usuario': usuario['nombre_usuario'],
-                'email': usuario['email'],
-                'rol': usuario['rol'],
-                'nombre_completo': usuario['nombre_completo'],
-                'telefono': usuario['telefono'],
-                'estado': usuario['estado'],
-                'fecha_creacion': usuario['fecha_creacion'].isoformat()
-            })
+        try:
+            limite = int(parametros.get('limite') or self.LIMITE_LISTADO)
+        except (TypeError, ValueError):
+            return {'error': 'El límite debe ser un número'}, 400
+        limite = max(1, min(limite, self.LIMITE_LISTADO_MAXIMO))
+        
+        despues_de = None
+        if parametros.get('despues'):
+            despues_de = self._leer_cursor(parametros['despues'])
+            if despues_de is None:
+                return {'error': 'Cursor de paginación inválido'}, 400
+        
+        # Se pide uno de más para saber si hay otra página
+        usuarios = self.repo_usuario.buscar(
+            roles=[rol] if rol else None,
+            estados=[estado] if estado else None,
+            prefijo=parametros.get('q'),
+            orden=orden,
+            despues_de=despues_de,
+            limite=limite + 1
+        )
+        pagina = usuarios[:limite]
+        campo = ORDENES_USUARIO[orden][0]
         
-        return {'usuarios': usuarios_respuesta}, 200
+        return {
+            'usuarios': [self._formato_usuario(u) for u in pagina],
+            'siguiente': self._crear_cursor(pagina[-1], campo) if len(usuarios) > limite else None
+        }, 200
     
     def obtener_por_id(self, usuario_id):
         """Obtiene un usuario por ID"""
         usuario = self.repo_usuario.obtener_por_id(usuario_id)
         
-        if not usuario:
+        if not usuario or usuario.get('estado') == ESTADO_ELIMINADO:
             return {'error': 'Usuario no encontrado'}, 404
         
         return {
@@ -52,6 +104,7 @@ class UsuarioControlador:
             'nombre_completo': usuario['nombre_completo'],
             'telefono': usuario['telefono'],
             'estado': usuario['estado'],
+            'consolas': usuario.get('consolas', []),
             'fecha_creacion': usuario['fecha_creacion'].isoformat()
         }, 200
     
@@ -73,13 +126,8 @@ class UsuarioControlador:
     
     def actualizar(self, usuario_id, datos):
         """Actualiza información de un usuario"""
-        usuario_actual = self.repo_usuario.obtener_por_id(usuario_id)
-        
-        if not usuario_actual:
-            return {'error': 'Usuario no encontrado'}, 404
-        
         # Campos que pueden actualizarse
-        campos_permitidos = ['email', 'nombre_completo', 'telefono', 'rol']
+        campos_permitidos = ['email', 'nombre_completo', 'telefono', 'rol', 'consolas']
         datos_actualizacion = {}
         
         for campo in campos_permitidos:
@@ -95,22 +143,28 @@ class UsuarioControlador:
             if datos_actualizacion['rol'] not in roles_validos:
                 return {'error': f'Rol inválido. Debe ser: {", ".join(roles_validos)}'}, 400
         
-        self.repo_usuario.actualizar(usuario_id, datos_actualizacion)
+        # Validar las consolas que atiende un empleado
+        if 'consolas' in datos_actualizacion:
+            consolas_validas = ['PSP', 'PS2', 'PS3', 'PS4']
+            consolas = datos_actualizacion['consolas']
+            if not isinstance(consolas, list) or any(c not in consolas_validas for c in consolas):
+                return {'error': f'Consolas inválidas. Deben ser: {", ".join(consolas_validas)}'}, 400
+        
+        if not self.repo_usuario.actualizar(usuario_id, datos_actualizacion):
+            return {'error': 'Usuario no encontrado'}, 404
         
         return {'mensaje': 'Usuario actualizado exitosamente'}, 200
     
     def cambiar_estado(self, usuario_id, nuevo_estado):
         """Cambia el estado de un usuario (activo/inactivo)"""
-        usuario = self.repo_usuario.obtener_por_id(usuario_id)
-        
-        if not usuario:
-            return {'error': 'Usuario no encontrado'}, 404
-        
         estados_validos = ['activo', 'inactivo']
         if nuevo_estado not in estados_validos:
             return {'error': f'Estado inválido. Debe ser: {", ".join(estados_validos)}'}, 400
         
-        self.repo_usuario.actualizar(usuario_id, {'estado': nuevo_estado})
+        if not self.repo_usuario.actualizar(usuario_id, {'estado': nuevo_estado}):
+            return {'error': 'Usuario no encontrado'}, 404
+        
+        revocar_tokens_usuario(usuario_id, revocado=nuevo_estado == 'inactivo')
         
         return {'mensaje': f'Estado del usuario cambiado a {nuevo_estado}'}, 200
     
@@ -144,10 +198,15 @@ class UsuarioControlador:
             return {'error': 'El email ya está registrado'}, 409
         
         # Crear el usuario
+        if self.ejecutor_contrasenas:
+            contraseña_hash = self.ejecutor_contrasenas.hash(datos['contraseña'])
+        else:
+            contraseña_hash = hash_contraseña(datos['contraseña'])
+        
         nuevo_usuario = Usuario(
             nombre_usuario=datos['nombre_usuario'].strip(),
             email=datos['email'].strip(),
-            contraseña_hash=hash_contraseña(datos['contraseña']),
+            contraseña_hash=contraseña_hash,
             nombre_completo=datos['nombre_completo'].strip(),
             telefono=datos.get('telefono', '').strip(),
             rol=datos['rol'],
@@ -162,67 +221,110 @@ class UsuarioControlador:
             'nombre_usuario': datos['nombre_usuario']
         }, 201
     
+    def importar(self, filas):
+        """
+        Crea usuarios en lote con un informe por fila
+        
+        Args:
+            filas (list): Usuarios a crear (ver ImportadorUsuarios.importar)
+        
+        Returns:
+            tuple: ({creados, errores, filas}, 201 si se creó alguno o 400)
+        """
+        if not isinstance(filas, list) or not filas:
+            return {'error': 'Se requiere una lista de usuarios'}, 400
+        if len(filas) > self.maximo_importacion:
+            return {'error': f'Máximo {self.maximo_importacion} usuarios por importación'}, 400
+        
+        informe = self.importador.importar(filas)
+        return informe, 201 if informe['creados'] else 400
+    
     def obtener_estadisticas(self):
-        """Obtiene estadísticas de usuarios"""
-        todos_usuarios = self.repo_usuario.obtener_todos()
-        
-        admin_count = sum(1 for u in todos_usuarios if u['rol'] == 'administrador')
-        empleado_count = sum(1 for u in todos_usuarios if u['rol'] == 'empleado')
-        cliente_count = sum(1 for u in todos_usuarios if u['rol'] == 'cliente')
-        activos_count = sum(1 for u in todos_usuarios if u['estado'] == 'activo')
+        """
+        Obtiene estadísticas de usuarios
         
-        # Total de usuarios SIN contar al administrador
-        usuarios_sin_admin = len(todos_usuarios) - admin_count
+        Returns:
+            tuple: (totales por rol y estado, conteos cruzados, altas por mes y
+                carga de los empleados activos, código HTTP)
+        """
+        estadisticas = self.repo_usuario.obtener_estadisticas()
+        por_rol = estadisticas['por_rol']
         
         return {
-            'total_usuarios': usuarios_sin_admin,
-            'administradores': admin_count,
-            'empleados': empleado_count,
-            'clientes': cliente_count,
-            'usuarios_activos': activos_count
+            # Total de usuarios SIN contar al administrador
+            'total_usuarios': sum(por_rol.values()) - por_rol.get('administrador', 0),
+            'administradores': por_rol.get('administrador', 0),
+            'empleados': por_rol.get('empleado', 0),
+            'clientes': por_rol.get('cliente', 0),
+            'usuarios_activos': estadisticas['por_estado'].get('activo', 0),
+            'por_rol_estado': estadisticas['por_rol_estado'],
+            'nuevos_por_mes': estadisticas['nuevos_por_mes'],
+            'carga_empleados': estadisticas['carga_empleados']
         }, 200
     
     def eliminar(self, usuario_id):
-        """Elimina un usuario y todos sus datos asociados"""
-        from bson.objectid import ObjectId
-        from modelos.registro_trabajo import RepositorioRegistroTrabajo
-        from modelos.cliente import RepositorioCliente
+        """
+        Da de baja un usuario y borra sus datos asociados en segundo plano
         
-        try:
-            usuario_obj_id = ObjectId(usuario_id)
-        except:
+        El usuario deja de poder entrar y desaparece de listados y estadísticas
+        al instante; sus trabajos, perfil de cliente y libro de pagos se borran
+        o anonimizan por lotes en una tarea reanudable (ver EliminadorUsuarios).
+        
+        Returns:
+            tuple: ({mensaje, usuario_eliminado, tarea_id}, 202) o error
+        """
+        if not ObjectId.is_valid(usuario_id):
             return {'error': 'ID de usuario inválido'}, 400
         
-        # Verificar si el usuario existe
-        usuario = self.repo_usuario.obtener_por_id(usuario_id)
+        # La baja es atómica: de varias peticiones simultáneas solo una la obtiene
+        usuario = self.repo_usuario.marcar_eliminado(usuario_id)
         if not usuario:
+            if self.repo_usuario.obtener_por_id(usuario_id):
+                return {'error': 'El usuario ya se está eliminando'}, 409
             return {'error': 'Usuario no encontrado'}, 404
         
-        # Obtener la base de datos desde el repositorio
-        db = self.repo_usuario.db
-        
-        # Eliminar registros de trabajo del usuario
         try:
-            repo_trabajo = RepositorioRegistroTrabajo(db)
-            repo_trabajo.coleccion.delete_many({'usuario_id': usuario_obj_id})
-        except Exception as e:
-            print(f"[DEBUG] Error eliminando trabajos: {e}")
+            tarea_id = self.ejecutor_tareas.encolar(TIPO_ELIMINAR_USUARIO, {'usuario_id': str(usuario['_id'])})
+        except Exception:
+            # Sin tarea nadie borraría sus datos: el usuario vuelve a su estado anterior
+            self.repo_usuario.restaurar_estado(usuario_id, usuario.get('estado', 'activo'))
+            raise
         
-        # Eliminar cliente asociado si existe
+        revocar_tokens_usuario(usuario_id)
+        logger.info('Usuario dado de baja', extra={'usuario_id': usuario_id, 'tarea_id': tarea_id})
+        
+        return {
+            'mensaje': 'Usuario eliminado; sus datos se borran en segundo plano',
+            'usuario_eliminado': usuario['nombre_usuario'],
+            'tarea_id': tarea_id
+        }, 202
+    
+    @staticmethod
+    def _crear_cursor(usuario, campo):
+        """Cursor opaco con el valor de orden y el _id del último usuario de la página"""
+        valor = None if campo == '_id' else usuario.get(campo)
+        contenido = json.dumps([valor, str(usuario['_id'])]).encode('utf-8')
+        return base64.urlsafe_b64encode(contenido).decode('ascii')
+    
+    @staticmethod
+    def _leer_cursor(cursor):
+        """Decodifica un cursor de _crear_cursor (None si no es válido)"""
         try:
-            repo_cliente = RepositorioCliente(db)
-            repo_cliente.coleccion.delete_many({'usuario_id': usuario_obj_id})
-        except Exception as e:
-            print(f"[DEBUG] Error eliminando cliente: {e}")
-        
-        # Eliminar usuario
-        usuario_eliminado = self.repo_usuario.coleccion.delete_one({'_id': usuario_obj_id})
-        
-        if usuario_eliminado.deleted_count > 0:
-            return {
-                'mensaje': 'Usuario eliminado correctamente',
-                'usuario_eliminado': usuario['nombre_usuario']
-            }, 200
-        else:
-            return {'error': 'No se pudo eliminar el usuario'}, 400
-
+            valor, usuario_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return valor, ObjectId(usuario_id)
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _formato_usuario(usuario):
+        """Convierte un documento usuario a formato de respuesta (sin el hash)"""
+        return {
+            'id': str(usuario['_id']),
+            'nombre_usuario': usuario['nombre_usuario'],
+            'email': usuario['email'],
+            'rol': usuario['rol'],
+            'nombre_completo': usuario['nombre_completo'],
+            'telefono': usuario['telefono'],
+            'estado': usuario['estado'],
+            'fecha_creacion': usuario['fecha_creacion'].isoformat()
+        }
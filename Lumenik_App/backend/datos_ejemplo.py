@@ -12,9 +12,14 @@ from modelos.usuario import Usuario, RepositorioUsuario
 from modelos.juego import Juego, RepositorioJuego
 from modelos.cliente import Cliente, RepositorioCliente
 from modelos.registro_trabajo import RegistroTrabajo, RepositorioRegistroTrabajo
+from modelos.pago import RepositorioPago
 from controladores.autenticacion_controlador import hash_contraseña
+from configuracion import obtener_config
 from bson.objectid import ObjectId
 
+# Costo de bcrypt del ambiente actual, el mismo que usa la app para los hashes nuevos
+RONDAS = obtener_config().BCRYPT_RONDAS
+
 # Conectar a MongoDB
 cliente_mongo = MongoClient('mongodb://localhost:27017/lumenik_db')
 db = cliente_mongo['lumenik_db']
@@ -25,12 +30,15 @@ db['usuarios'].delete_many({})
 db['juegos'].delete_many({})
 db['clientes'].delete_many({})
 db['registros_trabajo'].delete_many({})
+db['pagos'].delete_many({})
+db['saldos_clientes'].delete_many({})
 
 # Crear repositorios
 repo_usuario = RepositorioUsuario(db)
 repo_juego = RepositorioJuego(db)
 repo_cliente = RepositorioCliente(db)
 repo_trabajo = RepositorioRegistroTrabajo(db)
+repo_pago = RepositorioPago(db)
 
 print("\n✓ Base de datos limpiada")
 
@@ -40,7 +48,7 @@ print("\n--- CREANDO USUARIOS ---")
 # Usuario Admin
 admin = Usuario(
     nombre_usuario='admin',
-    contraseña_hash=hash_contraseña('admin123'),
+    contraseña_hash=hash_contraseña('admin123', RONDAS),
     email='admin@lumenik.com',
     rol='administrador',
     nombre_completo='Administrador Lümenik',
@@ -52,7 +60,7 @@ print(f"✓ Admin creado: {admin_id}")
 # Usuario Empleado
 empleado = Usuario(
     nombre_usuario='empleado1',
-    contraseña_hash=hash_contraseña('emp123'),
+    contraseña_hash=hash_contraseña('emp123', RONDAS),
     email='empleado@lumenik.com',
     rol='empleado',
     nombre_completo='Juan Pérez',
@@ -64,7 +72,7 @@ print(f"✓ Empleado creado: {empleado_id}")
 # Usuario Cliente
 cliente_user = Usuario(
     nombre_usuario='cliente1',
-    contraseña_hash=hash_contraseña('cli123'),
+    contraseña_hash=hash_contraseña('cli123', RONDAS),
     email='cliente@lumenik.com',
     rol='cliente',
     nombre_completo='Carlos García',
@@ -257,8 +265,9 @@ registro = RegistroTrabajo(
     estado='completado'
 )
 registro.consola = 'PS4'
-registro.total_gb = 60.5 + 85.0 + 92.0  # Suma de los pesos
+registro.gb_seleccion = 60.5 + 85.0 + 92.0  # Suma de los pesos
 registro_id = repo_trabajo.crear(registro)
+repo_pago.registrar_movimiento(cliente_usuario_id, registro_id, 'cargo', registro.costo, 'Trabajo registrado')
 print(f"✓ Registro de trabajo creado: {registro_id}")
 
 # CREAR MÁS USUARIOS DE PRUEBA
@@ -267,7 +276,7 @@ print("\n--- CREANDO USUARIOS ADICIONALES DE PRUEBA ---")
 # Cliente 2
 cliente2_user = Usuario(
     nombre_usuario='cliente2',
-    contraseña_hash=hash_contraseña('cli456'),
+    contraseña_hash=hash_contraseña('cli456', RONDAS),
     email='cliente2@lumenik.com',
     rol='cliente',
     nombre_completo='María López',
@@ -279,7 +288,7 @@ print(f"✓ Cliente2 creado: {cliente2_id}")
 # Empleado 2
 empleado2 = Usuario(
     nombre_usuario='empleado2',
-    contraseña_hash=hash_contraseña('emp456'),
+    contraseña_hash=hash_contraseña('emp456', RONDAS),
     email='empleado2@lumenik.com',
     rol='empleado',
     nombre_completo='Roberto Martínez',
@@ -0,0 +1,76 @@
+"""
+importar_usuarios.py - Da de alta usuarios en lote desde un archivo CSV o JSON
+Ejecutar: python importar_usuarios.py <archivo.csv|archivo.json> [hilos]
+
+El CSV lleva una cabecera con nombre_usuario, email, contraseña,
+nombre_completo y opcionalmente telefono, rol, consolas (separadas por ';'),
+direccion y ciudad; el JSON es una lista de objetos con esos campos. Los
+clientes reciben su perfil en 'clientes'. Las contraseñas se procesan con
+tantos hilos como núcleos (o los indicados) y el informe muestra cada fila
+rechazada con su motivo.
+"""
+import csv
+import json
+import os
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from pymongo import MongoClient
+from configuracion import obtener_config
+from modelos.usuario import RepositorioUsuario
+from modelos.cliente import RepositorioCliente
+from servicios.contrasenas import EjecutorContrasenas
+from servicios.importacion_usuarios import ImportadorUsuarios
+
+def leer_filas(ruta):
+    """Lee las filas de un archivo .json (lista de objetos) o .csv (con cabecera)"""
+    with open(ruta, encoding='utf-8-sig', newline='') as archivo:
+        if ruta.lower().endswith('.json'):
+            return json.load(archivo)
+        return list(csv.DictReader(archivo))
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(2)
+    
+    ruta = sys.argv[1]
+    hilos = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    config = obtener_config()
+    
+    filas = leer_filas(ruta)
+    if not isinstance(filas, list):
+        print("El archivo JSON debe contener una lista de usuarios")
+        sys.exit(2)
+    
+    db = MongoClient(config.MONGO_URI)[config.MONGO_DB_NAME]
+    repo_usuario = RepositorioUsuario(db)
+    repo_cliente = RepositorioCliente(db)
+    ejecutor = EjecutorContrasenas(hilos, 0, config.BCRYPT_RONDAS)
+    # Sin logins que atender: se usan todos los hilos
+    importador = ImportadorUsuarios(repo_usuario, repo_cliente, ejecutor, simultaneas=hilos)
+    
+    print("=" * 60)
+    print("    IMPORTACIÓN DE USUARIOS")
+    print("=" * 60)
+    print(f"Archivo: {ruta} ({len(filas)} filas)")
+    print(f"Base de datos: {config.MONGO_DB_NAME}")
+    print(f"bcrypt: costo {config.BCRYPT_RONDAS}, {hilos} hilos")
+    
+    inicio = time.perf_counter()
+    informe = importador.importar(filas)
+    duracion = time.perf_counter() - inicio
+    
+    rechazadas = [fila for fila in informe['filas'] if 'error' in fila or 'aviso' in fila]
+    if rechazadas:
+        print(f"\n{'fila':>6}  {'usuario':<24} motivo")
+        for fila in rechazadas:
+            print(f"{fila['fila']:>6}  {fila['nombre_usuario'] or '-':<24} {fila.get('error') or fila['aviso']}")
+    
+    print(f"\n✓ {informe['creados']} usuarios creados, {informe['errores']} filas rechazadas en {duracion:.1f} s")
+    sys.exit(1 if informe['errores'] else 0)
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,8 @@ cliente.py - Modelo de Cliente
 """
 from datetime import datetime
 from bson.objectid import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 class Cliente:
     """Modelo para información adicional de clientes"""
@@ -62,6 +64,27 @@ class RepositorioCliente:
         resultado = self.coleccion.insert_one(cliente.a_diccionario())
         return str(resultado.inserted_id)
     
+    def crear_lote(self, clientes):
+        """
+        Inserta varios perfiles de cliente con un insert_many no ordenado
+        
+        Args:
+            clientes (list): Objetos Cliente
+        
+        Returns:
+            dict: usuario_id -> mensaje de error, solo de los perfiles rechazados
+        """
+        if not clientes:
+            return {}
+        try:
+            self.coleccion.insert_many([c.a_diccionario() for c in clientes], ordered=False)
+        except BulkWriteError as e:
+            return {
+                clientes[error['index']].usuario_id: error.get('errmsg', 'Error al insertar')
+                for error in e.details.get('writeErrors', [])
+            }
+        return {}
+    
     def obtener_por_usuario_id(self, usuario_id):
         """Obtiene cliente por ID de usuario"""
         try:
@@ -78,6 +101,18 @@ class RepositorioCliente:
         except:
             return None
     
+    def obtener_contactos(self):
+        """
+        Obtiene los datos de contacto de todos los clientes
+        
+        Returns:
+            dict: usuario_id -> cliente (solo dirección y ciudad)
+        """
+        return {
+            c['usuario_id']: c
+            for c in self.coleccion.find({}, {'_id': 0, 'usuario_id': 1, 'direccion': 1, 'ciudad': 1})
+        }
+    
     def obtener_todos(self):
         """Obtiene todos los clientes"""
         return list(self.coleccion.find({}))
@@ -104,11 +139,21 @@ class RepositorioCliente:
         except:
             return False
     
+    def crear_indices(self):
+        """Crea los índices usados por las consultas del repositorio"""
+        self.coleccion.create_index('usuario_id')
+    
     def incrementar_servicios(self, cliente_id, monto=1.0):
-        """Incrementa el contador de servicios y el gasto total"""
+        """
+        Incrementa el contador de servicios y el gasto total
+        
+        Args:
+            cliente_id (str): ID del usuario cliente (el que guardan los trabajos)
+            monto (float): Monto a sumar al gasto total
+        """
         try:
             self.coleccion.update_one(
-                {'_id': ObjectId(cliente_id)},
+                {'usuario_id': cliente_id},
                 {
                     '$inc': {
                         'servicios_realizados': 1,
@@ -119,3 +164,23 @@ class RepositorioCliente:
             return True
         except:
             return False
+    
+    def incrementar_lote(self, incrementos):
+        """
+        Aplica incrementos acumulados de varios clientes en un solo bulk_write
+        
+        Args:
+            incrementos (dict): usuario_id -> {campo: delta}
+        
+        Returns:
+            int: Clientes actualizados
+        """
+        operaciones = [
+            UpdateOne({'usuario_id': usuario_id}, {'$inc': deltas})
+            for usuario_id, deltas in incrementos.items() if deltas
+        ]
+        if not operaciones:
+            return 0
+        
+        resultado = self.coleccion.bulk_write(operaciones, ordered=False)
+        return resultado.modified_count
@@ -78,9 +78,36 @@ class RepositorioJuego:
         except:
             return None
     
-    def obtener_todos(self):
-        """Obtiene todos los juegos disponibles"""
-        return list(self.coleccion.find({'disponible': True}))
+    def obtener_por_ids(self, juego_ids, proyeccion=None):
+        """
+        Obtiene varios juegos con una sola consulta $in
+        
+        Args:
+            juego_ids (list): IDs de los juegos (los inválidos se ignoran)
+            proyeccion (dict): Campos a devolver (opcional)
+        
+        Returns:
+            dict: ID (str) -> juego
+        """
+        ids = []
+        for juego_id in juego_ids:
+            try:
+                ids.append(ObjectId(juego_id))
+            except:
+                continue
+        
+        if not ids:
+            return {}
+        
+        return {str(d['_id']): d for d in self.coleccion.find({'_id': {'$in': ids}}, proyeccion)}
+    
+    def obtener_para_catalogo(self):
+        """Obtiene peso, consola y disponibilidad de todos los juegos (incluso no disponibles)"""
+        return list(self.coleccion.find({}, {'peso_gb': 1, 'consola': 1, 'disponible': 1}))
+    
+    def obtener_todos(self, limite=0):
+        """Obtiene todos los juegos disponibles (limite > 0 devuelve solo los primeros)"""
+        return list(self.coleccion.find({'disponible': True}).limit(limite))
     
     def obtener_por_consola(self, consola):
         """Obtiene juegos por consola"""
@@ -94,13 +121,13 @@ class RepositorioJuego:
         return list(self.coleccion.find({'disponible': True}))
     
     def actualizar(self, juego_id, datos):
-        """Actualiza un juego"""
+        """Actualiza un juego (devuelve True si el juego existe)"""
         try:
             resultado = self.coleccion.update_one(
                 {'_id': ObjectId(juego_id)},
                 {'$set': datos}
             )
-            return resultado.modified_count > 0
+            return resultado.matched_count > 0
         except:
             return False
     
@@ -121,7 +148,7 @@ class RepositorioJuego:
                 {'_id': ObjectId(juego_id)},
                 {'$set': {'disponible': disponible}}
             )
-            return resultado.modified_count > 0
+            return resultado.matched_count > 0
         except:
             return False
     
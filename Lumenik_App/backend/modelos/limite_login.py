@@ -0,0 +1,82 @@
+"""
+limite_login.py - Estado compartido del limitador de intentos de login
+"""
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+
+class RepositorioLimiteLogin:
+    """
+    Almacén del limitador de login en MongoDB, compartido entre workers
+    
+    Implementa la misma interfaz que servicios.limitador_login.AlmacenMemoria.
+    Cada clave es un documento con un número de versión; modificar() escribe
+    solo si la versión no cambió desde la lectura y, si otro worker se
+    adelantó, vuelve a intentar con el estado nuevo.
+    """
+    
+    # Reintentos de modificar() cuando otro worker escribe la misma clave
+    MAX_REINTENTOS = 5
+    
+    def __init__(self, db):
+        """
+        Inicializa el repositorio
+        
+        Args:
+            db: Instancia de base de datos MongoDB
+        """
+        self.db = db
+        self.coleccion = db['limites_login']
+    
+    def crear_indices(self):
+        """Crea los índices usados por las consultas del repositorio"""
+        self.coleccion.create_index('expira', expireAfterSeconds=0)
+    
+    def obtener(self, clave):
+        """Devuelve el estado de una clave o None si no existe o expiró"""
+        documento = self.coleccion.find_one({'_id': clave})
+        if not documento or documento['expira'] <= datetime.utcnow():
+            return None
+        return documento['estado']
+    
+    def modificar(self, clave, funcion, ttl_segundos):
+        """
+        Lee, transforma y guarda el estado de una clave de forma atómica
+        
+        Args:
+            clave (str): Clave del estado
+            funcion (callable): Recibe el estado actual (o None) y devuelve el nuevo
+            ttl_segundos (float): Tiempo tras el cual el estado se descarta
+        
+        Returns:
+            dict: Estado nuevo
+        """
+        for _ in range(self.MAX_REINTENTOS):
+            ahora = datetime.utcnow()
+            documento = self.coleccion.find_one({'_id': clave})
+            vigente = documento and documento['expira'] > ahora
+            nuevo = funcion(documento['estado'] if vigente else None)
+            cambios = {
+                'estado': nuevo,
+                'expira': ahora + timedelta(seconds=ttl_segundos)
+            }
+            
+            if documento is None:
+                try:
+                    self.coleccion.insert_one({'_id': clave, 'version': 1, **cambios})
+                    return nuevo
+                except DuplicateKeyError:
+                    continue
+            
+            resultado = self.coleccion.update_one(
+                {'_id': clave, 'version': documento['version']},
+                {'$set': cambios, '$inc': {'version': 1}}
+            )
+            if resultado.modified_count:
+                return nuevo
+        
+        # Mucha contención sobre la clave: se usa el último cálculo sin guardarlo
+        return nuevo
+    
+    def eliminar(self, clave):
+        """Descarta el estado de una clave"""
+        self.coleccion.delete_one({'_id': clave})
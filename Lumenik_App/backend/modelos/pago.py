@@ -0,0 +1,203 @@
+"""
+pago.py - Modelo de Pago (libro de movimientos por cliente)
+"""
+from datetime import datetime
+from bson.objectid import ObjectId
+from pymongo import DESCENDING, UpdateOne
+
+class Pago:
+    """Modelo para un movimiento del libro de pagos"""
+    
+    def __init__(self, cliente_id, registro_id, tipo, monto, concepto=''):
+        """
+        Inicializa un nuevo movimiento
+        
+        Args:
+            cliente_id (str): ID del cliente
+            registro_id (str): ID del registro de trabajo
+            tipo (str): cargo (aumenta la deuda) o pago (la reduce)
+            monto (float): Monto del movimiento (negativo para reversar)
+            concepto (str): Descripción del movimiento
+        """
+        self.cliente_id = cliente_id
+        self.registro_id = registro_id
+        self.tipo = tipo
+        self.monto = float(monto)
+        self.concepto = concepto
+        self.fecha = datetime.now()
+    
+    def a_diccionario(self):
+        """Convierte el movimiento a diccionario para MongoDB"""
+        return {
+            'cliente_id': self.cliente_id,
+            'registro_id': self.registro_id,
+            'tipo': self.tipo,
+            'monto': self.monto,
+            'concepto': self.concepto,
+            'fecha': self.fecha
+        }
+
+class RepositorioPago:
+    """
+    Repositorio para el libro de pagos y los saldos por cliente
+    
+    Cada movimiento son dos escrituras: el documento del libro y el $inc del
+    saldo. Con transacciones (requieren un replica set) ambas se confirman
+    juntas; sin ellas, un fallo entre las dos deja el saldo desfasado del
+    libro hasta que recalcular_saldos lo reconstruye.
+    """
+    
+    def __init__(self, db, transacciones=False):
+        """
+        Inicializa el repositorio
+        
+        Args:
+            db: Instancia de base de datos MongoDB
+            transacciones (bool): Escribir libro y saldo en una misma transacción
+        """
+        self.db = db
+        self.coleccion = db['pagos']
+        self.saldos = db['saldos_clientes']
+        self.transacciones = transacciones
+    
+    def crear_indices(self):
+        """Crea los índices usados por las consultas del repositorio"""
+        self.coleccion.create_index([('cliente_id', 1), ('_id', DESCENDING)])
+        self.coleccion.create_index([('registro_id', 1)])
+        self.saldos.create_index([('pendiente', DESCENDING)])
+    
+    def registrar(self, pago):
+        """
+        Agrega un movimiento al libro y actualiza el saldo del cliente
+        
+        Args:
+            pago (Pago): Movimiento a registrar
+        
+        Returns:
+            str: ID del movimiento
+        """
+        def escribir(sesion):
+            resultado = self.coleccion.insert_one(pago.a_diccionario(), session=sesion)
+            self._aplicar_saldo(pago.cliente_id, pago.tipo, pago.monto, sesion)
+            return str(resultado.inserted_id)
+        
+        return self._en_transaccion(escribir)
+    
+    def registrar_movimiento(self, cliente_id, registro_id, tipo, monto, concepto=''):
+        """Atajo para registrar un movimiento sin construir el modelo"""
+        if not monto:
+            return None
+        return self.registrar(Pago(cliente_id, registro_id, tipo, monto, concepto))
+    
+    def registrar_lote(self, pagos):
+        """
+        Agrega varios movimientos con un insert_many y un solo $inc por cliente
+        
+        Args:
+            pagos (list): Movimientos (Pago) a registrar; los de monto 0 se omiten
+        
+        Returns:
+            int: Número de movimientos registrados
+        """
+        pagos = [p for p in pagos if p.monto]
+        if not pagos:
+            return 0
+        
+        # Acumular los incrementos de cada cliente antes de escribir los saldos
+        incrementos_por_cliente = {}
+        for pago in pagos:
+            incrementos = incrementos_por_cliente.setdefault(pago.cliente_id, {})
+            for campo, monto in self._incrementos_saldo(pago.tipo, pago.monto).items():
+                incrementos[campo] = incrementos.get(campo, 0.0) + monto
+        
+        ahora = datetime.now()
+        
+        def escribir(sesion):
+            self.coleccion.insert_many([p.a_diccionario() for p in pagos], session=sesion)
+            self.saldos.bulk_write([
+                UpdateOne({'_id': cliente_id}, {'$inc': incrementos, '$set': {'actualizado': ahora}}, upsert=True)
+                for cliente_id, incrementos in incrementos_por_cliente.items()
+            ], ordered=False, session=sesion)
+            return len(pagos)
+        
+        return self._en_transaccion(escribir)
+    
+    def _en_transaccion(self, escribir):
+        """Ejecuta escribir(sesion) en una transacción, o sin sesión si están deshabilitadas"""
+        if not self.transacciones:
+            return escribir(None)
+        with self.db.client.start_session() as sesion:
+            return sesion.with_transaction(escribir)
+    
+    def _aplicar_saldo(self, cliente_id, tipo, monto, sesion=None):
+        """Aplica un movimiento al documento de saldo del cliente con un solo $inc"""
+        self.saldos.update_one(
+            {'_id': cliente_id},
+            {'$inc': self._incrementos_saldo(tipo, monto), '$set': {'actualizado': datetime.now()}},
+            upsert=True,
+            session=sesion
+        )
+    
+    @staticmethod
+    def _incrementos_saldo(tipo, monto):
+        """Campos del saldo que mueve un movimiento"""
+        if tipo == 'cargo':
+            return {'facturado': monto, 'pendiente': monto}
+        return {'pagado': monto, 'pendiente': -monto}
+    
+    def obtener_saldo(self, cliente_id):
+        """Obtiene el saldo de un cliente"""
+        return self.saldos.find_one({'_id': cliente_id})
+    
+    def obtener_deudores(self, limite=50):
+        """Obtiene los clientes con saldo pendiente, de mayor a menor deuda"""
+        return list(self.saldos.find({'pendiente': {'$gt': 0}})
+                    .sort('pendiente', DESCENDING)
+                    .limit(limite))
+    
+    def obtener_estado_cuenta(self, cliente_id, antes_de=None, limite=50):
+        """
+        Obtiene los movimientos de un cliente, del más reciente al más antiguo
+        
+        Args:
+            cliente_id (str): ID del cliente
+            antes_de (str): ID del último movimiento de la página anterior (opcional)
+            limite (int): Máximo de movimientos por página
+        
+        Returns:
+            list: Movimientos de la página
+        """
+        filtro = {'cliente_id': cliente_id}
+        if antes_de:
+            try:
+                filtro['_id'] = {'$lt': ObjectId(antes_de)}
+            except:
+                return []
+        
+        return list(self.coleccion.find(filtro).sort('_id', DESCENDING).limit(limite))
+    
+    def obtener_por_registro(self, registro_id):
+        """Obtiene los movimientos de un registro de trabajo"""
+        return list(self.coleccion.find({'registro_id': registro_id}).sort('_id', 1))
+    
+    def recalcular_saldos(self):
+        """
+        Reconstruye los saldos de todos los clientes desde los registros de trabajo
+        
+        Sirve para poblar los saldos de datos previos al libro de pagos y para
+        corregir cualquier diferencia entre el libro y los trabajos.
+        """
+        self.db['registros_trabajo'].aggregate([
+            # Los trabajos archivados también forman parte del saldo
+            {'$unionWith': 'registros_trabajo_archivo'},
+            {'$group': {
+                '_id': '$cliente_id',
+                'facturado': {'$sum': '$costo'},
+                'pagado': {'$sum': {'$ifNull': ['$monto_pagado', 0]}}
+            }},
+            {'$set': {
+                'pendiente': {'$subtract': ['$facturado', '$pagado']},
+                'actualizado': '$$NOW'
+            }},
+            {'$merge': {'into': 'saldos_clientes', 'whenMatched': 'replace'}}
+        ])
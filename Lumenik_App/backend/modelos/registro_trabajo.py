@@ -1,15 +1,42 @@
 """
 registro_trabajo.py - Modelo de Registro de Trabajo
 """
-from datetime import datetime
+import heapq
+from datetime import datetime, timedelta
 from bson.objectid import ObjectId
+from pymongo import ReturnDocument, UpdateOne, DeleteOne
+from pymongo.errors import BulkWriteError
+
+# Los listados no incluyen el historial de pagos embebido
+PROYECCION_LISTADO = {'pagos': 0}
+
+# Solo los trabajos cerrados pueden pasar al archivo
+ESTADOS_CERRADOS = ['completado', 'cancelado']
+
+# Campos que pintan las tarjetas del panel del empleado
+PROYECCION_PANEL = {
+    'cliente_id': 1, 'tipo_servicio': 1, 'descripcion': 1, 'estado': 1, 'costo': 1,
+    'monto_pagado': 1, 'consola': 1, 'juegos_instalados': 1, 'prioridad': 1,
+    'fecha_creacion': 1, 'reclamo_expira': 1
+}
+
+# GB que ocupan los juegos de un trabajo; los registros previos a gb_seleccion
+# guardaban ese peso en total_gb
+GB_TRABAJO = {'$ifNull': ['$gb_seleccion', '$total_gb']}
+
+# Campos que se exportan para contabilidad
+PROYECCION_EXPORTACION = {
+    'cliente_id': 1, 'empleado_id': 1, 'tipo_servicio': 1, 'juegos_instalados': 1,
+    'descripcion': 1, 'costo': 1, 'estado': 1, 'fecha_creacion': 1, 'fecha_fin': 1,
+    'consola': 1, 'gb_seleccion': 1, 'monto_pagado': 1, 'pagos': 1, 'archivado': 1
+}
 
 class RegistroTrabajo:
     """Modelo para registros de trabajos realizados"""
     
     def __init__(self, cliente_id, empleado_id, tipo_servicio, 
                  juegos_instalados=None, descripcion='', 
-                 costo=0.0, estado='pendiente'):
+                 costo=0.0, estado='pendiente', prioridad=0):
         """
         Inicializa un nuevo registro de trabajo
         
@@ -21,6 +48,7 @@ class RegistroTrabajo:
             descripcion (str): Descripción del trabajo
             costo (float): Costo del servicio
             estado (str): pendiente, en_progreso, completado, cancelado
+            prioridad (int): Los trabajos de mayor prioridad se reclaman primero
         """
         self.cliente_id = cliente_id
         self.empleado_id = empleado_id
@@ -29,15 +57,20 @@ class RegistroTrabajo:
         self.descripcion = descripcion
         self.costo = float(costo)
         self.estado = estado
+        self.prioridad = int(prioridad)
         self.fecha_creacion = datetime.now()
         self.fecha_inicio = None
         self.fecha_fin = None
-        self.total_gb = 0.0
+        self.reclamo_expira = None  # Vencimiento del reclamo de un empleado
+        self.total_gb = 0.0  # Espacio del dispositivo del cliente
+        self.gb_seleccion = 0.0  # Peso de los juegos, calculado en el servidor
         self.consola = 'PS4'
         # Campos de pago
         self.monto_pagado = 0.0  # Monto total pagado por el cliente
         self.pagos = []  # Lista de pagos realizados con detalles
         self.completamente_pagado = False  # Flag para indicar si el pago está completo
+        # Se incrementa en cada escritura para detectar ediciones concurrentes
+        self.version = 0
     
     def a_diccionario(self):
         """Convierte el registro a diccionario para MongoDB"""
@@ -49,101 +82,618 @@ class RegistroTrabajo:
             'descripcion': self.descripcion,
             'costo': self.costo,
             'estado': self.estado,
+            'prioridad': self.prioridad,
             'fecha_creacion': self.fecha_creacion,
             'fecha_inicio': self.fecha_inicio,
             'fecha_fin': self.fecha_fin,
+            'reclamo_expira': self.reclamo_expira,
             'total_gb': self.total_gb,
+            'gb_seleccion': self.gb_seleccion,
             'consola': self.consola,
             'monto_pagado': self.monto_pagado,
             'pagos': self.pagos,
-            'completamente_pagado': self.completamente_pagado
+            'completamente_pagado': self.completamente_pagado,
+            'version': self.version
         }
 
 class RepositorioRegistroTrabajo:
     """Repositorio para operaciones CRUD de registros de trabajo"""
     
-    def __init__(self, db):
+    def __init__(self, db, cache_reportes=None):
         """
         Inicializa el repositorio
         
         Args:
             db: Instancia de base de datos MongoDB
+            cache_reportes (CacheTTL): Caché de series de reportes; se invalida
+                con cada escritura de este repositorio (opcional)
         """
         self.db = db
         self.coleccion = db['registros_trabajo']
+        # Trabajos cerrados antiguos, fuera del conjunto de trabajo
+        self.archivo = db['registros_trabajo_archivo']
+        self.cache_reportes = cache_reportes
+    
+    def crear_indices(self):
+        """Crea los índices usados por las consultas del repositorio"""
+        self.coleccion.create_index([('fecha_creacion', -1)])
+        self.coleccion.create_index([('empleado_id', 1), ('estado', 1), ('fecha_creacion', -1)])
+        self.coleccion.create_index([('cliente_id', 1), ('fecha_creacion', -1)])
+        # Cola de trabajos sin asignar, en el orden en que se reclaman
+        self.coleccion.create_index(
+            [('prioridad', -1), ('fecha_creacion', 1), ('consola', 1)],
+            name='cola_sin_asignar',
+            partialFilterExpression={'estado': 'pendiente', 'empleado_id': 'sin_asignar'}
+        )
+        self.coleccion.create_index(
+            [('reclamo_expira', 1)],
+            name='reclamos_activos',
+            partialFilterExpression={'reclamo_expira': {'$type': 'date'}}
+        )
+        self.archivo.create_index([('fecha_creacion', -1)])
+        self.archivo.create_index([('cliente_id', 1), ('fecha_creacion', -1)])
+        self.archivo.create_index([('empleado_id', 1), ('fecha_creacion', -1)])
+        self.archivo.create_index([('estado', 1)])
     
     def crear(self, registro):
         """Crea un nuevo registro de trabajo"""
         resultado = self.coleccion.insert_one(registro.a_diccionario())
+        self.invalidar_reportes()
         return str(resultado.inserted_id)
     
-    def obtener_por_id(self, registro_id):
-        """Obtiene registro por ID"""
+    def obtener_por_id(self, registro_id, incluir_historial=False):
+        """Obtiene registro por ID (y lo busca en el archivo si se pide el historial)"""
         try:
             registro = self.coleccion.find_one({'_id': ObjectId(registro_id)})
+            if not registro and incluir_historial:
+                registro = self.archivo.find_one({'_id': ObjectId(registro_id)})
             return registro
         except:
             return None
     
-    def obtener_por_cliente(self, cliente_id):
+    def obtener_por_ids(self, registro_ids, proyeccion=PROYECCION_LISTADO):
+        """
+        Obtiene varios registros con una sola consulta $in
+        
+        Args:
+            registro_ids (list): IDs de los registros (los inválidos se ignoran)
+            proyeccion (dict): Campos a devolver
+        
+        Returns:
+            dict: ID (str) -> registro
+        """
+        ids = []
+        for registro_id in registro_ids:
+            try:
+                ids.append(ObjectId(registro_id))
+            except:
+                continue
+        
+        if not ids:
+            return {}
+        
+        return {str(r['_id']): r for r in self.coleccion.find({'_id': {'$in': ids}}, proyeccion)}
+    
+    def obtener_por_cliente(self, cliente_id, incluir_historial=False):
         """Obtiene todos los registros de un cliente"""
         try:
-            return list(self.coleccion.find({'cliente_id': cliente_id}).sort('fecha_creacion', -1))
+            return self._listar({'cliente_id': cliente_id}, incluir_historial)
         except:
             return []
     
-    def obtener_por_empleado(self, empleado_id):
+    def obtener_por_empleado(self, empleado_id, incluir_historial=False):
         """Obtiene todos los registros de un empleado"""
         try:
-            return list(self.coleccion.find({'empleado_id': empleado_id}).sort('fecha_creacion', -1))
+            return self._listar({'empleado_id': empleado_id}, incluir_historial)
         except:
             return []
     
     def obtener_pendientes(self):
         """Obtiene todos los registros pendientes"""
-        return list(self.coleccion.find({'estado': 'pendiente'}).sort('fecha_creacion', 1))
+        return list(self.coleccion.find({'estado': 'pendiente'}, PROYECCION_LISTADO).sort('fecha_creacion', 1))
     
     def obtener_pendientes_empleado(self, empleado_id):
         """Obtiene registros pendientes de un empleado"""
         return list(self.coleccion.find({
             'empleado_id': empleado_id,
             'estado': 'pendiente'
-        }).sort('fecha_creacion', 1))
+        }, PROYECCION_LISTADO).sort('fecha_creacion', 1))
+    
+    def listar_empleado(self, empleado_id, estado=None, limite=0, proyeccion=PROYECCION_LISTADO):
+        """
+        Lista los registros de un empleado del más reciente al más antiguo
+        
+        Args:
+            empleado_id (str): ID del empleado
+            estado (str): Filtrar por estado (opcional)
+            limite (int): Máximo de registros (0 = todos)
+            proyeccion (dict): Campos a devolver
+        """
+        filtro = {'empleado_id': empleado_id}
+        if estado:
+            filtro['estado'] = estado
+        return list(self.coleccion.find(filtro, proyeccion).sort('fecha_creacion', -1).limit(limite))
     
-    def obtener_todos(self):
+    def obtener_todos(self, incluir_historial=False):
         """Obtiene todos los registros"""
-        return list(self.coleccion.find({}).sort('fecha_creacion', -1))
+        return self._listar({}, incluir_historial)
+    
+    def obtener_recientes(self, limite):
+        """Obtiene los registros más recientes del conjunto activo"""
+        return list(self.coleccion.find({}, PROYECCION_LISTADO).sort('fecha_creacion', -1).limit(limite))
+    
+    def _listar(self, filtro, incluir_historial=False):
+        """
+        Lista registros del más reciente al más antiguo
+        
+        Args:
+            filtro (dict): Filtro de MongoDB
+            incluir_historial (bool): Unir también los registros archivados
+        """
+        if not incluir_historial:
+            return list(self.coleccion.find(filtro, PROYECCION_LISTADO).sort('fecha_creacion', -1))
+        
+        return list(self.coleccion.aggregate([
+            {'$match': filtro},
+            {'$unionWith': {'coll': self.archivo.name, 'pipeline': [{'$match': filtro}]}},
+            {'$project': PROYECCION_LISTADO},
+            {'$sort': {'fecha_creacion': -1}}
+        ]))
     
     def actualizar(self, registro_id, datos):
-        """Actualiza un registro"""
+        """Actualiza un registro (devuelve True si el registro existe)"""
         try:
             resultado = self.coleccion.update_one(
                 {'_id': ObjectId(registro_id)},
-                {'$set': datos}
+                {'$set': datos, '$inc': {'version': 1}}
             )
-            return resultado.modified_count > 0
         except:
             return False
+        
+        self.invalidar_reportes()
+        return resultado.matched_count > 0
+    
+    def actualizar_pendiente(self, registro_id, datos, version=None):
+        """
+        Actualiza un registro solo si sigue pendiente, en una sola escritura
+        
+        Args:
+            registro_id (str): ID del registro
+            datos (dict): Campos a actualizar
+            version (int): Versión que el cliente editó (opcional)
+        
+        Returns:
+            dict: Registro antes del cambio o None si no existe, no está
+                  pendiente o la versión no coincide
+        """
+        try:
+            filtro = {'_id': ObjectId(registro_id), 'estado': 'pendiente'}
+        except:
+            return None
+        
+        if version is not None:
+            # Los registros anteriores al campo version cuentan como versión 0
+            filtro['version'] = {'$in': [0, None]} if version == 0 else version
+        
+        registro = self.coleccion.find_one_and_update(
+            filtro,
+            {'$set': datos, '$inc': {'version': 1}},
+            projection=PROYECCION_LISTADO,
+            return_document=ReturnDocument.BEFORE
+        )
+        if registro:
+            self.invalidar_reportes()
+        return registro
     
     def cambiar_estado(self, registro_id, nuevo_estado):
         """Cambia el estado de un registro"""
+        return self.actualizar(registro_id, self._datos_cambio_estado(nuevo_estado))
+    
+    @staticmethod
+    def _datos_cambio_estado(nuevo_estado):
+        """Campos que se escriben al cambiar el estado de un registro"""
         datos = {
             'estado': nuevo_estado,
         }
         if nuevo_estado == 'en_progreso':
             datos['fecha_inicio'] = datetime.now()
-        elif nuevo_estado == 'completado':
-            datos['fecha_fin'] = datetime.now()
+        else:
+            # Un trabajo que sale de en_progreso ya no tiene reclamo que vencer
+            datos['reclamo_expira'] = None
+            if nuevo_estado == 'completado':
+                datos['fecha_fin'] = datetime.now()
+        return datos
+    
+    def reclamar_siguiente(self, empleado_id, consolas=None, duracion_minutos=30):
+        """
+        Asigna atómicamente al empleado el siguiente trabajo de la cola
+        
+        Toma el trabajo sin asignar de mayor prioridad y más antiguo, o uno
+        cuyo reclamo venció (el empleado anterior lo abandonó).
+        
+        Args:
+            empleado_id (str): ID del empleado que reclama
+            consolas (list): Consolas que atiende el empleado (vacío = todas)
+            duracion_minutos (int): Duración del reclamo antes de volver a la cola
+        
+        Returns:
+            dict: Registro reclamado (ya en_progreso) o None si la cola está vacía
+        """
+        ahora = datetime.now()
+        filtro = {'$or': [
+            {'estado': 'pendiente', 'empleado_id': 'sin_asignar'},
+            {'estado': 'en_progreso', 'reclamo_expira': {'$lt': ahora}}
+        ]}
+        if consolas:
+            filtro['consola'] = {'$in': consolas}
+        
+        registro = self.coleccion.find_one_and_update(
+            filtro,
+            {
+                '$set': {
+                    'empleado_id': empleado_id,
+                    'estado': 'en_progreso',
+                    'fecha_inicio': ahora,
+                    'reclamo_expira': ahora + timedelta(minutes=duracion_minutos)
+                },
+                '$inc': {'version': 1}
+            },
+            sort=[('prioridad', -1), ('fecha_creacion', 1)],
+            projection=PROYECCION_LISTADO,
+            return_document=ReturnDocument.AFTER
+        )
+        if registro:
+            self.invalidar_reportes()
+        return registro
+    
+    def obtener_asignables(self, empleados_activos, limite=1000):
+        """
+        Obtiene los trabajos pendientes que necesitan empleado, en orden de prioridad
+        
+        Incluye los sin asignar y los asignados a empleados que ya no están activos.
+        """
+        return list(self.coleccion.find(
+            {'estado': 'pendiente', 'empleado_id': {'$nin': empleados_activos}},
+            {'empleado_id': 1, 'consola': 1, 'gb_seleccion': 1, 'total_gb': 1}
+        ).sort([('prioridad', -1), ('fecha_creacion', 1)]).limit(limite))
+    
+    def obtener_carga_por_empleado(self, empleado_ids):
+        """
+        Calcula los trabajos y GB abiertos (pendientes o en progreso) por empleado
+        
+        Returns:
+            dict: empleado_id -> {'trabajos': int, 'gb': float}
+        """
+        resultado = self.coleccion.aggregate([
+            {'$match': {
+                'estado': {'$in': ['pendiente', 'en_progreso']},
+                'empleado_id': {'$in': empleado_ids}
+            }},
+            {'$group': {
+                '_id': '$empleado_id',
+                'trabajos': {'$sum': 1},
+                'gb': {'$sum': GB_TRABAJO}
+            }}
+        ])
+        return {c['_id']: {'trabajos': c['trabajos'], 'gb': c['gb']} for c in resultado}
+    
+    def asignar_lote(self, asignaciones):
+        """
+        Escribe un lote de asignaciones con un solo bulk_write
+        
+        Cada actualización exige que el trabajo siga pendiente y con el mismo
+        empleado que se leyó, para no pisar un reclamo concurrente.
+        
+        Args:
+            asignaciones (list): Tuplas (registro, empleado_id)
+        
+        Returns:
+            int: Número de trabajos asignados
+        """
+        if not asignaciones:
+            return 0
+        
+        operaciones = [
+            UpdateOne(
+                {'_id': registro['_id'], 'estado': 'pendiente', 'empleado_id': registro.get('empleado_id')},
+                {'$set': {'empleado_id': empleado_id}, '$inc': {'version': 1}}
+            )
+            for registro, empleado_id in asignaciones
+        ]
+        resultado = self.coleccion.bulk_write(operaciones, ordered=False)
+        if resultado.modified_count:
+            self.invalidar_reportes()
+        return resultado.modified_count
+    
+    def renovar_reclamo(self, registro_id, empleado_id, duracion_minutos=30):
+        """Extiende el reclamo de un trabajo si el empleado aún lo tiene asignado"""
+        try:
+            resultado = self.coleccion.update_one(
+                {
+                    '_id': ObjectId(registro_id),
+                    'empleado_id': empleado_id,
+                    'estado': 'en_progreso',
+                    'reclamo_expira': {'$type': 'date'}
+                },
+                {'$set': {'reclamo_expira': datetime.now() + timedelta(minutes=duracion_minutos)}}
+            )
+            return resultado.matched_count > 0
+        except:
+            return False
+    
+    def registrar_pago(self, registro_id, monto):
+        """
+        Agrega un pago de forma atómica sin exceder el costo del trabajo
+        
+        Args:
+            registro_id (str): ID del registro
+            monto (float): Monto a abonar
+        
+        Returns:
+            dict: Registro actualizado (costo, monto_pagado) o None si no existe
+                  o el pago excede lo adeudado
+        """
+        try:
+            filtro = {
+                '_id': ObjectId(registro_id),
+                '$expr': {'$lte': [
+                    {'$add': [{'$ifNull': ['$monto_pagado', 0]}, monto]},
+                    '$costo'
+                ]}
+            }
+        except:
+            return None
+        
+        # Pipeline de actualización: el pago y la marca de saldado se escriben juntos,
+        # así un reinicio de pagos concurrente nunca deja la marca sin el monto
+        pago = {'monto': monto, 'fecha': datetime.now().isoformat()}
+        registro = self.coleccion.find_one_and_update(
+            filtro,
+            [
+                {'$set': {
+                    'pagos': {'$concatArrays': [{'$ifNull': ['$pagos', []]}, [pago]]},
+                    'monto_pagado': {'$add': [{'$ifNull': ['$monto_pagado', 0]}, monto]},
+                    'version': {'$add': [{'$ifNull': ['$version', 0]}, 1]}
+                }},
+                {'$set': {'completamente_pagado': {'$gte': ['$monto_pagado', '$costo']}}}
+            ],
+            projection={'cliente_id': 1, 'costo': 1, 'monto_pagado': 1, 'completamente_pagado': 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if registro:
+            self.invalidar_reportes()
+        return registro
+    
+    def reiniciar_pagos(self, registro_id, nuevo_costo=None):
+        """
+        Limpia el historial de pagos y opcionalmente asigna un nuevo costo
+        
+        Args:
+            registro_id (str): ID del registro
+            nuevo_costo (float): Nuevo costo total (opcional)
+        
+        Returns:
+            dict: Registro antes del cambio (cliente_id, costo, monto_pagado)
+                  o None si no existe
+        """
+        datos = {
+            'monto_pagado': 0.0,
+            'pagos': [],
+            'completamente_pagado': False
+        }
+        if nuevo_costo is not None:
+            datos['costo'] = nuevo_costo
+        
+        try:
+            registro = self.coleccion.find_one_and_update(
+                {'_id': ObjectId(registro_id)},
+                {'$set': datos, '$inc': {'version': 1}},
+                projection={'cliente_id': 1, 'costo': 1, 'monto_pagado': 1},
+                return_document=ReturnDocument.BEFORE
+            )
+        except:
+            return None
         
-        return self.actualizar(registro_id, datos)
+        if registro:
+            self.invalidar_reportes()
+        return registro
     
     def eliminar(self, registro_id):
         """Elimina un registro"""
         try:
             resultado = self.coleccion.delete_one({'_id': ObjectId(registro_id)})
-            return resultado.deleted_count > 0
         except:
             return False
+        
+        self.invalidar_reportes()
+        return resultado.deleted_count > 0
+    
+    def eliminar_pendiente(self, registro_id):
+        """
+        Elimina un registro solo si está pendiente, en una sola operación
+        
+        Returns:
+            dict: Registro eliminado o None si no existe o no está pendiente
+        """
+        try:
+            registro = self.coleccion.find_one_and_delete(
+                {'_id': ObjectId(registro_id), 'estado': 'pendiente'},
+                projection=PROYECCION_LISTADO
+            )
+        except:
+            return None
+        
+        if registro:
+            self.invalidar_reportes()
+        return registro
+    
+    def aplicar_lote(self, operaciones):
+        """
+        Aplica un lote de operaciones con un solo bulk_write no ordenado
+        
+        Cada escritura exige la versión con que se leyó el registro, así que los
+        montos calculados a partir de esa lectura siguen siendo exactos. Las
+        actualizaciones marcan el registro con el ID del lote para saber, si
+        alguna falla, cuáles se aplicaron sin leer más que una vez.
+        
+        Args:
+            operaciones (list): Dicts con accion (estado, asignar, pago o
+                eliminar), registro (documento leído antes) y valor
+        
+        Returns:
+            set: IDs (str) de los registros en que la operación se aplicó
+        """
+        if not operaciones:
+            return set()
+        
+        lote_id = ObjectId()
+        ahora = datetime.now()
+        escrituras = []
+        
+        for operacion in operaciones:
+            registro = operacion['registro']
+            accion = operacion['accion']
+            valor = operacion.get('valor')
+            version = registro.get('version') or 0
+            filtro = {
+                '_id': registro['_id'],
+                # Los registros anteriores al campo version cuentan como versión 0
+                'version': {'$in': [0, None]} if version == 0 else version
+            }
+            
+            if accion == 'eliminar':
+                filtro['estado'] = 'pendiente'
+                escrituras.append(DeleteOne(filtro))
+                continue
+            
+            cambios = {'$set': {'lote_id': lote_id}, '$inc': {'version': 1}}
+            if accion == 'estado':
+                cambios['$set'].update(self._datos_cambio_estado(valor))
+            elif accion == 'asignar':
+                cambios['$set'].update({'empleado_id': valor, 'reclamo_expira': None})
+            elif accion == 'pago':
+                monto_pagado = float(registro.get('monto_pagado') or 0) + valor
+                cambios['$push'] = {'pagos': {'monto': valor, 'fecha': ahora.isoformat()}}
+                cambios['$inc']['monto_pagado'] = valor
+                cambios['$set']['completamente_pagado'] = monto_pagado >= float(registro.get('costo') or 0)
+            escrituras.append(UpdateOne(filtro, cambios))
+        
+        resultado = self.coleccion.bulk_write(escrituras, ordered=False)
+        if resultado.modified_count or resultado.deleted_count:
+            self.invalidar_reportes()
+        ids = [operacion['registro']['_id'] for operacion in operaciones]
+        
+        if resultado.modified_count + resultado.deleted_count == len(escrituras):
+            return {str(i) for i in ids}
+        
+        # Alguna escritura perdió contra un cambio concurrente: ver cuáles se aplicaron
+        actuales = {r['_id']: r for r in self.coleccion.find({'_id': {'$in': ids}}, {'lote_id': 1})}
+        aplicadas = set()
+        for operacion in operaciones:
+            registro_id = operacion['registro']['_id']
+            actual = actuales.get(registro_id)
+            if operacion['accion'] == 'eliminar':
+                if actual is None:
+                    aplicadas.add(str(registro_id))
+            elif actual is not None and actual.get('lote_id') == lote_id:
+                aplicadas.add(str(registro_id))
+        return aplicadas
+    
+    def obtener_archivables(self, corte, despues_de=None, limite=500):
+        """
+        Obtiene un lote de trabajos cerrados antes de la fecha de corte, en orden de _id
+        
+        Los completados solo se archivan si ya están pagados, porque todavía
+        pueden recibir pagos.
+        
+        Args:
+            corte (datetime): Fecha límite de cierre
+            despues_de (ObjectId): Último _id del lote anterior (opcional)
+            limite (int): Tamaño del lote
+        """
+        filtro = {'$and': [
+            {'$or': [
+                {'estado': 'cancelado'},
+                {'estado': 'completado', 'completamente_pagado': True}
+            ]},
+            {'$or': [
+                {'fecha_fin': {'$lt': corte}},
+                {'fecha_fin': None, 'fecha_creacion': {'$lt': corte}}
+            ]}
+        ]}
+        if despues_de:
+            filtro['_id'] = {'$gt': despues_de}
+        
+        return list(self.coleccion.find(filtro).sort('_id', 1).limit(limite))
+    
+    def archivar(self, registros):
+        """
+        Mueve registros al archivo: primero los copia y luego los borra de la colección activa
+        
+        Es idempotente, así que un lote interrumpido puede repetirse. Cada borrado
+        exige la versión copiada; si un registro cambió entretanto, se queda en
+        la colección activa y su copia se descarta.
+        
+        Args:
+            registros (list): Documentos completos leídos con obtener_archivables
+        
+        Returns:
+            int: Número de registros archivados
+        """
+        if not registros:
+            return 0
+        
+        ahora = datetime.now()
+        try:
+            self.archivo.insert_many([dict(r, archivado=ahora) for r in registros], ordered=False)
+        except BulkWriteError as e:
+            # Al repetir un lote ya copiado los duplicados se ignoran
+            if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                raise
+        
+        resultado = self.coleccion.bulk_write([
+            DeleteOne({'_id': r['_id'], 'version': r.get('version'), 'estado': {'$in': ESTADOS_CERRADOS}})
+            for r in registros
+        ], ordered=False)
+        
+        if resultado.deleted_count < len(registros):
+            ids = [r['_id'] for r in registros]
+            siguen_activos = [r['_id'] for r in self.coleccion.find({'_id': {'$in': ids}}, {'_id': 1})]
+            self.archivo.delete_many({'_id': {'$in': siguen_activos}})
+        
+        return resultado.deleted_count
+    
+    def iterar_exportacion(self, fecha_inicio=None, fecha_fin=None, despues_de=None, tamano_lote=500):
+        """
+        Recorre los registros activos y archivados en orden de _id sin cargarlos en memoria
+        
+        Los dos cursores se mezclan a medida que se leen, así que el orden por
+        _id es global y una exportación puede reanudarse desde el último _id.
+        
+        Args:
+            fecha_inicio (datetime): Inicio del rango de creación (opcional)
+            fecha_fin (datetime): Fin exclusivo del rango de creación (opcional)
+            despues_de (ObjectId): Último _id ya exportado (opcional)
+            tamano_lote (int): Documentos por lote de red de cada cursor
+        
+        Returns:
+            iterator: Registros con PROYECCION_EXPORTACION
+        """
+        filtro = {}
+        if fecha_inicio or fecha_fin:
+            filtro['fecha_creacion'] = {}
+            if fecha_inicio:
+                filtro['fecha_creacion']['$gte'] = fecha_inicio
+            if fecha_fin:
+                filtro['fecha_creacion']['$lt'] = fecha_fin
+        if despues_de:
+            filtro['_id'] = {'$gt': despues_de}
+        
+        cursores = [
+            coleccion.find(filtro, PROYECCION_EXPORTACION).sort('_id', 1).batch_size(tamano_lote)
+            for coleccion in (self.coleccion, self.archivo)
+        ]
+        return heapq.merge(*cursores, key=lambda r: r['_id'])
     
     def obtener_por_fecha(self, fecha_inicio, fecha_fin):
         """Obtiene registros en un rango de fechas"""
@@ -154,10 +704,54 @@ class RepositorioRegistroTrabajo:
             }
         }).sort('fecha_creacion', -1))
     
+    def obtener_serie_temporal(self, fecha_inicio, fecha_fin, unidad):
+        """
+        Agrupa los registros de un rango de fechas en intervalos de tiempo
+        
+        Args:
+            fecha_inicio (datetime): Inicio del rango (inclusivo)
+            fecha_fin (datetime): Fin del rango (exclusivo)
+            unidad (str): day, week o month (unidades de $dateTrunc)
+        
+        Returns:
+            list: Un documento por intervalo con trabajos, ingresos, gb y duración promedio
+        """
+        filtro = {'fecha_creacion': {'$gte': fecha_inicio, '$lt': fecha_fin}}
+        resultado = self.coleccion.aggregate([
+            {'$match': filtro},
+            # Los reportes cubren también los trabajos archivados
+            {'$unionWith': {'coll': self.archivo.name, 'pipeline': [{'$match': filtro}]}},
+            {'$group': {
+                '_id': {'$dateTrunc': {'date': '$fecha_creacion', 'unit': unidad}},
+                'trabajos': {'$sum': 1},
+                'ingresos': {'$sum': {
+                    '$cond': [{'$eq': ['$estado', 'completado']}, '$costo', 0]
+                }},
+                'gb': {'$sum': GB_TRABAJO},
+                # $avg ignora los null, así que solo promedia trabajos terminados
+                'duracion_promedio_ms': {'$avg': {
+                    '$cond': [
+                        {'$and': [{'$gt': ['$fecha_inicio', None]}, {'$gt': ['$fecha_fin', None]}]},
+                        {'$subtract': ['$fecha_fin', '$fecha_inicio']},
+                        None
+                    ]
+                }}
+            }},
+            {'$sort': {'_id': 1}}
+        ])
+        return list(resultado)
+    
+    def invalidar_reportes(self):
+        """Descarta las series de reportes en caché tras una escritura"""
+        if self.cache_reportes:
+            self.cache_reportes.invalidar()
+    
     def obtener_ingresos_total(self):
-        """Calcula el ingreso total"""
+        """Calcula el ingreso total (incluye los trabajos archivados)"""
+        filtro = {'estado': 'completado'}
         resultado = self.coleccion.aggregate([
-            {'$match': {'estado': 'completado'}},
+            {'$match': filtro},
+            {'$unionWith': {'coll': self.archivo.name, 'pipeline': [{'$match': filtro}]}},
             {'$group': {'_id': None, 'total': {'$sum': '$costo'}}}
         ])
         resultado_list = list(resultado)
@@ -165,13 +759,17 @@ class RepositorioRegistroTrabajo:
     
     def obtener_estadisticas(self):
         """Obtiene estadísticas generales"""
-        total_registros = self.coleccion.count_documents({})
-        registros_completados = self.coleccion.count_documents({'estado': 'completado'})
+        # Los archivados siguen contando en los totales
+        registros_archivados = self.archivo.estimated_document_count()
+        total_registros = self.coleccion.count_documents({}) + registros_archivados
+        registros_completados = (self.coleccion.count_documents({'estado': 'completado'})
+                                 + self.archivo.count_documents({'estado': 'completado'}))
         registros_pendientes = self.coleccion.count_documents({'estado': 'pendiente'})
         
         return {
             'total_registros': total_registros,
             'completados': registros_completados,
             'pendientes': registros_pendientes,
+            'archivados': registros_archivados,
             'ingresos_total': self.obtener_ingresos_total()
         }
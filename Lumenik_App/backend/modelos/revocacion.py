@@ -0,0 +1,118 @@
+"""
+revocacion.py - Modelo de revocaciones de tokens por usuario
+"""
+import time
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+
+# Campos que necesita el índice en memoria
+PROYECCION_REVOCACION = {'_id': 0, 'usuario_id': 1, 'revocado': 1, 'no_valido_antes': 1, 'fecha': 1}
+
+class RepositorioRevocacion:
+    """
+    Repositorio de revocaciones: un documento por usuario
+    
+    Cada documento guarda si el usuario está revocado (inactivo o eliminado)
+    y desde cuándo son válidos sus tokens (no_valido_antes, en segundos epoch
+    como el iat del JWT). La colección se mantiene pequeña: solo tiene
+    usuarios revocados alguna vez y un índice TTL borra los documentos cuando
+    ya no puede quedar ningún token emitido antes de la revocación.
+    """
+    
+    def __init__(self, db, vigencia_tokens=timedelta(hours=24)):
+        """
+        Inicializa el repositorio
+        
+        Args:
+            db: Instancia de base de datos MongoDB
+            vigencia_tokens (timedelta): Duración de los tokens; pasado ese
+                tiempo una revocación ya no tiene tokens que invalidar
+        """
+        self.db = db
+        self.coleccion = db['revocaciones']
+        self.vigencia_tokens = vigencia_tokens
+    
+    def crear_indices(self):
+        """Crea los índices usados por las consultas del repositorio"""
+        self.coleccion.create_index('usuario_id', unique=True)
+        self.coleccion.create_index('fecha')
+        self.coleccion.create_index('fecha_expiracion', expireAfterSeconds=0)
+    
+    def registrar(self, usuario_id, revocado):
+        """
+        Registra una revocación (o su levantamiento) para un usuario
+        
+        Al revocar, los tokens emitidos hasta ahora dejan de ser válidos y el
+        usuario no puede usar ninguno mientras siga revocado. Al levantarla se
+        conserva no_valido_antes, así que los tokens anteriores a la
+        revocación siguen sin servir.
+        
+        Args:
+            usuario_id (str): ID del usuario
+            revocado (bool): True al desactivar o eliminar, False al reactivar
+        
+        Returns:
+            dict: Documento guardado
+        """
+        ahora = datetime.utcnow()
+        cambios = {
+            'revocado': revocado,
+            'fecha': ahora,
+            'fecha_expiracion': ahora + self.vigencia_tokens
+        }
+        actualizacion = {'$set': cambios}
+        if revocado:
+            cambios['no_valido_antes'] = time.time()
+        else:
+            actualizacion['$setOnInsert'] = {'no_valido_antes': 0}
+        
+        return self.coleccion.find_one_and_update(
+            {'usuario_id': str(usuario_id)},
+            actualizacion,
+            projection=PROYECCION_REVOCACION,
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    
+    def invalidar_anteriores(self, usuario_id):
+        """
+        Invalida los tokens emitidos hasta ahora sin revocar al usuario
+        
+        Mueve no_valido_antes al momento actual y conserva revocado (False si
+        el usuario no tenía documento), así que un cambio de contraseña no
+        reactiva a un usuario desactivado entretanto.
+        
+        Args:
+            usuario_id (str): ID del usuario
+        
+        Returns:
+            dict: Documento guardado
+        """
+        ahora = datetime.utcnow()
+        return self.coleccion.find_one_and_update(
+            {'usuario_id': str(usuario_id)},
+            {
+                '$set': {
+                    'no_valido_antes': time.time(),
+                    'fecha': ahora,
+                    'fecha_expiracion': ahora + self.vigencia_tokens
+                },
+                '$setOnInsert': {'revocado': False}
+            },
+            projection=PROYECCION_REVOCACION,
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    
+    def obtener_desde(self, fecha=None):
+        """
+        Obtiene las revocaciones registradas a partir de una fecha
+        
+        Args:
+            fecha (datetime): Fecha UTC desde la que leer; None para todas
+        
+        Returns:
+            list: Documentos {usuario_id, revocado, no_valido_antes, fecha}
+        """
+        filtro = {'fecha': {'$gte': fecha}} if fecha else {}
+        return list(self.coleccion.find(filtro, PROYECCION_REVOCACION))
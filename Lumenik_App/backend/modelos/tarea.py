@@ -0,0 +1,147 @@
+"""
+tarea.py - Modelo de Tarea en segundo plano (reanudable)
+"""
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument, DESCENDING
+
+class Tarea:
+    """Modelo para una tarea larga que se ejecuta en segundo plano"""
+    
+    def __init__(self, tipo, parametros=None):
+        """
+        Inicializa una nueva tarea
+        
+        Args:
+            tipo (str): Tipo de tarea (define qué manejador la ejecuta)
+            parametros (dict): Parámetros de la tarea
+        """
+        self.tipo = tipo
+        self.parametros = parametros or {}
+        self.estado = 'pendiente'  # pendiente, en_progreso, completada, fallida
+        self.cursor = None  # Punto desde el que se reanuda
+        self.procesados = 0
+        self.resultado = None
+        self.error = None
+        self.fecha_creacion = datetime.now()
+        self.fecha_inicio = None
+        self.fecha_fin = None
+        self.latido = None  # Última señal de vida del proceso que la ejecuta
+    
+    def a_diccionario(self):
+        """Convierte la tarea a diccionario para MongoDB"""
+        return {
+            'tipo': self.tipo,
+            'parametros': self.parametros,
+            'estado': self.estado,
+            'cursor': self.cursor,
+            'procesados': self.procesados,
+            'resultado': self.resultado,
+            'error': self.error,
+            'fecha_creacion': self.fecha_creacion,
+            'fecha_inicio': self.fecha_inicio,
+            'fecha_fin': self.fecha_fin,
+            'latido': self.latido
+        }
+
+class RepositorioTarea:
+    """Repositorio para las tareas en segundo plano"""
+    
+    def __init__(self, db):
+        """
+        Inicializa el repositorio
+        
+        Args:
+            db: Instancia de base de datos MongoDB
+        """
+        self.db = db
+        self.coleccion = db['tareas']
+    
+    def crear_indices(self):
+        """Crea los índices usados por las consultas del repositorio"""
+        self.coleccion.create_index([('estado', 1), ('latido', 1)])
+        self.coleccion.create_index([('tipo', 1), ('_id', DESCENDING)])
+    
+    def crear(self, tarea):
+        """Crea una nueva tarea"""
+        resultado = self.coleccion.insert_one(tarea.a_diccionario())
+        return str(resultado.inserted_id)
+    
+    def obtener_por_id(self, tarea_id):
+        """Obtiene una tarea por ID"""
+        try:
+            return self.coleccion.find_one({'_id': ObjectId(tarea_id)})
+        except:
+            return None
+    
+    def obtener_recientes(self, tipo=None, limite=20):
+        """Obtiene las últimas tareas, opcionalmente de un tipo"""
+        filtro = {'tipo': tipo} if tipo else {}
+        return list(self.coleccion.find(filtro).sort('_id', DESCENDING).limit(limite))
+    
+    def tomar(self, tarea_id, vigencia_segundos=120):
+        """
+        Marca una tarea como en_progreso si nadie más la está ejecutando
+        
+        Una tarea en_progreso cuyo latido venció quedó huérfana (el proceso se
+        detuvo) y puede retomarse desde su cursor.
+        
+        Returns:
+            dict: Tarea tomada o None si otro proceso la tiene o ya terminó
+        """
+        ahora = datetime.now()
+        try:
+            filtro = {
+                '_id': ObjectId(tarea_id),
+                '$or': [
+                    {'estado': 'pendiente'},
+                    {'estado': 'en_progreso', 'latido': {'$lt': ahora - timedelta(seconds=vigencia_segundos)}}
+                ]
+            }
+        except:
+            return None
+        
+        return self.coleccion.find_one_and_update(
+            filtro,
+            # Pipeline de actualización para conservar la fecha de inicio al reanudar
+            [{'$set': {
+                'estado': 'en_progreso',
+                'latido': ahora,
+                'fecha_inicio': {'$ifNull': ['$fecha_inicio', ahora]}
+            }}],
+            return_document=ReturnDocument.AFTER
+        )
+    
+    def obtener_reanudables(self, vigencia_segundos=120):
+        """Obtiene los IDs de tareas pendientes o huérfanas"""
+        limite_latido = datetime.now() - timedelta(seconds=vigencia_segundos)
+        tareas = self.coleccion.find(
+            {'$or': [
+                {'estado': 'pendiente'},
+                {'estado': 'en_progreso', 'latido': {'$lt': limite_latido}}
+            ]},
+            {'_id': 1}
+        ).sort('_id', 1)
+        return [str(t['_id']) for t in tareas]
+    
+    def guardar_progreso(self, tarea_id, cursor, procesados):
+        """Guarda el punto de reanudación y suma los elementos procesados"""
+        self.coleccion.update_one(
+            {'_id': ObjectId(tarea_id)},
+            {
+                '$set': {'cursor': cursor, 'latido': datetime.now()},
+                '$inc': {'procesados': procesados}
+            }
+        )
+    
+    def finalizar(self, tarea_id, estado, resultado=None, error=None):
+        """Marca una tarea como completada o fallida"""
+        self.coleccion.update_one(
+            {'_id': ObjectId(tarea_id)},
+            {'$set': {
+                'estado': estado,
+                'resultado': resultado,
+                'error': error,
+                'fecha_fin': datetime.now()
+            }}
+        )
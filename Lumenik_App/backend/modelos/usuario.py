@@ -3,14 +3,65 @@ usuario.py - Modelo de Usuario
 """
 from datetime import datetime
 from bson.objectid import ObjectId
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
 import os
+import re
+import unicodedata
+
+# Roles que aparecen en la gestión de usuarios (los administradores no)
+ROLES_GESTIONABLES = ['empleado', 'cliente']
+ESTADOS_USUARIO = ['activo', 'inactivo']
+# Usuario dado de baja cuyos datos se están borrando en segundo plano; no aparece en ningún listado
+ESTADO_ELIMINADO = 'eliminado'
+
+# Campos del listado de gestión; nunca incluye contraseña_hash
+PROYECCION_LISTADO = {
+    'nombre_usuario': 1, 'email': 1, 'rol': 1, 'nombre_completo': 1, 'telefono': 1,
+    'estado': 1, 'consolas': 1, 'fecha_creacion': 1, 'nombre_orden': 1
+}
+
+# Orden del listado -> (campo, dirección); el _id desempata y sirve de cursor
+ORDENES_USUARIO = {
+    'reciente': ('_id', -1),
+    'antiguo': ('_id', 1),
+    'nombre': ('nombre_orden', 1),
+    '-nombre': ('nombre_orden', -1)
+}
+
+# Campos de los que salen los términos de búsqueda
+CAMPOS_BUSQUEDA = ('nombre_usuario', 'email', 'nombre_completo')
+
+# Estados de un trabajo que cuentan como carga de un empleado
+ESTADOS_CARGA = ['pendiente', 'en_progreso']
+
+def normalizar_texto(texto):
+    """Minúsculas y sin acentos, para que 'lopez' encuentre y ordene junto a 'López'"""
+    descompuesto = unicodedata.normalize('NFKD', (texto or '').strip().lower())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+def campos_busqueda(nombre_usuario, email, nombre_completo):
+    """
+    Calcula los campos normalizados para buscar y ordenar usuarios
+    
+    busqueda guarda normalizados el nombre de usuario, el email, el nombre
+    completo y cada una de sus palabras, así que una búsqueda por prefijo es
+    un rango sobre un índice multikey en vez de una regex sin índice.
+    
+    Returns:
+        dict: {busqueda, nombre_orden}
+    """
+    nombre_completo = normalizar_texto(nombre_completo)
+    terminos = {normalizar_texto(nombre_usuario), normalizar_texto(email), nombre_completo}
+    terminos.update(nombre_completo.split())
+    terminos.discard('')
+    return {'busqueda': sorted(terminos), 'nombre_orden': nombre_completo}
 
 class Usuario:
     """Modelo para la colección de usuarios"""
     
     def __init__(self, nombre_usuario, contraseña_hash, email, rol, 
-                 nombre_completo, telefono='', estado='activo'):
+                 nombre_completo, telefono='', estado='activo', consolas=None):
         """
         Inicializa un nuevo usuario
         
@@ -22,6 +73,7 @@ class Usuario:
             nombre_completo (str): Nombre completo
             telefono (str): Número de teléfono
             estado (str): activo o inactivo
+            consolas (list): Consolas que atiende un empleado (vacío = todas)
         """
         self.nombre_usuario = nombre_usuario
         self.contraseña_hash = contraseña_hash
@@ -30,6 +82,7 @@ class Usuario:
         self.nombre_completo = nombre_completo
         self.telefono = telefono
         self.estado = estado
+        self.consolas = consolas or []
         self.fecha_creacion = datetime.now()
     
     def a_diccionario(self):
@@ -42,7 +95,9 @@ class Usuario:
             'nombre_completo': self.nombre_completo,
             'telefono': self.telefono,
             'estado': self.estado,
-            'fecha_creacion': self.fecha_creacion
+            'consolas': self.consolas,
+            'fecha_creacion': self.fecha_creacion,
+            **campos_busqueda(self.nombre_usuario, self.email, self.nombre_completo)
         }
     
     @staticmethod
@@ -55,27 +110,101 @@ class Usuario:
             rol=datos.get('rol'),
             nombre_completo=datos.get('nombre_completo'),
             telefono=datos.get('telefono', ''),
-            estado=datos.get('estado', 'activo')
+            estado=datos.get('estado', 'activo'),
+            consolas=datos.get('consolas', [])
         )
 
 class RepositorioUsuario:
     """Repositorio para operaciones CRUD de usuarios"""
     
-    def __init__(self, db):
+    def __init__(self, db, cache_estadisticas=None):
         """
         Inicializa el repositorio
         
         Args:
             db: Instancia de base de datos MongoDB
+            cache_estadisticas (CacheTTL): Caché de obtener_estadisticas; se
+                invalida con cada escritura de este repositorio (opcional)
         """
         self.db = db
         self.coleccion = db['usuarios']
+        self.cache_estadisticas = cache_estadisticas
+    
+    def crear_indices(self):
+        """
+        Crea los índices del listado de gestión y completa los campos de búsqueda
+        
+        El listado siempre filtra por rol y estado con valores concretos (si
+        no se piden, todos los gestionables), así que MongoDB puede recorrer
+        cada combinación ya ordenada y mezclarlas sin ordenar en memoria.
+        """
+        self.coleccion.create_index([('rol', 1), ('estado', 1), ('_id', -1)])
+        self.coleccion.create_index([('rol', 1), ('estado', 1), ('nombre_orden', 1), ('_id', 1)])
+        self.coleccion.create_index('busqueda')
+        # Búsquedas por nombre de usuario o email (login y altas, una a una o en lote)
+        self.coleccion.create_index('nombre_usuario')
+        self.coleccion.create_index('email')
+        self.completar_campos_busqueda()
+    
+    def completar_campos_busqueda(self, tamano_lote=500):
+        """
+        Calcula busqueda y nombre_orden de los usuarios creados antes de existir
+        
+        Returns:
+            int: Usuarios actualizados
+        """
+        pendientes = self.coleccion.find(
+            {'busqueda': {'$exists': False}},
+            {campo: 1 for campo in CAMPOS_BUSQUEDA}
+        )
+        operaciones = []
+        actualizados = 0
+        for usuario in pendientes:
+            campos = campos_busqueda(*(usuario.get(campo) for campo in CAMPOS_BUSQUEDA))
+            operaciones.append(UpdateOne({'_id': usuario['_id']}, {'$set': campos}))
+            if len(operaciones) >= tamano_lote:
+                actualizados += self.coleccion.bulk_write(operaciones, ordered=False).modified_count
+                operaciones = []
+        if operaciones:
+            actualizados += self.coleccion.bulk_write(operaciones, ordered=False).modified_count
+        return actualizados
     
     def crear(self, usuario):
         """Crea un nuevo usuario"""
         resultado = self.coleccion.insert_one(usuario.a_diccionario())
+        self.invalidar_estadisticas()
         return str(resultado.inserted_id)
     
+    def crear_lote(self, usuarios):
+        """
+        Inserta varios usuarios con un insert_many no ordenado
+        
+        Un documento rechazado no detiene a los demás.
+        
+        Args:
+            usuarios (list): Objetos Usuario
+        
+        Returns:
+            list: Por cada usuario, (ID creado, None) o (None, mensaje de error)
+        """
+        documentos = [{'_id': ObjectId(), **u.a_diccionario()} for u in usuarios]
+        errores = {}
+        if documentos:
+            try:
+                self.coleccion.insert_many(documentos, ordered=False)
+            except BulkWriteError as e:
+                errores = {
+                    error['index']: error.get('errmsg', 'Error al insertar')
+                    for error in e.details.get('writeErrors', [])
+                }
+            if len(errores) < len(documentos):
+                self.invalidar_estadisticas()
+        
+        return [
+            (None, errores[indice]) if indice in errores else (str(documento['_id']), None)
+            for indice, documento in enumerate(documentos)
+        ]
+    
     def obtener_por_id(self, usuario_id):
         """Obtiene usuario por ID"""
         try:
@@ -84,20 +213,137 @@ class RepositorioUsuario:
         except:
             return None
     
+    def obtener_por_ids(self, usuario_ids, proyeccion=None):
+        """
+        Obtiene varios usuarios con una sola consulta $in
+        
+        Args:
+            usuario_ids (list): IDs de los usuarios (los inválidos se ignoran)
+            proyeccion (dict): Campos a devolver (opcional)
+        
+        Returns:
+            dict: ID (str) -> usuario
+        """
+        ids = []
+        for usuario_id in usuario_ids:
+            try:
+                ids.append(ObjectId(usuario_id))
+            except:
+                continue
+        
+        if not ids:
+            return {}
+        
+        return {str(d['_id']): d for d in self.coleccion.find({'_id': {'$in': ids}}, proyeccion)}
+    
+    def obtener_existentes(self, nombres_usuario, emails):
+        """
+        Busca con una sola consulta qué nombres de usuario y emails ya están registrados
+        
+        Returns:
+            tuple: (set de nombres de usuario, set de emails) ya usados
+        """
+        nombres, correos = set(), set()
+        if not nombres_usuario and not emails:
+            return nombres, correos
+        
+        for usuario in self.coleccion.find(
+            {'$or': [{'nombre_usuario': {'$in': list(nombres_usuario)}}, {'email': {'$in': list(emails)}}]},
+            {'_id': 0, 'nombre_usuario': 1, 'email': 1}
+        ):
+            nombres.add(usuario.get('nombre_usuario'))
+            correos.add(usuario.get('email'))
+        return nombres, correos
+    
     def obtener_por_nombre(self, nombre_usuario):
         """Obtiene usuario por nombre de usuario"""
         return self.coleccion.find_one({'nombre_usuario': nombre_usuario})
     
-    def obtener_todos(self):
-        """Obtiene todos los usuarios"""
-        return list(self.coleccion.find({}))
+    def obtener_todos(self, limite=0, excluir_rol=None, proyeccion=None):
+        """
+        Obtiene todos los usuarios
+        
+        Args:
+            limite (int): Máximo de usuarios, del más reciente al más antiguo (0 = todos)
+            excluir_rol (str): Rol a dejar fuera (opcional)
+            proyeccion (dict): Campos a devolver (opcional)
+        """
+        filtro = {'rol': {'$ne': excluir_rol}} if excluir_rol else {}
+        cursor = self.coleccion.find(filtro, proyeccion)
+        if limite:
+            cursor = cursor.sort('_id', -1).limit(limite)
+        return list(cursor)
+    
+    def buscar(self, roles=None, estados=None, prefijo=None, orden='reciente', despues_de=None, limite=25):
+        """
+        Lista usuarios con filtros y paginación por cursor (keyset)
+        
+        Args:
+            roles (list): Roles a incluir (por defecto, los gestionables)
+            estados (list): Estados a incluir (por defecto, todos)
+            prefijo (str): Prefijo del nombre, una palabra del nombre, el usuario o el email
+            orden (str): Clave de ORDENES_USUARIO
+            despues_de (tuple): (valor del campo de orden, _id) del último usuario
+                de la página anterior (opcional)
+            limite (int): Máximo de usuarios
+        
+        Returns:
+            list: Usuarios con PROYECCION_LISTADO
+        """
+        filtro = {
+            'rol': {'$in': list(roles or ROLES_GESTIONABLES)},
+            'estado': {'$in': list(estados or ESTADOS_USUARIO)}
+        }
+        if prefijo:
+            filtro['busqueda'] = {'$regex': '^' + re.escape(normalizar_texto(prefijo))}
+        
+        campo, direccion = ORDENES_USUARIO[orden]
+        if despues_de:
+            valor, ultimo_id = despues_de
+            operador = '$gt' if direccion == 1 else '$lt'
+            if campo == '_id':
+                filtro['_id'] = {operador: ultimo_id}
+            else:
+                filtro['$or'] = [
+                    {campo: {operador: valor}},
+                    {campo: valor, '_id': {operador: ultimo_id}}
+                ]
+        
+        orden_consulta = [(campo, direccion)] if campo == '_id' else [(campo, direccion), ('_id', direccion)]
+        return list(self.coleccion.find(filtro, PROYECCION_LISTADO).sort(orden_consulta).limit(limite))
     
     def actualizar(self, usuario_id, datos):
-        """Actualiza un usuario"""
+        """Actualiza un usuario (devuelve True si el usuario existe y no está eliminado)"""
+        try:
+            filtro = {'_id': ObjectId(usuario_id), 'estado': {'$ne': ESTADO_ELIMINADO}}
+        except:
+            return False
+        
+        # Mantener los campos de búsqueda al cambiar el nombre o el email
+        if any(campo in datos for campo in CAMPOS_BUSQUEDA):
+            actual = self.coleccion.find_one(filtro, {campo: 1 for campo in CAMPOS_BUSQUEDA})
+            if not actual:
+                return False
+            datos = {**datos, **campos_busqueda(*(datos.get(c, actual.get(c)) for c in CAMPOS_BUSQUEDA))}
+        
+        resultado = self.coleccion.update_one(filtro, {'$set': datos})
+        if resultado.modified_count:
+            self.invalidar_estadisticas()
+        return resultado.matched_count > 0
+    
+    def reemplazar_hash_contraseña(self, usuario_id, hash_anterior, hash_nuevo):
+        """
+        Cambia el hash de la contraseña solo si sigue siendo hash_anterior
+        
+        Evita pisar un cambio de contraseña hecho mientras se calculaba el hash nuevo.
+        
+        Returns:
+            bool: True si se reemplazó
+        """
         try:
             resultado = self.coleccion.update_one(
-                {'_id': ObjectId(usuario_id)},
-                {'$set': datos}
+                {'_id': ObjectId(usuario_id), 'contraseña_hash': hash_anterior},
+                {'$set': {'contraseña_hash': hash_nuevo}}
             )
             return resultado.modified_count > 0
         except:
@@ -107,17 +353,152 @@ class RepositorioUsuario:
         """Elimina (desactiva) un usuario"""
         try:
             resultado = self.coleccion.update_one(
-                {'_id': ObjectId(usuario_id)},
+                {'_id': ObjectId(usuario_id), 'estado': {'$ne': ESTADO_ELIMINADO}},
                 {'$set': {'estado': 'inactivo'}}
             )
-            return resultado.modified_count > 0
         except:
             return False
+        if resultado.modified_count:
+            self.invalidar_estadisticas()
+        return resultado.modified_count > 0
+    
+    def marcar_eliminado(self, usuario_id):
+        """
+        Da de baja un usuario al instante; el borrado de sus datos sigue en segundo plano
+        
+        Returns:
+            dict: Usuario antes de la baja, o None si no existe o ya estaba eliminado
+        """
+        try:
+            usuario = self.coleccion.find_one_and_update(
+                {'_id': ObjectId(usuario_id), 'estado': {'$ne': ESTADO_ELIMINADO}},
+                {'$set': {'estado': ESTADO_ELIMINADO, 'fecha_eliminacion': datetime.now()}},
+                projection={'nombre_usuario': 1, 'rol': 1, 'estado': 1}
+            )
+        except:
+            return None
+        if usuario:
+            self.invalidar_estadisticas()
+        return usuario
+    
+    def restaurar_estado(self, usuario_id, estado):
+        """Deshace marcar_eliminado si no se pudo programar el borrado"""
+        self.coleccion.update_one(
+            {'_id': ObjectId(usuario_id), 'estado': ESTADO_ELIMINADO},
+            {'$set': {'estado': estado}, '$unset': {'fecha_eliminacion': ''}}
+        )
+        self.invalidar_estadisticas()
+    
+    def eliminar_definitivo(self, usuario_id):
+        """Borra el documento del usuario (devuelve True si existía)"""
+        try:
+            resultado = self.coleccion.delete_one({'_id': ObjectId(usuario_id)})
+        except:
+            return False
+        if resultado.deleted_count:
+            self.invalidar_estadisticas()
+        return resultado.deleted_count > 0
     
     def existe_nombre_usuario(self, nombre_usuario):
         """Verifica si un nombre de usuario ya existe"""
         return self.coleccion.find_one({'nombre_usuario': nombre_usuario}) is not None
     
-    def obtener_por_rol(self, rol):
+    def obtener_por_rol(self, rol, proyeccion=None):
         """Obtiene todos los usuarios con un rol específico"""
-        return list(self.coleccion.find({'rol': rol, 'estado': 'activo'}))
+        return list(self.coleccion.find({'rol': rol, 'estado': 'activo'}, proyeccion))
+    
+    def obtener_estadisticas(self, meses=6):
+        """
+        Cuenta usuarios por rol y estado, altas por mes y carga de los empleados activos
+        
+        Los conteos salen de un solo $facet en el servidor: ningún documento
+        (ni su contraseña_hash) llega a Python. La carga es un $group sobre los
+        trabajos abiertos de los empleados activos, igual que el planificador.
+        El resultado se guarda en cache_estadisticas hasta su TTL o hasta la
+        siguiente escritura.
+        
+        Args:
+            meses (int): Meses, contando el actual, de la serie de altas
+        
+        Returns:
+            dict: {por_rol, por_estado, por_rol_estado, nuevos_por_mes, carga_empleados}
+        """
+        clave = ('estadisticas', meses)
+        if self.cache_estadisticas:
+            estadisticas = self.cache_estadisticas.obtener(clave)
+            if estadisticas is not None:
+                return estadisticas
+        
+        hoy = datetime.now()
+        indice_mes = hoy.year * 12 + hoy.month - meses
+        desde = datetime(indice_mes // 12, indice_mes % 12 + 1, 1)
+        
+        facetas = next(self.coleccion.aggregate([
+            {'$match': {'estado': {'$ne': ESTADO_ELIMINADO}}},
+            {'$project': {'rol': 1, 'estado': 1, 'fecha_creacion': 1, 'nombre_completo': 1}},
+            {'$facet': {
+                'por_rol_estado': [
+                    {'$group': {'_id': {'rol': '$rol', 'estado': '$estado'}, 'total': {'$sum': 1}}}
+                ],
+                'nuevos_por_mes': [
+                    {'$match': {'fecha_creacion': {'$gte': desde}}},
+                    {'$group': {
+                        '_id': {'$dateToString': {'format': '%Y-%m', 'date': '$fecha_creacion'}},
+                        'total': {'$sum': 1}
+                    }},
+                    {'$sort': {'_id': 1}}
+                ],
+                'empleados_activos': [
+                    {'$match': {'rol': 'empleado', 'estado': 'activo'}},
+                    {'$project': {'nombre_completo': 1}}
+                ]
+            }}
+        ]), {})
+        
+        por_rol_estado = {}
+        por_rol = {}
+        por_estado = {}
+        for grupo in facetas.get('por_rol_estado', []):
+            rol, estado = grupo['_id'].get('rol'), grupo['_id'].get('estado')
+            por_rol_estado.setdefault(rol, {})[estado] = grupo['total']
+            por_rol[rol] = por_rol.get(rol, 0) + grupo['total']
+            por_estado[estado] = por_estado.get(estado, 0) + grupo['total']
+        
+        empleados = {str(e['_id']): e.get('nombre_completo', '') for e in facetas.get('empleados_activos', [])}
+        carga = {}
+        if empleados:
+            carga = {c['_id']: c for c in self.db['registros_trabajo'].aggregate([
+                {'$match': {'estado': {'$in': ESTADOS_CARGA}, 'empleado_id': {'$in': list(empleados)}}},
+                {'$group': {
+                    '_id': '$empleado_id',
+                    'pendientes': {'$sum': {'$cond': [{'$eq': ['$estado', 'pendiente']}, 1, 0]}},
+                    'en_progreso': {'$sum': {'$cond': [{'$eq': ['$estado', 'en_progreso']}, 1, 0]}}
+                }}
+            ])}
+        
+        estadisticas = {
+            'por_rol': por_rol,
+            'por_estado': por_estado,
+            'por_rol_estado': por_rol_estado,
+            'nuevos_por_mes': [{'mes': g['_id'], 'total': g['total']} for g in facetas.get('nuevos_por_mes', [])],
+            'carga_empleados': sorted(
+                (
+                    {
+                        'empleado_id': empleado_id,
+                        'nombre_completo': nombre,
+                        'pendientes': carga.get(empleado_id, {}).get('pendientes', 0),
+                        'en_progreso': carga.get(empleado_id, {}).get('en_progreso', 0)
+                    }
+                    for empleado_id, nombre in empleados.items()
+                ),
+                key=lambda c: (-(c['pendientes'] + c['en_progreso']), c['nombre_completo'])
+            )
+        }
+        if self.cache_estadisticas:
+            self.cache_estadisticas.guardar(clave, estadisticas)
+        return estadisticas
+    
+    def invalidar_estadisticas(self):
+        """Descarta las estadísticas en caché tras una escritura"""
+        if self.cache_estadisticas:
+            self.cache_estadisticas.invalidar()
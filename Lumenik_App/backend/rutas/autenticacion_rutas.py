@@ -5,14 +5,22 @@ from flask import Blueprint, request, jsonify
 from controladores.autenticacion_controlador import (
     AutenticacionControlador, 
     token_requerido,
+    token_revocado,
     verificar_token_jwt
 )
 
-def crear_rutas_autenticacion(repo_usuario):
-    """Crea el blueprint de rutas de autenticación"""
+def crear_rutas_autenticacion(repo_usuario, ejecutor_contrasenas=None, limitador_login=None):
+    """
+    Crea el blueprint de rutas de autenticación
+    
+    Args:
+        repo_usuario: Repositorio de usuarios
+        ejecutor_contrasenas (EjecutorContrasenas): Pool acotado para bcrypt (opcional)
+        limitador_login (LimitadorLogin): Límite de intentos de login (opcional)
+    """
     
     rutas_auth = Blueprint('autenticacion', __name__, url_prefix='/api/auth')
-    controlador = AutenticacionControlador(repo_usuario)
+    controlador = AutenticacionControlador(repo_usuario, ejecutor_contrasenas)
     
     @rutas_auth.route('/login', methods=['POST'])
     def login():
@@ -31,7 +39,24 @@ def crear_rutas_autenticacion(repo_usuario):
         if not datos:
             return jsonify({'error': 'No data provided'}), 400
         
+        if not limitador_login:
+            resultado, codigo = controlador.login(datos)
+            return jsonify(resultado), codigo
+        
+        # Se rechaza antes de buscar al usuario o calcular bcrypt
+        ip = request.remote_addr
+        nombre_usuario = datos.get('nombre_usuario')
+        reintentar_en = limitador_login.verificar(ip, nombre_usuario)
+        if reintentar_en:
+            respuesta = jsonify({'error': 'Demasiados intentos de login, intenta más tarde'})
+            respuesta.headers['Retry-After'] = str(reintentar_en)
+            return respuesta, 429
+        
         resultado, codigo = controlador.login(datos)
+        if codigo == 401:
+            limitador_login.registrar_fallo(ip, nombre_usuario)
+        elif codigo == 200:
+            limitador_login.registrar_exito(ip, nombre_usuario)
         return jsonify(resultado), codigo
     
     @rutas_auth.route('/registrar', methods=['POST'])
@@ -117,9 +142,9 @@ def crear_rutas_autenticacion(repo_usuario):
         }
         """
         datos = request.get_json()
-        token = datos.get('token') if datos else None
+        token = datos.get('token') if isinstance(datos, dict) else None
         
-        if not token:
+        if not token or not isinstance(token, str):
             return jsonify({'valido': False, 'error': 'Token requerido'}), 400
         
         payload = verificar_token_jwt(token)
@@ -127,6 +152,10 @@ def crear_rutas_autenticacion(repo_usuario):
         if 'error' in payload:
             return jsonify({'valido': False, 'error': payload['error']}), 401
         
+        # Mismo criterio que token_requerido: usuario desactivado, eliminado o con contraseña cambiada
+        if token_revocado(payload):
+            return jsonify({'valido': False, 'error': 'Token revocado'}), 401
+        
         return jsonify({
             'valido': True,
             'usuario_id': payload.get('usuario_id'),
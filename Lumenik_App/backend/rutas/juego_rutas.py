@@ -5,11 +5,11 @@ from flask import Blueprint, request, jsonify
 from controladores.autenticacion_controlador import token_requerido, rol_requerido
 from controladores.juego_controlador import JuegoControlador
 
-def crear_rutas_juegos(repo_juego):
+def crear_rutas_juegos(repo_juego, catalogo=None):
     """Crea el blueprint de rutas de juegos"""
     
     rutas_juegos = Blueprint('juegos', __name__, url_prefix='/api/juegos')
-    controlador = JuegoControlador(repo_juego)
+    controlador = JuegoControlador(repo_juego, catalogo)
     
     @rutas_juegos.route('', methods=['GET'])
     def obtener_todos():
@@ -0,0 +1,63 @@
+"""
+lote_rutas.py - Rutas del Lote de peticiones
+"""
+from flask import Blueprint, request, jsonify, current_app, g
+from controladores.autenticacion_controlador import token_requerido
+from servicios.bitacora import CABECERA_ID_PETICION
+from servicios.lote import DespachadorLote, ENTORNO_USUARIO_VERIFICADO
+
+# Cabeceras de la petición del lote que se copian a cada sub-petición; Authorization
+# la leen directamente rutas como /api/auth/refrescar-token
+CABECERAS_HEREDADAS = ['Authorization', 'Accept-Language', 'User-Agent']
+
+def crear_rutas_lote(consultas, maximo_peticiones=20):
+    """Crea el blueprint de la ruta de lotes"""
+    
+    rutas_lote = Blueprint('lote', __name__, url_prefix='/api/lote')
+    despachador = DespachadorLote(consultas, maximo_peticiones)
+    
+    @rutas_lote.route('', methods=['POST'])
+    @token_requerido
+    def ejecutar_lote():
+        """
+        Ejecuta varias peticiones de la API en una sola
+        POST /api/lote
+        
+        Headers:
+            Authorization: Bearer <token>
+        
+        Body:
+        {
+            "peticiones": [
+                {"metodo": "GET", "ruta": "/api/trabajos/estadisticas"},
+                {"metodo": "PUT", "ruta": "/api/trabajos/<id>/estado", "cuerpo": {"estado": "completado"}}
+            ]
+        }
+        
+        El token se verifica una sola vez y cada sub-petición conserva los
+        permisos de su propia ruta. Las lecturas seguidas se ejecutan a la vez
+        y las escrituras en orden. Devuelve {"respuestas": [{"estado", "cuerpo"}]}
+        en el mismo orden que las peticiones.
+        """
+        # Segunda barrera contra lotes anidados, por si una ruta esquivara validar()
+        if ENTORNO_USUARIO_VERIFICADO in request.environ:
+            return jsonify({'error': 'No se pueden anidar lotes'}), 400
+        
+        datos = request.get_json(silent=True) or {}
+        peticiones = datos.get('peticiones')
+        
+        error = despachador.validar(peticiones)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        cabeceras = {c: request.headers[c] for c in CABECERAS_HEREDADAS if c in request.headers}
+        # Las sub-peticiones comparten el ID del lote en la bitácora
+        if 'id_peticion' in g:
+            cabeceras[CABECERA_ID_PETICION] = g.id_peticion
+        respuestas = despachador.despachar(
+            current_app._get_current_object(), peticiones, request.usuario_actual, cabeceras,
+            request.remote_addr
+        )
+        return jsonify({'respuestas': respuestas}), 200
+    
+    return rutas_lote
@@ -0,0 +1,29 @@
+"""
+metrica_rutas.py - Rutas de Métricas internas
+"""
+from flask import Blueprint, jsonify
+from controladores.autenticacion_controlador import rol_requerido
+
+def crear_rutas_metricas(fuentes):
+    """
+    Crea el blueprint de rutas de métricas
+    
+    Args:
+        fuentes (dict): nombre -> objeto con un método estadisticas()
+    """
+    
+    rutas_metricas = Blueprint('metricas', __name__, url_prefix='/api/metricas')
+    
+    @rutas_metricas.route('', methods=['GET'])
+    @rol_requerido('administrador')
+    def obtener_metricas():
+        """
+        Obtiene las métricas de los componentes en memoria (solo admin)
+        GET /api/metricas
+        
+        Headers:
+            Authorization: Bearer <token>
+        """
+        return jsonify({nombre: fuente.estadisticas() for nombre, fuente in fuentes.items()}), 200
+    
+    return rutas_metricas
@@ -0,0 +1,69 @@
+"""
+pago_rutas.py - Rutas del libro de Pagos
+"""
+from flask import Blueprint, request, jsonify
+from controladores.autenticacion_controlador import token_requerido, rol_requerido
+from controladores.pago_controlador import PagoControlador
+
+def crear_rutas_pagos(repo_pago):
+    """Crea el blueprint de rutas de pagos"""
+    
+    rutas_pagos = Blueprint('pagos', __name__, url_prefix='/api/pagos')
+    controlador = PagoControlador(repo_pago)
+    
+    @rutas_pagos.route('/deudores', methods=['GET'])
+    @rol_requerido('administrador')
+    def obtener_deudores():
+        """
+        Obtiene los clientes con saldo pendiente, de mayor a menor deuda (solo admin)
+        GET /api/pagos/deudores
+        
+        Headers:
+            Authorization: Bearer <token>
+        
+        Query params:
+            limite: (opcional) máximo de clientes, por defecto 50
+        """
+        resultado, codigo = controlador.obtener_deudores(request.args.get('limite', 50))
+        return jsonify(resultado), codigo
+    
+    @rutas_pagos.route('/cliente/<cliente_id>', methods=['GET'])
+    @token_requerido
+    def obtener_estado_cuenta(cliente_id):
+        """
+        Obtiene el estado de cuenta paginado de un cliente
+        GET /api/pagos/cliente/<cliente_id>
+        
+        Headers:
+            Authorization: Bearer <token>
+        
+        Query params:
+            antes_de: (opcional) cursor 'siguiente' de la página anterior
+            limite: (opcional) movimientos por página, por defecto 50
+        """
+        # Un cliente solo puede consultar su propio estado de cuenta
+        usuario = request.usuario_actual
+        if usuario.get('rol') != 'administrador' and usuario.get('usuario_id') != cliente_id:
+            return jsonify({'error': 'Acceso denegado'}), 403
+        
+        resultado, codigo = controlador.obtener_estado_cuenta(
+            cliente_id,
+            request.args.get('antes_de'),
+            request.args.get('limite', 50)
+        )
+        return jsonify(resultado), codigo
+    
+    @rutas_pagos.route('/recalcular-saldos', methods=['POST'])
+    @rol_requerido('administrador')
+    def recalcular_saldos():
+        """
+        Reconstruye los saldos de clientes desde los registros de trabajo (solo admin)
+        POST /api/pagos/recalcular-saldos
+        
+        Headers:
+            Authorization: Bearer <token>
+        """
+        resultado, codigo = controlador.recalcular_saldos()
+        return jsonify(resultado), codigo
+    
+    return rutas_pagos
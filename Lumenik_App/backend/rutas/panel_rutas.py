@@ -0,0 +1,49 @@
+"""
+panel_rutas.py - Rutas de los Paneles (dashboards)
+"""
+from flask import Blueprint, request, jsonify
+from controladores.autenticacion_controlador import rol_requerido
+from controladores.panel_controlador import PanelControlador
+
+def crear_rutas_panel(repo_trabajo, repo_usuario, consultas, repo_cliente=None,
+                      limite_historial=20, repo_juego=None, tamano_pagina=25):
+    """Crea el blueprint de rutas de paneles"""
+    
+    rutas_panel = Blueprint('panel', __name__, url_prefix='/api')
+    controlador = PanelControlador(repo_trabajo, repo_usuario, consultas, repo_cliente,
+                                   limite_historial, repo_juego, tamano_pagina)
+    
+    @rutas_panel.route('/empleado/panel', methods=['GET'])
+    @rol_requerido('empleado')
+    def panel_empleado():
+        """
+        Obtiene todo lo que muestra el panel del empleado en una sola respuesta
+        GET /api/empleado/panel
+        
+        Headers:
+            Authorization: Bearer <token>
+        
+        Devuelve los clientes, la cola pendiente, los trabajos en progreso y el
+        historial reciente del empleado autenticado.
+        """
+        empleado_id = request.usuario_actual.get('usuario_id')
+        resultado, codigo = controlador.panel_empleado(empleado_id)
+        return jsonify(resultado), codigo
+    
+    @rutas_panel.route('/admin/panel', methods=['GET'])
+    @rol_requerido('administrador')
+    def panel_admin():
+        """
+        Obtiene lo necesario para abrir el panel del administrador (solo admin)
+        GET /api/admin/panel
+        
+        Headers:
+            Authorization: Bearer <token>
+        
+        Devuelve las estadísticas de usuarios, juegos y trabajos, la primera
+        página de cada lista y el tiempo que tomó cada sección.
+        """
+        resultado, codigo = controlador.panel_admin()
+        return jsonify(resultado), codigo
+    
+    return rutas_panel
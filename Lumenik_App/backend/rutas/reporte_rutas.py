@@ -0,0 +1,38 @@
+"""
+reporte_rutas.py - Rutas de Reportes
+"""
+from flask import Blueprint, request, jsonify
+from controladores.autenticacion_controlador import rol_requerido
+from controladores.reporte_controlador import ReporteControlador
+
+def crear_rutas_reportes(repo_trabajo, cache_reportes=None):
+    """Crea el blueprint de rutas de reportes"""
+    
+    rutas_reportes = Blueprint('reportes', __name__, url_prefix='/api/reportes')
+    controlador = ReporteControlador(repo_trabajo, cache_reportes)
+    
+    @rutas_reportes.route('/serie', methods=['GET'])
+    @rol_requerido('administrador')
+    def obtener_serie():
+        """
+        Obtiene una serie temporal de trabajos (solo admin)
+        GET /api/reportes/serie
+        
+        Headers:
+            Authorization: Bearer <token>
+        
+        Query params:
+            desde: YYYY-MM-DD
+            hasta: YYYY-MM-DD (inclusivo)
+            granularidad: dia|semana|mes (por defecto dia)
+            metrica: (opcional) trabajos|ingresos|gb|duracion_promedio_horas
+        """
+        resultado, codigo = controlador.obtener_serie(
+            request.args.get('desde'),
+            request.args.get('hasta'),
+            request.args.get('granularidad', 'dia'),
+            request.args.get('metrica')
+        )
+        return jsonify(resultado), codigo
+    
+    return rutas_reportes
@@ -0,0 +1,62 @@
+"""
+tarea_rutas.py - Rutas de Tareas en segundo plano
+"""
+from flask import Blueprint, request, jsonify
+from controladores.autenticacion_controlador import rol_requerido
+from controladores.tarea_controlador import TareaControlador
+
+def crear_rutas_tareas(repo_tarea, ejecutor_tareas, antiguedad_archivo_dias=365):
+    """Crea el blueprint de rutas de tareas"""
+    
+    rutas_tareas = Blueprint('tareas', __name__, url_prefix='/api/tareas')
+    controlador = TareaControlador(repo_tarea, ejecutor_tareas, antiguedad_archivo_dias)
+    
+    @rutas_tareas.route('', methods=['GET'])
+    @rol_requerido('administrador')
+    def obtener_recientes():
+        """
+        Obtiene las últimas tareas en segundo plano (solo admin)
+        GET /api/tareas
+        
+        Headers:
+            Authorization: Bearer <token>
+        
+        Query params:
+            tipo: (opcional) filtrar por tipo de tarea
+        """
+        resultado, codigo = controlador.obtener_recientes(request.args.get('tipo'))
+        return jsonify(resultado), codigo
+    
+    @rutas_tareas.route('/<tarea_id>', methods=['GET'])
+    @rol_requerido('administrador')
+    def obtener_tarea(tarea_id):
+        """
+        Obtiene el estado y progreso de una tarea (solo admin)
+        GET /api/tareas/<tarea_id>
+        
+        Headers:
+            Authorization: Bearer <token>
+        """
+        resultado, codigo = controlador.obtener_por_id(tarea_id)
+        return jsonify(resultado), codigo
+    
+    @rutas_tareas.route('/archivar-trabajos', methods=['POST'])
+    @rol_requerido('administrador')
+    def archivar_trabajos():
+        """
+        Mueve al archivo los trabajos cerrados antiguos, en segundo plano (solo admin)
+        POST /api/tareas/archivar-trabajos
+        
+        Headers:
+            Authorization: Bearer <token>
+        
+        Body (opcional):
+        {
+            "antiguedad_dias": int
+        }
+        """
+        datos = request.get_json(silent=True) or {}
+        resultado, codigo = controlador.archivar_trabajos(datos.get('antiguedad_dias'))
+        return jsonify(resultado), codigo
+    
+    return rutas_tareas
@@ -1,15 +1,26 @@
 """
 trabajo_rutas.py - Rutas de Gestión de Trabajos
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from controladores.autenticacion_controlador import token_requerido, rol_requerido
 from controladores.trabajo_controlador import TrabajoControlador
+from servicios.exportacion import ExportadorTrabajos, FORMATOS, comprimir_gzip
 
-def crear_rutas_trabajos(repo_trabajo, repo_cliente=None):
+def crear_rutas_trabajos(repo_trabajo, repo_cliente=None, repo_pago=None,
+                         repo_usuario=None, duracion_reclamo=30,
+                         repo_juego=None, catalogo=None, contadores_cliente=None):
     """Crea el blueprint de rutas de trabajos"""
     
     rutas_trabajos = Blueprint('trabajos', __name__, url_prefix='/api/trabajos')
-    controlador = TrabajoControlador(repo_trabajo, repo_cliente)
+    controlador = TrabajoControlador(repo_trabajo, repo_cliente, repo_pago,
+                                     repo_usuario, duracion_reclamo,
+                                     repo_juego, catalogo, contadores_cliente)
+    
+    exportador = ExportadorTrabajos(repo_trabajo, repo_usuario, repo_juego)
+    
+    def _historial():
+        """Indica si la petición pidió incluir los trabajos archivados"""
+        return request.args.get('historial', 'false').lower() == 'true'
     
     @rutas_trabajos.route('', methods=['GET'])
     @token_requerido
@@ -20,10 +31,52 @@ def crear_rutas_trabajos(repo_trabajo, repo_cliente=None):
         
         Headers:
             Authorization: Bearer <token>
+        
+        Query params:
+            expandir: (opcional) juegos,cliente,empleado para incluir nombres y pesos
+            historial: (opcional) true para incluir los trabajos archivados
         """
-        resultado, codigo = controlador.obtener_todos()
+        resultado, codigo = controlador.obtener_todos(request.args.get('expandir'), _historial())
         return jsonify(resultado), codigo
     
+    @rutas_trabajos.route('/exportar', methods=['GET'])
+    @rol_requerido('administrador')
+    def exportar():
+        """
+        Exporta trabajos y pagos en streaming para contabilidad (solo admin)
+        GET /api/trabajos/exportar
+        
+        Headers:
+            Authorization: Bearer <token>
+            Accept-Encoding: gzip (opcional, comprime la descarga)
+        
+        Query params:
+            formato: csv|ndjson (por defecto csv)
+            desde: (opcional) YYYY-MM-DD
+            hasta: (opcional) YYYY-MM-DD (inclusivo)
+            despues_de: (opcional) último registro_id recibido, para reanudar
+        
+        Incluye los trabajos archivados, en orden de registro_id.
+        """
+        formato = request.args.get('formato', 'csv')
+        generador, error = exportador.exportar(
+            formato,
+            request.args.get('desde'),
+            request.args.get('hasta'),
+            request.args.get('despues_de')
+        )
+        
+        if error:
+            return jsonify({'error': error}), 400
+        
+        encabezados = {'Content-Disposition': f'attachment; filename=trabajos.{formato}'}
+        if 'gzip' in request.headers.get('Accept-Encoding', ''):
+            generador = comprimir_gzip(generador)
+            encabezados['Content-Encoding'] = 'gzip'
+            encabezados['Vary'] = 'Accept-Encoding'
+        
+        return Response(stream_with_context(generador), mimetype=FORMATOS[formato], headers=encabezados)
+    
     @rutas_trabajos.route('/<registro_id>', methods=['GET'])
     @token_requerido
     def obtener_trabajo(registro_id):
@@ -33,8 +86,12 @@ def crear_rutas_trabajos(repo_trabajo, repo_cliente=None):
         
         Headers:
             Authorization: Bearer <token>
+        
+        Query params:
+            expandir: (opcional) juegos,cliente,empleado para incluir nombres y pesos
+            historial: (opcional) true para incluir los trabajos archivados
         """
-        resultado, codigo = controlador.obtener_por_id(registro_id)
+        resultado, codigo = controlador.obtener_por_id(registro_id, request.args.get('expandir'), _historial())
         return jsonify(resultado), codigo
     
     @rutas_trabajos.route('/cliente/<cliente_id>', methods=['GET'])
@@ -46,8 +103,12 @@ def crear_rutas_trabajos(repo_trabajo, repo_cliente=None):
         
         Headers:
             Authorization: Bearer <token>
+        
+        Query params:
+            expandir: (opcional) juegos,cliente,empleado para incluir nombres y pesos
+            historial: (opcional) true para incluir los trabajos archivados
         """
-        resultado, codigo = controlador.obtener_por_cliente(cliente_id)
+        resultado, codigo = controlador.obtener_por_cliente(cliente_id, request.args.get('expandir'), _historial())
         return jsonify(resultado), codigo
     
     @rutas_trabajos.route('/empleado/<empleado_id>', methods=['GET'])
@@ -59,8 +120,12 @@ def crear_rutas_trabajos(repo_trabajo, repo_cliente=None):
         
         Headers:
             Authorization: Bearer <token>
+        
+        Query params:
+            expandir: (opcional) juegos,cliente,empleado para incluir nombres y pesos
+            historial: (opcional) true para incluir los trabajos archivados
         """
-        resultado, codigo = controlador.obtener_por_empleado(empleado_id)
+        resultado, codigo = controlador.obtener_por_empleado(empleado_id, request.args.get('expandir'), _historial())
         return jsonify(resultado), codigo
     
     @rutas_trabajos.route('/pendientes', methods=['GET'])
@@ -75,9 +140,50 @@ def crear_rutas_trabajos(repo_trabajo, repo_cliente=None):
         
         Query params:
             empleado_id: (opcional) para filtrar por empleado
+            expandir: (opcional) juegos,cliente,empleado para incluir nombres y pesos
         """
         empleado_id = request.args.get('empleado_id')
-        resultado, codigo = controlador.obtener_pendientes(empleado_id)
+        resultado, codigo = controlador.obtener_pendientes(empleado_id, request.args.get('expandir'))
+        return jsonify(resultado), codigo
+    
+    @rutas_trabajos.route('/reclamar', methods=['POST'])
+    @rol_requerido('empleado')
+    def reclamar_trabajo():
+        """
+        Reclama el siguiente trabajo sin asignar de la cola
+        POST /api/trabajos/reclamar
+        
+        Headers:
+            Authorization: Bearer <token>
+        
+        Body (opcional):
+        {
+            "consolas": ["PS4", "PS3"]
+        }
+        
+        El trabajo queda en_progreso y vuelve a la cola si el reclamo
+        no se renueva ni se completa antes de que venza.
+        """
+        datos = request.get_json(silent=True) or {}
+        if not isinstance(datos, dict):
+            return jsonify({'error': 'El cuerpo debe ser un objeto JSON'}), 400
+        
+        empleado_id = request.usuario_actual.get('usuario_id')
+        resultado, codigo = controlador.reclamar(empleado_id, datos.get('consolas'))
+        return jsonify(resultado), codigo
+    
+    @rutas_trabajos.route('/<registro_id>/renovar-reclamo', methods=['POST'])
+    @rol_requerido('empleado')
+    def renovar_reclamo(registro_id):
+        """
+        Extiende el reclamo de un trabajo en curso
+        POST /api/trabajos/<registro_id>/renovar-reclamo
+        
+        Headers:
+            Authorization: Bearer <token>
+        """
+        empleado_id = request.usuario_actual.get('usuario_id')
+        resultado, codigo = controlador.renovar_reclamo(registro_id, empleado_id)
         return jsonify(resultado), codigo
     
     @rutas_trabajos.route('', methods=['POST'])
@@ -97,7 +203,8 @@ def crear_rutas_trabajos(repo_trabajo, repo_cliente=None):
             "tipo_servicio": "instalacion|descarga",
             "juegos_instalados": ["id1", "id2"],
             "descripcion": "string",
-            "costo": "float"
+            "costo": "float",
+            "prioridad": "int (opcional)"
         }
         """
         datos = request.get_json()
@@ -228,6 +335,37 @@ def crear_rutas_trabajos(repo_trabajo, repo_cliente=None):
         resultado, codigo = controlador.limpiar_historial_pagos(registro_id)
         return jsonify(resultado), codigo
     
+    @rutas_trabajos.route('/lote', methods=['POST'])
+    @rol_requerido('administrador')
+    def ejecutar_lote():
+        """
+        Ejecuta varias operaciones sobre trabajos en una sola escritura (solo admin)
+        POST /api/trabajos/lote
+        
+        Headers:
+            Authorization: Bearer <token>
+        
+        Body:
+        {
+            "operaciones": [
+                {"accion": "estado", "id": "string", "estado": "completado"},
+                {"accion": "asignar", "id": "string", "empleado_id": "string"},
+                {"accion": "pago", "id": "string", "monto": float},
+                {"accion": "eliminar", "id": "string"}
+            ]
+        }
+        
+        Cada operación se aplica o falla por separado; la respuesta trae un
+        resultado por operación en el mismo orden.
+        """
+        datos = request.get_json(silent=True)
+        
+        if not isinstance(datos, dict) or 'operaciones' not in datos:
+            return jsonify({'error': 'Operaciones requeridas'}), 400
+        
+        resultado, codigo = controlador.ejecutar_lote(datos['operaciones'])
+        return jsonify(resultado), codigo
+    
     @rutas_trabajos.route('/estadisticas', methods=['GET'])
     @rol_requerido('administrador')
     def obtener_estadisticas():
@@ -1,15 +1,21 @@
 """
 usuario_rutas.py - Rutas de Gestión de Usuarios
 """
+import logging
 from flask import Blueprint, request, jsonify
 from controladores.autenticacion_controlador import token_requerido, rol_requerido
 from controladores.usuario_controlador import UsuarioControlador
 
-def crear_rutas_usuarios(repo_usuario):
+logger = logging.getLogger(__name__)
+
+def crear_rutas_usuarios(repo_usuario, ejecutor_contrasenas=None, repo_cliente=None, maximo_importacion=500,
+                         ejecutor_tareas=None):
     """Crea el blueprint de rutas de usuarios"""
     
     rutas_usuarios = Blueprint('usuarios', __name__, url_prefix='/api/usuarios')
-    controlador = UsuarioControlador(repo_usuario)
+    controlador = UsuarioControlador(
+        repo_usuario, ejecutor_contrasenas, repo_cliente, maximo_importacion, ejecutor_tareas
+    )
     
     @rutas_usuarios.route('', methods=['POST'])
     @rol_requerido('administrador')
@@ -37,28 +43,65 @@ def crear_rutas_usuarios(repo_usuario):
             if not datos:
                 return jsonify({'error': 'No data provided'}), 400
             
-            print(f"[DEBUG] Datos recibidos para crear usuario: {datos}")
-            
             resultado, codigo = controlador.crear_usuario(datos)
-            
-            print(f"[DEBUG] Resultado de crear usuario: {resultado}, Código: {codigo}")
-            
             return jsonify(resultado), codigo
         except Exception as e:
-            print(f"[ERROR] Error al crear usuario: {str(e)}")
+            logger.exception('Error al crear usuario')
             return jsonify({'error': f'Error al crear usuario: {str(e)}'}), 500
     
+    @rutas_usuarios.route('/importar', methods=['POST'])
+    @rol_requerido('administrador')
+    def importar_usuarios():
+        """
+        Crea usuarios en lote (alta de una sucursal)
+        POST /api/usuarios/importar
+        
+        Headers:
+            Authorization: Bearer <token>
+        
+        Body (o directamente la lista):
+        {
+            "usuarios": [
+                {
+                    "nombre_usuario": "string (requerido)",
+                    "email": "string (requerido)",
+                    "contraseña": "string (requerido, mínimo 8)",
+                    "nombre_completo": "string (requerido)",
+                    "telefono": "string (opcional)",
+                    "rol": "cliente|empleado (opcional, cliente por defecto)",
+                    "consolas": ["PS4"] (opcional),
+                    "direccion": "string (opcional)",
+                    "ciudad": "string (opcional)"
+                }
+            ]
+        }
+        
+        Respuesta: {creados, errores, filas: [{fila, nombre_usuario, usuario_id | error}]}
+        """
+        datos = request.get_json(silent=True) or {}
+        filas = datos.get('usuarios') if isinstance(datos, dict) else datos
+        resultado, codigo = controlador.importar(filas)
+        return jsonify(resultado), codigo
+    
     @rutas_usuarios.route('', methods=['GET'])
     @rol_requerido('administrador')
     def obtener_todos():
         """
-        Obtiene todos los usuarios
-        GET /api/usuarios
+        Lista los usuarios gestionables con filtros y paginación
+        GET /api/usuarios?rol=&estado=&q=&orden=&limite=&despues=
         
         Headers:
             Authorization: Bearer <token>
-        """
-        resultado, codigo = controlador.obtener_todos()
+        
+        Query:
+            rol: (opcional) empleado|cliente
+            estado: (opcional) activo|inactivo
+            q: (opcional) prefijo del nombre, nombre de usuario o email
+            orden: (opcional) reciente|antiguo|nombre|-nombre
+            limite: (opcional) usuarios por página (máximo 200)
+            despues: (opcional) cursor 'siguiente' de la página anterior
+        """
+        resultado, codigo = controlador.obtener_todos(request.args)
         return jsonify(resultado), codigo
     
     @rutas_usuarios.route('/<usuario_id>', methods=['GET'])
@@ -153,11 +196,13 @@ def crear_rutas_usuarios(repo_usuario):
     @rol_requerido('administrador')
     def eliminar_usuario(usuario_id):
         """
-        Elimina un usuario y todos sus datos asociados
+        Da de baja un usuario y borra sus datos asociados en segundo plano
         DELETE /api/usuarios/<usuario_id>
         
         Headers:
             Authorization: Bearer <token>
+        
+        Respuesta 202 con tarea_id; el avance se consulta en GET /api/tareas/<tarea_id>
         """
         resultado, codigo = controlador.eliminar(usuario_id)
         return jsonify(resultado), codigo
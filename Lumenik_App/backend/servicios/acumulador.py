@@ -0,0 +1,137 @@
+"""
+acumulador.py - Buffer write-behind para contadores no críticos
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class AcumuladorIncrementos:
+    """
+    Junta incrementos ($inc) por clave en memoria y los escribe en lote
+    
+    Varios incrementos de la misma clave se suman antes de escribir, así que
+    una ráfaga de N operaciones sobre un cliente termina en una sola
+    actualización. El lote se escribe cada intervalo_ms o al llegar a
+    max_entradas claves, lo que ocurra primero.
+    """
+    
+    def __init__(self, escribir_lote, intervalo_ms=500, max_entradas=200):
+        """
+        Inicializa el acumulador
+        
+        Args:
+            escribir_lote (callable): Recibe {clave: {campo: delta}} y lo persiste
+            intervalo_ms (int): Tiempo máximo que un incremento espera en memoria
+            max_entradas (int): Claves pendientes que fuerzan una escritura inmediata
+        """
+        self.escribir_lote = escribir_lote
+        self.intervalo_ms = intervalo_ms
+        self.max_entradas = max_entradas
+        self._pendientes = {}
+        self._lock = threading.Lock()
+        self._lock_vaciado = threading.Lock()
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._hilo = None
+        # Métricas
+        self.incrementos = 0
+        self.vaciados = 0
+        self.errores = 0
+        self.ultimo_vaciado_ms = 0.0
+        self.max_vaciado_ms = 0.0
+        self._total_vaciado_ms = 0.0
+    
+    def incrementar(self, clave, deltas):
+        """
+        Suma deltas a la clave sin escribir en la base de datos
+        
+        Args:
+            clave: Identificador del documento (por ejemplo, el ID del cliente)
+            deltas (dict): campo -> cantidad a sumar
+        """
+        with self._lock:
+            acumulado = self._pendientes.setdefault(clave, {})
+            for campo, delta in deltas.items():
+                acumulado[campo] = acumulado.get(campo, 0) + delta
+            self.incrementos += 1
+            lleno = len(self._pendientes) >= self.max_entradas
+        
+        if lleno:
+            self._despertar.set()
+    
+    def vaciar(self):
+        """
+        Escribe ahora todos los incrementos pendientes
+        
+        Si la escritura falla, los incrementos vuelven al buffer para el
+        siguiente intento en vez de perderse.
+        
+        Returns:
+            int: Claves escritas
+        """
+        with self._lock_vaciado:
+            with self._lock:
+                lote, self._pendientes = self._pendientes, {}
+            
+            if not lote:
+                return 0
+            
+            inicio = time.perf_counter()
+            try:
+                self.escribir_lote(lote)
+            except Exception:
+                self.errores += 1
+                logger.exception('No se pudieron escribir %d contadores', len(lote))
+                with self._lock:
+                    for clave, deltas in lote.items():
+                        acumulado = self._pendientes.setdefault(clave, {})
+                        for campo, delta in deltas.items():
+                            acumulado[campo] = acumulado.get(campo, 0) + delta
+                return 0
+            
+            duracion_ms = (time.perf_counter() - inicio) * 1000
+            self.vaciados += 1
+            self.ultimo_vaciado_ms = duracion_ms
+            self.max_vaciado_ms = max(self.max_vaciado_ms, duracion_ms)
+            self._total_vaciado_ms += duracion_ms
+            return len(lote)
+    
+    def iniciar(self):
+        """Inicia el hilo que vacía el buffer periódicamente"""
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._ciclo, name='acumulador-incrementos', daemon=True)
+        self._hilo.start()
+    
+    def detener(self):
+        """Detiene el hilo y escribe lo que quede pendiente (llamar al apagar la app)"""
+        self._detener.set()
+        self._despertar.set()
+        if self._hilo:
+            self._hilo.join(timeout=5)
+        self.vaciar()
+    
+    def estadisticas(self):
+        """Métricas del buffer: profundidad actual y latencia de escritura"""
+        with self._lock:
+            profundidad = len(self._pendientes)
+        
+        return {
+            'profundidad': profundidad,
+            'incrementos': self.incrementos,
+            'vaciados': self.vaciados,
+            'errores': self.errores,
+            'ultimo_vaciado_ms': round(self.ultimo_vaciado_ms, 2),
+            'promedio_vaciado_ms': round(self._total_vaciado_ms / self.vaciados, 2) if self.vaciados else 0.0,
+            'max_vaciado_ms': round(self.max_vaciado_ms, 2)
+        }
+    
+    def _ciclo(self):
+        """Bucle del hilo de fondo"""
+        while not self._detener.is_set():
+            self._despertar.wait(self.intervalo_ms / 1000)
+            self._despertar.clear()
+            self.vaciar()
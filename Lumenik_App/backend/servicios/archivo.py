@@ -0,0 +1,60 @@
+"""
+archivo.py - Archivado de trabajos cerrados fuera de la colección activa
+"""
+from datetime import datetime, timedelta
+
+TIPO_ARCHIVAR_TRABAJOS = 'archivar_trabajos'
+
+def parametros_archivo(antiguedad_dias):
+    """Parámetros de una tarea de archivado (el corte se fija al crearla para poder reanudarla)"""
+    return {
+        'antiguedad_dias': antiguedad_dias,
+        'corte': datetime.now() - timedelta(days=antiguedad_dias)
+    }
+
+class ArchivadorTrabajos:
+    """Manejador de la tarea que mueve trabajos cerrados antiguos al archivo, por lotes"""
+    
+    def __init__(self, repo_trabajo, tamano_lote=500):
+        """
+        Inicializa el archivador
+        
+        Args:
+            repo_trabajo: Repositorio de trabajos
+            tamano_lote (int): Trabajos por lote
+        """
+        self.repo_trabajo = repo_trabajo
+        self.tamano_lote = tamano_lote
+    
+    def __call__(self, tarea, reportar):
+        """
+        Archiva lote a lote desde el cursor guardado en la tarea
+        
+        Args:
+            tarea (dict): Tarea con parametros.corte y el cursor de reanudación
+            reportar (callable): Guarda el cursor y los archivados de cada lote
+        
+        Returns:
+            dict: Resumen de esta ejecución
+        """
+        corte = tarea['parametros']['corte']
+        cursor = tarea.get('cursor')
+        archivados = 0
+        lotes = 0
+        
+        while True:
+            registros = self.repo_trabajo.obtener_archivables(corte, cursor, self.tamano_lote)
+            if not registros:
+                break
+            
+            cantidad = self.repo_trabajo.archivar(registros)
+            cursor = registros[-1]['_id']
+            archivados += cantidad
+            lotes += 1
+            reportar(cursor, cantidad)
+        
+        return {
+            'archivados': tarea.get('procesados', 0) + archivados,
+            'lotes': lotes,
+            'corte': corte.isoformat()
+        }
@@ -0,0 +1,198 @@
+"""
+bitacora.py - Logging estructurado (JSON) escrito desde un hilo de fondo
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, has_request_context, request
+
+CABECERA_ID_PETICION = 'X-Request-ID'
+
+# Claves cuyo valor nunca se escribe en la bitácora (se comparan en minúsculas)
+CAMPOS_SENSIBLES = {
+    'authorization', 'token', 'contraseña', 'contraseña_actual', 'contraseña_nueva',
+    'contraseña_hash', 'password', 'jwt_secret_key', 'secret_key'
+}
+REDACTADO = '[REDACTADO]'
+
+# Atributos propios de LogRecord; el resto de record.__dict__ viene de extra=
+_ATRIBUTOS_REGISTRO = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+def redactar(valor):
+    """
+    Copia un valor reemplazando los campos sensibles
+    
+    Args:
+        valor: dict, lista o valor simple
+    
+    Returns:
+        Copia del valor con los campos sensibles como [REDACTADO]
+    """
+    if isinstance(valor, dict):
+        return {
+            clave: REDACTADO if str(clave).lower() in CAMPOS_SENSIBLES else redactar(contenido)
+            for clave, contenido in valor.items()
+        }
+    if isinstance(valor, (list, tuple)):
+        return [redactar(elemento) for elemento in valor]
+    return valor
+
+class FormateadorJSON(logging.Formatter):
+    """Convierte cada registro en una línea JSON (corre en el hilo de la bitácora)"""
+    
+    def format(self, record):
+        entrada = {
+            'fecha': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage()
+        }
+        for clave, valor in record.__dict__.items():
+            if clave not in _ATRIBUTOS_REGISTRO and not clave.startswith('_'):
+                entrada[clave] = valor
+        if record.exc_text:
+            entrada['excepcion'] = record.exc_text
+        return json.dumps(redactar(entrada), ensure_ascii=False, default=str)
+
+class FiltroContexto(logging.Filter):
+    """
+    Agrega el ID de petición, la ruta y el rol del usuario a cada registro
+    
+    Va en el QueueHandler, así que corre en el hilo de la petición, que es
+    el único que tiene acceso al contexto de Flask.
+    """
+    
+    def filter(self, record):
+        if has_request_context():
+            record.id_peticion = g.get('id_peticion')
+            if not hasattr(record, 'ruta'):
+                record.ruta = request.url_rule.rule if request.url_rule else request.path
+            usuario = getattr(request, 'usuario_actual', None)
+            if usuario and not hasattr(record, 'rol'):
+                record.rol = usuario.get('rol')
+        return True
+
+class FiltroMuestreo(logging.Filter):
+    """
+    Deja pasar una fracción de los registros por debajo de WARNING
+    
+    Los registros marcados con _muestreado ya pasaron el muestreo al crearse.
+    """
+    
+    def __init__(self, muestreo=1.0):
+        super().__init__()
+        self.muestreo = muestreo
+    
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.muestreo >= 1 or getattr(record, '_muestreado', False):
+            return True
+        return random.random() < self.muestreo
+
+class QueueHandlerSinFormato(QueueHandler):
+    """
+    QueueHandler que no formatea en el hilo de la petición
+    
+    QueueHandler.prepare() arma el mensaje y el traceback antes de encolar;
+    aquí solo se copia el registro y el formato JSON queda para el hilo de la
+    bitácora. El traceback sí se resuelve aquí porque el objeto excepción no
+    debe cruzar de hilo.
+    """
+    
+    def prepare(self, record):
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class EscuchaPorLotes(QueueListener):
+    """
+    QueueListener que despierta cada intervalo y vacía la cola de una vez
+    
+    El QueueListener estándar despierta con cada registro y compite por el
+    GIL con el hilo de la petición que acaba de encolarlo; aquí, si la cola
+    está vacía, el hilo espera un intervalo antes de volver a bloquearse,
+    así que con tráfico alto escribe por lotes.
+    """
+    
+    def __init__(self, cola, *manejadores, intervalo_segundos=0.05, **kwargs):
+        super().__init__(cola, *manejadores, **kwargs)
+        self.intervalo_segundos = intervalo_segundos
+    
+    def dequeue(self, block):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            time.sleep(self.intervalo_segundos)
+            return self.queue.get(block)
+    
+    def stop(self):
+        """Escribe lo pendiente y detiene el hilo (no hace nada si ya se detuvo)"""
+        if self._thread is not None:
+            super().stop()
+
+def configurar_bitacora(app, nivel='INFO', muestreo=1.0, destino=None):
+    """
+    Envía los logs de la aplicación a una cola atendida por un hilo de fondo
+    
+    Las peticiones solo encolan el registro; el formato JSON y la escritura
+    ocurren en el hilo del QueueListener. Además registra una línea por
+    petición con su método, ruta, estado, latencia y rol.
+    
+    Args:
+        app: Aplicación Flask
+        nivel (str): Nivel mínimo (DEBUG, INFO, WARNING, ERROR)
+        muestreo (float): Fracción de registros INFO/DEBUG que se conservan (0 a 1)
+        destino: Stream donde se escriben las líneas (stdout por defecto)
+    
+    Returns:
+        EscuchaPorLotes: Escucha iniciado (se detiene solo al apagar)
+    """
+    salida = logging.StreamHandler(destino or sys.stdout)
+    salida.setFormatter(FormateadorJSON())
+    
+    cola = queue.SimpleQueue()
+    manejador = QueueHandlerSinFormato(cola)
+    manejador.addFilter(FiltroMuestreo(muestreo))
+    manejador.addFilter(FiltroContexto())
+    
+    raiz = logging.getLogger()
+    for anterior in [m for m in raiz.handlers if isinstance(m, QueueHandlerSinFormato)]:
+        raiz.removeHandler(anterior)
+    raiz.addHandler(manejador)
+    raiz.setLevel(nivel)
+    
+    escucha = EscuchaPorLotes(cola, salida, respect_handler_level=True)
+    escucha.start()
+    atexit.register(escucha.stop)
+    
+    registro_peticiones = logging.getLogger('lumenik.peticiones')
+    
+    @app.before_request
+    def iniciar_peticion():
+        g.id_peticion = request.headers.get(CABECERA_ID_PETICION) or uuid.uuid4().hex
+        g.inicio_peticion = time.perf_counter()
+    
+    @app.after_request
+    def registrar_peticion(respuesta):
+        inicio = g.get('inicio_peticion')
+        # El muestreo se decide antes de crear el registro, que es lo costoso
+        if inicio is not None and registro_peticiones.isEnabledFor(logging.INFO) \
+                and (muestreo >= 1 or random.random() < muestreo):
+            registro_peticiones.info('%s %s', request.method, request.path, extra={
+                'metodo': request.method,
+                'estado': respuesta.status_code,
+                'latencia_ms': round((time.perf_counter() - inicio) * 1000, 2),
+                '_muestreado': True
+            })
+        if 'id_peticion' in g:
+            respuesta.headers[CABECERA_ID_PETICION] = g.id_peticion
+        return respuesta
+    
+    return escucha
@@ -0,0 +1,72 @@
+"""
+cache.py - Caché en memoria con expiración
+"""
+import threading
+import time
+from collections import OrderedDict
+
+class CacheTTL:
+    """Caché LRU acotada con tiempo de vida por entrada (segura entre hilos)"""
+    
+    def __init__(self, max_entradas=256, ttl_segundos=None):
+        """
+        Inicializa la caché
+        
+        Args:
+            max_entradas (int): Número máximo de entradas antes de expulsar la más antigua
+            ttl_segundos (float): Tiempo de vida por defecto (None = sin expiración)
+        """
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+    
+    def obtener(self, clave):
+        """Obtiene un valor de la caché o None si no existe o expiró"""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            
+            valor, expira = entrada
+            if expira is not None and expira <= time.monotonic():
+                del self._entradas[clave]
+                self.fallos += 1
+                return None
+            
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+    
+    def guardar(self, clave, valor, ttl_segundos=None):
+        """Guarda un valor en la caché"""
+        ttl = ttl_segundos if ttl_segundos is not None else self.ttl_segundos
+        expira = time.monotonic() + ttl if ttl is not None else None
+        
+        with self._lock:
+            self._entradas[clave] = (valor, expira)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+    
+    def invalidar(self, clave=None):
+        """Elimina una entrada, o todas si no se indica clave"""
+        with self._lock:
+            if clave is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(clave, None)
+    
+    def estadisticas(self):
+        """Obtiene métricas de uso de la caché"""
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                'entradas': len(self._entradas),
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': round(self.aciertos / total, 4) if total else 0.0
+            }
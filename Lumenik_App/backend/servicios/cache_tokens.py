@@ -0,0 +1,67 @@
+"""
+cache_tokens.py - Caché de tokens JWT ya verificados
+"""
+import hashlib
+import os
+import threading
+import time
+from servicios.cache import CacheTTL
+
+class CacheTokensVerificados:
+    """
+    Guarda el payload de cada token verificado hasta su exp
+    
+    La clave es el SHA-256 del token, así que la caché no guarda tokens
+    utilizables. Cada entrada lleva la generación de su usuario: invalidar un
+    usuario sube su generación y sus entradas dejan de servir sin recorrer la
+    caché.
+    """
+    
+    def __init__(self, max_entradas=10000):
+        """
+        Inicializa la caché
+        
+        Args:
+            max_entradas (int): Tokens verificados que se conservan (LRU)
+        """
+        self._cache = CacheTTL(max_entradas=max_entradas)
+        self._generaciones = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _clave(token):
+        """Digest del token usado como clave"""
+        return hashlib.sha256(token.encode('utf-8')).digest()
+    
+    def obtener(self, token):
+        """Devuelve el payload verificado del token o None"""
+        clave = self._clave(token)
+        entrada = self._cache.obtener(clave)
+        if entrada is None:
+            return None
+        
+        payload, generacion = entrada
+        if generacion != self._generaciones.get(payload.get('usuario_id'), 0):
+            self._cache.invalidar(clave)
+            return None
+        return payload
+    
+    def guardar(self, token, payload):
+        """Guarda un payload recién verificado hasta que el token expire"""
+        ttl = payload.get('exp', 0) - time.time()
+        if ttl <= 0:
+            return
+        generacion = self._generaciones.get(payload.get('usuario_id'), 0)
+        self._cache.guardar(self._clave(token), (payload, generacion), ttl)
+    
+    def invalidar_usuario(self, usuario_id):
+        """Descarta todos los tokens en caché de un usuario (desactivación, contraseña nueva)"""
+        with self._lock:
+            self._generaciones[str(usuario_id)] = self._generaciones.get(str(usuario_id), 0) + 1
+    
+    def estadisticas(self):
+        """Métricas de la caché en este worker"""
+        estadisticas = self._cache.estadisticas()
+        estadisticas['worker'] = os.getpid()
+        estadisticas['usuarios_invalidados'] = len(self._generaciones)
+        return estadisticas
@@ -0,0 +1,152 @@
+"""
+catalogo.py - Mapa en memoria del catálogo de juegos para validar selecciones
+"""
+import threading
+import time
+
+class CatalogoJuegos:
+    """Mapa juego_id -> (peso_gb, consola, disponible), sincronizado con las escrituras del catálogo"""
+    
+    def __init__(self, repo_juego, recarga_segundos=300, recarga_por_fallo_segundos=5):
+        """
+        Inicializa el catálogo (se carga en el primer uso)
+        
+        Args:
+            repo_juego: Repositorio de juegos
+            recarga_segundos (float): Cada cuánto se recarga completo, para tomar
+                cambios hechos fuera de este proceso (None = nunca)
+            recarga_por_fallo_segundos (float): Antigüedad mínima del mapa para
+                recargarlo cuando una selección pide un juego desconocido o no
+                disponible (None = nunca)
+        """
+        self.repo_juego = repo_juego
+        self.recarga_segundos = recarga_segundos
+        self.recarga_por_fallo_segundos = recarga_por_fallo_segundos
+        self._juegos = {}
+        self._cargado_en = None
+        self._lock = threading.Lock()
+    
+    def recargar(self):
+        """Carga el catálogo completo con una sola consulta"""
+        juegos = {
+            str(j['_id']): (float(j.get('peso_gb') or 0), j.get('consola'), j.get('disponible', True))
+            for j in self.repo_juego.obtener_para_catalogo()
+        }
+        with self._lock:
+            self._juegos = juegos
+            self._cargado_en = time.monotonic()
+    
+    def sincronizar(self, juego_id, datos):
+        """
+        Aplica al mapa los campos escritos en un juego
+        
+        Args:
+            juego_id (str): ID del juego
+            datos (dict): Campos escritos (peso_gb, consola y/o disponible)
+        """
+        juego_id = str(juego_id)
+        with self._lock:
+            if self._cargado_en is None:
+                return
+            
+            actual = self._juegos.get(juego_id)
+            if actual is None and not {'peso_gb', 'consola'} <= set(datos):
+                # Un juego que no conocemos y no trae todos sus campos: recargar en el próximo uso
+                self._cargado_en = None
+                return
+            
+            peso_gb, consola, disponible = actual or (0.0, None, True)
+            self._juegos[juego_id] = (
+                float(datos.get('peso_gb', peso_gb)),
+                datos.get('consola', consola),
+                datos.get('disponible', disponible)
+            )
+    
+    def quitar(self, juego_id):
+        """Quita un juego eliminado del mapa"""
+        with self._lock:
+            self._juegos.pop(str(juego_id), None)
+    
+    def evaluar_seleccion(self, juego_ids, consola=None, capacidad_gb=None):
+        """
+        Calcula el tamaño de una selección y verifica consola, disponibilidad y espacio
+        
+        Args:
+            juego_ids (list): IDs de los juegos seleccionados
+            consola (str): Consola del trabajo (opcional, se toma de los juegos)
+            capacidad_gb (float): Espacio del dispositivo (opcional, 0 = sin límite)
+        
+        Returns:
+            tuple: (resumen con gb_seleccion y consola, mensaje de error o None)
+        """
+        juegos = self._mapa()
+        
+        # El juego puede haberse creado o habilitado en otro worker desde la última carga
+        if self._hay_fallos(juegos, juego_ids) and self._recarga_por_fallo_permitida():
+            self.recargar()
+            juegos = self._juegos
+        
+        total_gb = 0.0
+        consolas = set()
+        no_encontrados = []
+        no_disponibles = []
+        
+        for juego_id in juego_ids:
+            juego = juegos.get(str(juego_id))
+            if juego is None:
+                no_encontrados.append(str(juego_id))
+                continue
+            
+            peso_gb, consola_juego, disponible = juego
+            if not disponible:
+                no_disponibles.append(str(juego_id))
+            total_gb += peso_gb
+            consolas.add(consola_juego)
+        
+        if no_encontrados:
+            return None, f'Juegos no encontrados: {", ".join(no_encontrados)}'
+        
+        if no_disponibles:
+            return None, f'Juegos no disponibles: {", ".join(no_disponibles)}'
+        
+        if len(consolas) > 1:
+            return None, f'Todos los juegos deben ser de la misma consola (se recibieron: {", ".join(sorted(consolas))})'
+        
+        if consola and consolas and consola not in consolas:
+            return None, f'Los juegos seleccionados son de {consolas.pop()}, no de {consola}'
+        if consola:
+            consolas = {consola}
+        
+        total_gb = round(total_gb, 2)
+        if capacidad_gb and total_gb > capacidad_gb:
+            return None, f'La selección ({total_gb}GB) excede el espacio disponible ({capacidad_gb}GB)'
+        
+        return {
+            'gb_seleccion': total_gb,
+            'consola': consolas.pop() if consolas else None
+        }, None
+    
+    @staticmethod
+    def _hay_fallos(juegos, juego_ids):
+        """Indica si algún juego de la selección no está en el mapa o no está disponible"""
+        for juego_id in juego_ids:
+            juego = juegos.get(str(juego_id))
+            if juego is None or not juego[2]:
+                return True
+        return False
+    
+    def _recarga_por_fallo_permitida(self):
+        """Limita las recargas por fallo a una por recarga_por_fallo_segundos"""
+        if self.recarga_por_fallo_segundos is None:
+            return False
+        cargado_en = self._cargado_en
+        return cargado_en is None or time.monotonic() - cargado_en >= self.recarga_por_fallo_segundos
+    
+    def _mapa(self):
+        """Devuelve el mapa, cargándolo o recargándolo si hace falta"""
+        cargado_en = self._cargado_en
+        if cargado_en is None or (
+            self.recarga_segundos is not None and time.monotonic() - cargado_en >= self.recarga_segundos
+        ):
+            self.recargar()
+        return self._juegos
@@ -0,0 +1,156 @@
+"""
+contrasenas.py - Pool acotado para el hash y la verificación de contraseñas (bcrypt)
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, ALL_COMPLETED
+from controladores.autenticacion_controlador import hash_contraseña, verificar_contraseña
+
+logger = logging.getLogger(__name__)
+
+class ServicioSaturado(Exception):
+    """El pool de contraseñas tiene la cola llena; la petición debe reintentarse"""
+    
+    def __init__(self, reintentar_en=1):
+        super().__init__('Servidor ocupado, intenta de nuevo en unos segundos')
+        self.reintentar_en = reintentar_en
+
+class EjecutorContrasenas:
+    """
+    Ejecuta bcrypt en un pool de hilos propio (bcrypt libera el GIL)
+    
+    Una ráfaga de logins ocupa solo max_hilos hilos; el resto de los workers
+    sigue atendiendo lecturas baratas. Si además hay max_en_cola trabajos
+    esperando, las nuevas peticiones fallan al instante con ServicioSaturado
+    en vez de hacer cola indefinidamente.
+    """
+    
+    def __init__(self, max_hilos=4, max_en_cola=32, rondas=12):
+        """
+        Inicializa el pool
+        
+        Args:
+            max_hilos (int): Operaciones bcrypt simultáneas
+            max_en_cola (int): Operaciones que pueden esperar un hilo libre
+            rondas (int): Factor de trabajo (log2 de iteraciones) para los hashes nuevos
+        """
+        self.max_hilos = max_hilos
+        self.max_en_cola = max_en_cola
+        self.rondas = rondas
+        self._pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix='bcrypt')
+        self._lock = threading.Lock()
+        self._en_curso = 0
+        # Métricas
+        self.completadas = 0
+        self.rechazadas = 0
+    
+    def hash(self, contraseña):
+        """Genera el hash de una contraseña con el factor de trabajo configurado"""
+        return self._ejecutar(hash_contraseña, contraseña, self.rondas)
+    
+    def verificar(self, contraseña, hash_guardado):
+        """Verifica una contraseña contra su hash"""
+        return self._ejecutar(verificar_contraseña, contraseña, hash_guardado)
+    
+    def hash_lote(self, contraseñas, simultaneas=None):
+        """
+        Genera los hashes de muchas contraseñas en paralelo
+        
+        Nunca tiene más de 'simultaneas' hashes en el pool (por defecto
+        max_hilos - 1), así que los logins que lleguen durante una importación
+        siempre encuentran un hilo libre y no compiten por la cola de espera.
+        
+        Args:
+            contraseñas (list): Contraseñas en claro
+            simultaneas (int): Hashes a la vez (opcional)
+        
+        Returns:
+            list: Hashes en el mismo orden que las contraseñas
+        """
+        simultaneas = simultaneas or max(1, self.max_hilos - 1)
+        hashes = [None] * len(contraseñas)
+        en_vuelo = {}
+        
+        def recoger(cuando):
+            listos, _ = wait(en_vuelo, return_when=cuando)
+            indices = {futuro: en_vuelo.pop(futuro) for futuro in listos}
+            with self._lock:
+                self._en_curso -= len(listos)
+                self.completadas += len(listos)
+            for futuro, indice in indices.items():
+                hashes[indice] = futuro.result()
+        
+        try:
+            for indice, contraseña in enumerate(contraseñas):
+                if len(en_vuelo) >= simultaneas:
+                    recoger(FIRST_COMPLETED)
+                with self._lock:
+                    self._en_curso += 1
+                en_vuelo[self._pool.submit(hash_contraseña, contraseña, self.rondas)] = indice
+        finally:
+            # Esperar también a los que siguen en vuelo si algo falló, para no descuadrar _en_curso
+            if en_vuelo:
+                recoger(ALL_COMPLETED)
+        return hashes
+    
+    def hash_en_segundo_plano(self, contraseña, al_terminar):
+        """
+        Genera un hash sin esperar el resultado, solo si hay hilos libres
+        
+        Pensado para trabajo opcional (como regenerar un hash al hacer login):
+        nunca ocupa lugar en la cola que usan los logins.
+        
+        Args:
+            contraseña (str): Contraseña en claro
+            al_terminar (callable): Recibe el hash nuevo
+        
+        Returns:
+            bool: True si se programó, False si el pool estaba ocupado
+        """
+        with self._lock:
+            if self._en_curso >= self.max_hilos:
+                return False
+            self._en_curso += 1
+        
+        def tarea():
+            try:
+                al_terminar(hash_contraseña(contraseña, self.rondas))
+            except Exception:
+                logger.exception('Hash en segundo plano fallido')
+            finally:
+                with self._lock:
+                    self._en_curso -= 1
+                    self.completadas += 1
+        
+        self._pool.submit(tarea)
+        return True
+    
+    def estadisticas(self):
+        """Métricas del pool: ocupación, cola y rechazos"""
+        with self._lock:
+            en_curso = self._en_curso
+        
+        return {
+            'max_hilos': self.max_hilos,
+            'max_en_cola': self.max_en_cola,
+            'rondas': self.rondas,
+            'en_curso': min(en_curso, self.max_hilos),
+            'en_cola': max(0, en_curso - self.max_hilos),
+            'completadas': self.completadas,
+            'rechazadas': self.rechazadas
+        }
+    
+    def _ejecutar(self, funcion, *args):
+        """Envía la operación al pool y espera su resultado, o rechaza si está lleno"""
+        with self._lock:
+            if self._en_curso >= self.max_hilos + self.max_en_cola:
+                self.rechazadas += 1
+                raise ServicioSaturado()
+            self._en_curso += 1
+        
+        try:
+            return self._pool.submit(funcion, *args).result()
+        finally:
+            with self._lock:
+                self._en_curso -= 1
+                self.completadas += 1
@@ -0,0 +1,122 @@
+"""
+eliminacion_usuarios.py - Borrado en cascada de los datos de un usuario dado de baja
+"""
+import time
+from modelos.registro_trabajo import ESTADOS_CERRADOS
+
+TIPO_ELIMINAR_USUARIO = 'eliminar_usuario'
+
+# Valor que reemplaza el ID del usuario en los datos que se conservan para contabilidad
+ID_ANONIMO = 'usuario_eliminado'
+
+class EliminadorUsuarios:
+    """
+    Manejador de la tarea que borra o anonimiza los datos de un usuario, por lotes
+    
+    Recorre fases en orden: los trabajos abiertos del cliente se borran, los
+    cerrados (activos y archivados) y su libro de pagos se anonimizan para
+    no alterar ingresos ni reportes, los trabajos abiertos de un empleado
+    vuelven a la cola y el saldo y el perfil de cliente se borran. Al final
+    se borra el usuario.
+    
+    Cada lote toca como mucho tamano_lote documentos y va seguido de una
+    pausa fija más lo que tardó el propio lote, así que si MongoDB se
+    carga la tarea se frena sola. Cada fase filtra por el ID original, que
+    deja de coincidir una vez procesado el documento; reanudar tras un
+    reinicio repite como mucho una consulta vacía.
+    """
+    
+    def __init__(self, repo_usuario, repo_trabajo, repo_cliente, repo_pago, tamano_lote=500, pausa_ms=100):
+        """
+        Inicializa el eliminador
+        
+        Args:
+            repo_usuario: Repositorio de usuarios
+            repo_trabajo: Repositorio de trabajos
+            repo_cliente: Repositorio de clientes
+            repo_pago: Repositorio de pagos
+            tamano_lote (int): Documentos por lote
+            pausa_ms (int): Pausa mínima entre lotes
+        """
+        self.repo_usuario = repo_usuario
+        self.repo_trabajo = repo_trabajo
+        self.repo_cliente = repo_cliente
+        self.repo_pago = repo_pago
+        self.tamano_lote = tamano_lote
+        self.pausa_segundos = pausa_ms / 1000
+    
+    def _fases(self, usuario_id):
+        """Fases de la cascada: (nombre, colección, filtro, cambio o None para borrar)"""
+        anonimo = {'$set': {'cliente_id': ID_ANONIMO}}
+        return [
+            ('trabajos_borrados', self.repo_trabajo.coleccion,
+             {'cliente_id': usuario_id, 'estado': {'$nin': ESTADOS_CERRADOS}}, None),
+            ('trabajos_anonimizados', self.repo_trabajo.coleccion,
+             {'cliente_id': usuario_id}, {**anonimo, '$inc': {'version': 1}}),
+            ('archivados_anonimizados', self.repo_trabajo.archivo, {'cliente_id': usuario_id}, anonimo),
+            ('trabajos_devueltos_a_cola', self.repo_trabajo.coleccion,
+             {'empleado_id': usuario_id, 'estado': {'$in': ['pendiente', 'en_progreso']}},
+             {'$set': {'empleado_id': 'sin_asignar', 'estado': 'pendiente', 'reclamo_expira': None},
+              '$inc': {'version': 1}}),
+            ('pagos_anonimizados', self.repo_pago.coleccion, {'cliente_id': usuario_id}, anonimo),
+            ('saldos_borrados', self.repo_pago.saldos, {'_id': usuario_id}, None),
+            ('perfiles_borrados', self.repo_cliente.coleccion, {'usuario_id': usuario_id}, None)
+        ]
+    
+    def __call__(self, tarea, reportar):
+        """
+        Procesa las fases desde la guardada en el cursor de la tarea
+        
+        Args:
+            tarea (dict): Tarea con parametros.usuario_id y el cursor de reanudación
+            reportar (callable): Guarda la fase, los conteos y los documentos de cada lote
+        
+        Returns:
+            dict: Documentos borrados o anonimizados por fase
+        """
+        usuario_id = tarea['parametros']['usuario_id']
+        fases = self._fases(usuario_id)
+        avance = tarea.get('cursor') or {}
+        conteos = {nombre: 0 for nombre, *_ in fases}
+        conteos.update(avance.get('conteos', {}))
+        
+        for indice in range(avance.get('fase', 0), len(fases)):
+            nombre, coleccion, filtro, cambio = fases[indice]
+            while True:
+                inicio = time.perf_counter()
+                ids = [d['_id'] for d in coleccion.find(filtro, {'_id': 1}).limit(self.tamano_lote)]
+                if not ids:
+                    break
+                
+                # El filtro se repite: un documento que cambió desde el find no entra en esta fase
+                lote = {**filtro, '_id': {'$in': ids}}
+                if cambio is None:
+                    cantidad = coleccion.delete_many(lote).deleted_count
+                else:
+                    cantidad = coleccion.update_many(lote, cambio).modified_count
+                conteos[nombre] += cantidad
+                if cantidad and coleccion in (self.repo_trabajo.coleccion, self.repo_trabajo.archivo):
+                    self.repo_trabajo.invalidar_reportes()
+                reportar(self._avance(indice, fases, conteos), cantidad)
+                
+                if len(ids) < self.tamano_lote:
+                    break
+                time.sleep(self.pausa_segundos + time.perf_counter() - inicio)
+            
+            reportar(self._avance(indice + 1, fases, conteos), 0)
+        
+        return {
+            'usuario_id': usuario_id,
+            **conteos,
+            'usuario_borrado': self.repo_usuario.eliminar_definitivo(usuario_id)
+        }
+    
+    @staticmethod
+    def _avance(indice, fases, conteos):
+        """Cursor de la tarea: próxima fase a procesar y conteos acumulados"""
+        return {
+            'fase': indice,
+            'nombre_fase': fases[indice][0] if indice < len(fases) else 'usuario',
+            'total_fases': len(fases),
+            'conteos': dict(conteos)
+        }
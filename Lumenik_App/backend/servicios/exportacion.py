@@ -0,0 +1,181 @@
+"""
+exportacion.py - Exportación en streaming de trabajos y pagos (CSV / NDJSON)
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, timedelta
+from itertools import islice
+from bson.objectid import ObjectId
+from servicios.hidratacion import MapaIdentidad, PROYECCION_JUEGO, PROYECCION_USUARIO
+
+FORMATOS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+# Una fila 'cargo' por trabajo y una fila 'pago' por cada pago del trabajo
+COLUMNAS_CSV = [
+    'registro_id', 'fila', 'fecha', 'cliente_id', 'cliente', 'empleado_id', 'empleado',
+    'tipo_servicio', 'consola', 'juegos', 'gb_seleccion', 'estado', 'monto',
+    'costo', 'monto_pagado', 'saldo_pendiente', 'archivado'
+]
+
+def comprimir_gzip(fragmentos, nivel=6):
+    """Comprime en gzip un generador de texto a medida que se produce"""
+    compresor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+    for fragmento in fragmentos:
+        datos = compresor.compress(fragmento.encode('utf-8'))
+        if datos:
+            yield datos
+    yield compresor.flush()
+
+class ExportadorTrabajos:
+    """Genera la exportación lote a lote, con memoria constante"""
+    
+    def __init__(self, repo_trabajo, repo_usuario=None, repo_juego=None, tamano_lote=500):
+        """
+        Inicializa el exportador
+        
+        Args:
+            repo_trabajo: Repositorio de trabajos
+            repo_usuario: Repositorio de usuarios, para los nombres (opcional)
+            repo_juego: Repositorio de juegos, para los nombres (opcional)
+            tamano_lote (int): Registros por lote (una consulta de nombres por lote)
+        """
+        self.repo_trabajo = repo_trabajo
+        self.repo_usuario = repo_usuario
+        self.repo_juego = repo_juego
+        self.tamano_lote = tamano_lote
+    
+    def exportar(self, formato='csv', desde=None, hasta=None, despues_de=None):
+        """
+        Valida los parámetros y devuelve el generador de la exportación
+        
+        Args:
+            formato (str): csv o ndjson
+            desde (str): Fecha inicial YYYY-MM-DD o ISO 8601 (opcional)
+            hasta (str): Fecha final inclusiva YYYY-MM-DD o ISO 8601 (opcional)
+            despues_de (str): Último registro_id recibido, para reanudar (opcional)
+        
+        Returns:
+            tuple: (generador de texto, mensaje de error o None)
+        """
+        if formato not in FORMATOS:
+            return None, f'Formato inválido. Debe ser: {", ".join(FORMATOS)}'
+        
+        try:
+            fecha_inicio = datetime.fromisoformat(desde) if desde else None
+            fecha_fin = datetime.fromisoformat(hasta) if hasta else None
+        except ValueError:
+            return None, 'Las fechas deben tener formato YYYY-MM-DD o ISO 8601'
+        
+        # Una fecha sin hora incluye el día completo
+        if fecha_fin and len(hasta) == 10:
+            fecha_fin += timedelta(days=1)
+        
+        if despues_de:
+            try:
+                despues_de = ObjectId(despues_de)
+            except:
+                return None, 'despues_de debe ser un registro_id válido'
+        
+        registros = self.repo_trabajo.iterar_exportacion(fecha_inicio, fecha_fin, despues_de, self.tamano_lote)
+        return self._generar(registros, formato), None
+    
+    def _generar(self, registros, formato):
+        """Produce el texto de la exportación lote a lote"""
+        mapa = MapaIdentidad()
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        
+        if formato == 'csv':
+            escritor.writerow(COLUMNAS_CSV)
+        
+        while True:
+            lote = list(islice(registros, self.tamano_lote))
+            if not lote:
+                break
+            
+            usuarios, juegos = self._resolver_nombres(lote, mapa)
+            
+            for registro in lote:
+                if formato == 'csv':
+                    escritor.writerows(self._filas_csv(registro, usuarios, juegos))
+                else:
+                    buffer.write(json.dumps(self._objeto(registro, usuarios, juegos), ensure_ascii=False))
+                    buffer.write('\n')
+            
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        
+        if buffer.tell():
+            yield buffer.getvalue()
+    
+    def _resolver_nombres(self, lote, mapa):
+        """Resuelve clientes, empleados y juegos del lote con una consulta $in por colección"""
+        usuarios = {}
+        juegos = {}
+        
+        if self.repo_usuario:
+            ids = [r.get(c) for r in lote for c in ('cliente_id', 'empleado_id') if r.get(c)]
+            usuarios = mapa.resolver('usuarios', ids, lambda faltantes: self.repo_usuario.obtener_por_ids(faltantes, PROYECCION_USUARIO))
+        
+        if self.repo_juego:
+            ids = [str(j) for r in lote for j in r.get('juegos_instalados', [])]
+            juegos = mapa.resolver('juegos', ids, lambda faltantes: self.repo_juego.obtener_por_ids(faltantes, PROYECCION_JUEGO))
+        
+        return usuarios, juegos
+    
+    @staticmethod
+    def _nombre_usuario(usuarios, usuario_id):
+        """Nombre completo de un usuario resuelto, o vacío"""
+        usuario = usuarios.get(usuario_id)
+        return (usuario.get('nombre_completo') or usuario.get('nombre_usuario', '')) if usuario else ''
+    
+    def _objeto(self, registro, usuarios, juegos):
+        """Registro completo para NDJSON (los pagos quedan anidados)"""
+        costo = float(registro.get('costo', 0))
+        monto_pagado = float(registro.get('monto_pagado', 0))
+        return {
+            'registro_id': str(registro['_id']),
+            'fecha': registro['fecha_creacion'].isoformat() if registro.get('fecha_creacion') else None,
+            'fecha_fin': registro['fecha_fin'].isoformat() if registro.get('fecha_fin') else None,
+            'cliente_id': registro.get('cliente_id'),
+            'cliente': self._nombre_usuario(usuarios, registro.get('cliente_id')),
+            'empleado_id': registro.get('empleado_id'),
+            'empleado': self._nombre_usuario(usuarios, registro.get('empleado_id')),
+            'tipo_servicio': registro.get('tipo_servicio'),
+            'consola': registro.get('consola'),
+            'juegos': [
+                (juegos.get(str(j)) or {}).get('nombre') or str(j)
+                for j in registro.get('juegos_instalados', [])
+            ],
+            'gb_seleccion': registro.get('gb_seleccion', 0.0),
+            'descripcion': registro.get('descripcion', ''),
+            'estado': registro.get('estado'),
+            'costo': costo,
+            'monto_pagado': monto_pagado,
+            'saldo_pendiente': max(0, costo - monto_pagado),
+            'pagos': registro.get('pagos', []),
+            'archivado': registro.get('archivado') is not None
+        }
+    
+    def _filas_csv(self, registro, usuarios, juegos):
+        """Filas CSV de un registro: el cargo y luego un renglón por pago"""
+        objeto = self._objeto(registro, usuarios, juegos)
+        base = [
+            objeto['registro_id'], 'cargo', objeto['fecha'], objeto['cliente_id'], objeto['cliente'],
+            objeto['empleado_id'], objeto['empleado'], objeto['tipo_servicio'], objeto['consola'],
+            '; '.join(objeto['juegos']), objeto['gb_seleccion'], objeto['estado'], objeto['costo'],
+            objeto['costo'], objeto['monto_pagado'], objeto['saldo_pendiente'], objeto['archivado']
+        ]
+        filas = [base]
+        
+        for pago in objeto['pagos']:
+            fila = list(base)
+            fila[1] = 'pago'
+            fila[2] = pago.get('fecha')
+            fila[12] = pago.get('monto')
+            filas.append(fila)
+        
+        return filas
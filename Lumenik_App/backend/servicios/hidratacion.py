@@ -0,0 +1,137 @@
+"""
+hidratacion.py - Resolución en lote de juegos y usuarios referenciados por los trabajos
+"""
+
+EXPANSIONES_VALIDAS = ['juegos', 'cliente', 'empleado']
+
+PROYECCION_JUEGO = {'nombre': 1, 'consola': 1, 'peso_gb': 1}
+PROYECCION_USUARIO = {'nombre_usuario': 1, 'nombre_completo': 1, 'email': 1, 'telefono': 1}
+
+def parsear_expandir(valor):
+    """
+    Convierte el parámetro ?expandir=juegos,cliente en un conjunto
+    
+    Returns:
+        tuple: (conjunto de expansiones, mensaje de error o None)
+    """
+    if not valor:
+        return set(), None
+    
+    expansiones = {e.strip() for e in valor.split(',') if e.strip()}
+    invalidas = expansiones - set(EXPANSIONES_VALIDAS)
+    if invalidas:
+        return set(), f'Expansión inválida: {", ".join(sorted(invalidas))}. Debe ser: {", ".join(EXPANSIONES_VALIDAS)}'
+    
+    return expansiones, None
+
+class MapaIdentidad:
+    """Documentos ya resueltos durante una petición, para no pedir dos veces el mismo ID"""
+    
+    def __init__(self):
+        """Inicializa el mapa vacío"""
+        self._documentos = {}
+    
+    def resolver(self, coleccion, ids, cargar):
+        """
+        Devuelve los documentos de los IDs pedidos, cargando solo los que faltan
+        
+        Args:
+            coleccion (str): Nombre lógico de la colección
+            ids (iterable): IDs (str) a resolver
+            cargar (callable): Recibe la lista de IDs faltantes y devuelve ID -> documento
+        
+        Returns:
+            dict: ID -> documento (None si no existe)
+        """
+        conocidos = self._documentos.setdefault(coleccion, {})
+        faltantes = [i for i in set(ids) if i not in conocidos]
+        
+        if faltantes:
+            encontrados = cargar(faltantes)
+            # Los IDs inexistentes también se recuerdan para no volver a buscarlos
+            for registro_id in faltantes:
+                conocidos[registro_id] = encontrados.get(registro_id)
+        
+        return {i: conocidos.get(i) for i in ids}
+
+class HidratadorRegistros:
+    """Agrega a los registros de trabajo los juegos, cliente y empleado referenciados"""
+    
+    def __init__(self, repo_juego=None, repo_usuario=None):
+        """
+        Inicializa el hidratador
+        
+        Args:
+            repo_juego: Repositorio de juegos
+            repo_usuario: Repositorio de usuarios (clientes y empleados)
+        """
+        self.repo_juego = repo_juego
+        self.repo_usuario = repo_usuario
+    
+    def hidratar(self, registros, expandir):
+        """
+        Resuelve las referencias de una página de registros con una consulta por colección
+        
+        Args:
+            registros (list): Registros ya formateados (con cliente_id, empleado_id, juegos_instalados)
+            expandir (set): Expansiones pedidas (juegos, cliente, empleado)
+        
+        Returns:
+            list: Los mismos registros con los campos juegos, cliente y/o empleado
+        """
+        if not expandir or not registros:
+            return registros
+        
+        mapa = MapaIdentidad()
+        
+        if 'juegos' in expandir and self.repo_juego:
+            ids = [j for r in registros for j in r.get('juegos_instalados', [])]
+            juegos = mapa.resolver('juegos', ids, self._cargar_juegos)
+            for registro in registros:
+                registro['juegos'] = [self._formato_juego(j, juegos.get(j)) for j in registro.get('juegos_instalados', [])]
+        
+        # Clientes y empleados viven en la misma colección: una sola consulta para ambos
+        campos_usuario = [c for c in ('cliente', 'empleado') if c in expandir]
+        if campos_usuario and self.repo_usuario:
+            ids = [r.get(f'{c}_id') for r in registros for c in campos_usuario if r.get(f'{c}_id')]
+            usuarios = mapa.resolver('usuarios', ids, self._cargar_usuarios)
+            for registro in registros:
+                for campo in campos_usuario:
+                    registro[campo] = self._formato_usuario(usuarios.get(registro.get(f'{campo}_id')))
+        
+        return registros
+    
+    def _cargar_juegos(self, ids):
+        """Carga juegos con una consulta $in"""
+        return self.repo_juego.obtener_por_ids(ids, PROYECCION_JUEGO)
+    
+    def _cargar_usuarios(self, ids):
+        """Carga usuarios con una consulta $in (sin datos sensibles)"""
+        return self.repo_usuario.obtener_por_ids(ids, PROYECCION_USUARIO)
+    
+    @staticmethod
+    def _formato_juego(juego_id, juego):
+        """Formato de un juego expandido"""
+        if not juego:
+            return {'id': juego_id, 'nombre': None, 'consola': None, 'peso_gb': None}
+        
+        return {
+            'id': juego_id,
+            'nombre': juego.get('nombre'),
+            'consola': juego.get('consola'),
+            'peso_gb': juego.get('peso_gb')
+        }
+    
+    @staticmethod
+    def _formato_usuario(usuario):
+        """Formato de un cliente o empleado expandido"""
+        if not usuario:
+            return None
+        
+        return {
+            'id': str(usuario['_id']),
+            'nombre_usuario': usuario.get('nombre_usuario'),
+            'nombre_completo': usuario.get('nombre_completo'),
+            'email': usuario.get('email'),
+            'telefono': usuario.get('telefono', '')
+        }
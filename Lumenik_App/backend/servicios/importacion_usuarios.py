@@ -0,0 +1,170 @@
+"""
+importacion_usuarios.py - Alta de usuarios en lote (endpoint e importar_usuarios.py)
+"""
+import logging
+from controladores.autenticacion_controlador import hash_contraseña
+from modelos.usuario import Usuario, ROLES_GESTIONABLES
+from modelos.cliente import Cliente
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_REQUERIDOS = ['nombre_usuario', 'email', 'contraseña', 'nombre_completo']
+CAMPOS_TEXTO = CAMPOS_REQUERIDOS + ['telefono', 'rol', 'direccion', 'ciudad']
+CONSOLAS_VALIDAS = ['PSP', 'PS2', 'PS3', 'PS4']
+LONGITUD_MINIMA_CONTRASEÑA = 8
+
+class ImportadorUsuarios:
+    """
+    Crea muchos usuarios de una vez, con un informe por fila
+    
+    La unicidad de nombres de usuario y emails se comprueba contra el propio
+    lote y contra la base con una sola consulta $in; las contraseñas se
+    procesan en paralelo y usuarios y perfiles de cliente se insertan con un
+    insert_many no ordenado cada uno, así que una fila rechazada no detiene
+    a las demás.
+    """
+    
+    def __init__(self, repo_usuario, repo_cliente=None, ejecutor_contrasenas=None, simultaneas=None):
+        """
+        Inicializa el importador
+        
+        Args:
+            repo_usuario: Repositorio de usuarios
+            repo_cliente: Repositorio de clientes; sin él no se crean perfiles (opcional)
+            ejecutor_contrasenas (EjecutorContrasenas): Pool para bcrypt; sin él
+                los hashes se calculan uno a uno (opcional)
+            simultaneas (int): Hashes a la vez (por defecto, los hilos del pool menos uno)
+        """
+        self.repo_usuario = repo_usuario
+        self.repo_cliente = repo_cliente
+        self.ejecutor_contrasenas = ejecutor_contrasenas
+        self.simultaneas = simultaneas
+    
+    def importar(self, filas):
+        """
+        Valida e inserta un lote de usuarios
+        
+        Args:
+            filas (list): Diccionarios con nombre_usuario, email, contraseña,
+                nombre_completo y opcionalmente telefono, rol (empleado|cliente,
+                por defecto cliente), consolas, direccion y ciudad
+        
+        Returns:
+            dict: {creados, errores, filas} con, por fila, su número (desde 1),
+                el nombre de usuario y usuario_id o error
+        """
+        informe = [{'fila': numero, 'nombre_usuario': None} for numero in range(1, len(filas) + 1)]
+        validas = []
+        nombres_vistos, emails_vistos = {}, {}
+        
+        for indice, fila in enumerate(filas):
+            datos, error = self._validar(fila)
+            if datos:
+                informe[indice]['nombre_usuario'] = datos['nombre_usuario']
+            if not error:
+                # Dentro del lote gana la primera aparición
+                if datos['nombre_usuario'] in nombres_vistos:
+                    error = f'Nombre de usuario repetido en la fila {nombres_vistos[datos["nombre_usuario"]] + 1}'
+                elif datos['email'] in emails_vistos:
+                    error = f'Email repetido en la fila {emails_vistos[datos["email"]] + 1}'
+            if error:
+                informe[indice]['error'] = error
+                continue
+            nombres_vistos[datos['nombre_usuario']] = indice
+            emails_vistos[datos['email']] = indice
+            validas.append((indice, datos))
+        
+        nombres_usados, emails_usados = self.repo_usuario.obtener_existentes(
+            list(nombres_vistos), list(emails_vistos)
+        )
+        pendientes = []
+        for indice, datos in validas:
+            if datos['nombre_usuario'] in nombres_usados:
+                informe[indice]['error'] = 'El nombre de usuario ya existe'
+            elif datos['email'] in emails_usados:
+                informe[indice]['error'] = 'El email ya está registrado'
+            else:
+                pendientes.append((indice, datos))
+        
+        hashes = self._hashes([datos['contraseña'] for _, datos in pendientes])
+        usuarios = [
+            Usuario(
+                nombre_usuario=datos['nombre_usuario'],
+                contraseña_hash=contraseña_hash,
+                email=datos['email'],
+                rol=datos['rol'],
+                nombre_completo=datos['nombre_completo'],
+                telefono=datos['telefono'],
+                consolas=datos['consolas'] if datos['rol'] == 'empleado' else []
+            )
+            for (_, datos), contraseña_hash in zip(pendientes, hashes)
+        ]
+        
+        clientes = []
+        for (indice, datos), (usuario_id, error) in zip(pendientes, self.repo_usuario.crear_lote(usuarios)):
+            if error:
+                informe[indice]['error'] = error
+                continue
+            informe[indice]['usuario_id'] = usuario_id
+            if datos['rol'] == 'cliente':
+                clientes.append(Cliente(
+                    usuario_id=usuario_id,
+                    telefono=datos['telefono'],
+                    direccion=datos['direccion'],
+                    ciudad=datos['ciudad'],
+                    consolas_principales=datos['consolas'] or None
+                ))
+        
+        # El usuario ya existe aunque falle su perfil: se informa sin deshacer el alta
+        if self.repo_cliente:
+            errores_perfil = self.repo_cliente.crear_lote(clientes)
+            for fila in informe:
+                if fila.get('usuario_id') in errores_perfil:
+                    fila['aviso'] = f'Perfil de cliente no creado: {errores_perfil[fila["usuario_id"]]}'
+        
+        creados = sum(1 for fila in informe if 'usuario_id' in fila)
+        logger.info('Importación de usuarios', extra={'filas': len(filas), 'creados': creados})
+        return {'creados': creados, 'errores': len(filas) - creados, 'filas': informe}
+    
+    def _hashes(self, contraseñas):
+        """Hashes de las contraseñas, en paralelo si hay pool"""
+        if self.ejecutor_contrasenas:
+            return self.ejecutor_contrasenas.hash_lote(contraseñas, self.simultaneas)
+        return [hash_contraseña(contraseña) for contraseña in contraseñas]
+    
+    @staticmethod
+    def _validar(fila):
+        """
+        Normaliza y valida una fila
+        
+        Returns:
+            tuple: (datos normalizados o None, mensaje de error o None)
+        """
+        if not isinstance(fila, dict):
+            return None, 'La fila debe ser un objeto'
+        
+        datos = {}
+        for campo in CAMPOS_TEXTO:
+            valor = fila.get(campo)
+            if valor is not None and not isinstance(valor, str):
+                return None, f'El campo {campo} debe ser texto'
+            datos[campo] = (valor or '').strip()
+        datos['rol'] = datos['rol'] or 'cliente'
+        
+        faltantes = [campo for campo in CAMPOS_REQUERIDOS if not datos[campo]]
+        if faltantes:
+            return datos if datos['nombre_usuario'] else None, f'Campos requeridos: {", ".join(faltantes)}'
+        
+        if datos['rol'] not in ROLES_GESTIONABLES:
+            return datos, f'Rol inválido. Debe ser: {", ".join(ROLES_GESTIONABLES)}'
+        if len(datos['contraseña']) < LONGITUD_MINIMA_CONTRASEÑA:
+            return datos, f'La contraseña debe tener al menos {LONGITUD_MINIMA_CONTRASEÑA} caracteres'
+        
+        consolas = fila.get('consolas') or []
+        if isinstance(consolas, str):
+            consolas = [c.strip() for c in consolas.split(';') if c.strip()]
+        if not isinstance(consolas, list) or any(c not in CONSOLAS_VALIDAS for c in consolas):
+            return datos, f'Consolas inválidas. Deben ser: {", ".join(CONSOLAS_VALIDAS)}'
+        datos['consolas'] = consolas
+        
+        return datos, None
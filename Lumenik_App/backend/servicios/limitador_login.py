@@ -0,0 +1,245 @@
+"""
+limitador_login.py - Límite de intentos de login (token bucket por IP y por usuario)
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+class AlmacenMemoria:
+    """
+    Estado del limitador en memoria del worker (LRU acotado)
+    
+    Cualquier almacén con los mismos obtener(), modificar() y eliminar()
+    puede reemplazarlo; RepositorioLimiteLogin guarda el estado en MongoDB
+    para compartirlo entre workers.
+    """
+    
+    def __init__(self, max_entradas=100000):
+        """
+        Inicializa el almacén
+        
+        Args:
+            max_entradas (int): Claves que se conservan antes de expulsar la más antigua
+        """
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def obtener(self, clave):
+        """Devuelve el estado de una clave o None si no existe o expiró"""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+        if entrada is None or entrada[1] <= time.monotonic():
+            return None
+        return entrada[0]
+    
+    def modificar(self, clave, funcion, ttl_segundos):
+        """
+        Lee, transforma y guarda el estado de una clave de forma atómica
+        
+        Args:
+            clave (str): Clave del estado
+            funcion (callable): Recibe el estado actual (o None) y devuelve el nuevo
+            ttl_segundos (float): Tiempo tras el cual el estado se descarta
+        
+        Returns:
+            dict: Estado nuevo
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            estado = entrada[0] if entrada and entrada[1] > ahora else None
+            nuevo = funcion(estado)
+            self._entradas[clave] = (nuevo, ahora + ttl_segundos)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return nuevo
+    
+    def eliminar(self, clave):
+        """Descarta el estado de una clave"""
+        with self._lock:
+            self._entradas.pop(clave, None)
+
+def _consumir_ficha(capacidad, por_segundo, ahora):
+    """Transformación token bucket: recarga según el tiempo pasado y gasta una ficha"""
+    def aplicar(estado):
+        if estado is None:
+            fichas = capacidad
+        else:
+            fichas = min(capacidad, estado['fichas'] + (ahora - estado['marca']) * por_segundo)
+        
+        permitido = fichas >= 1
+        if permitido:
+            fichas -= 1
+        return {'fichas': fichas, 'marca': ahora, 'permitido': permitido}
+    return aplicar
+
+def _registrar_fallo(ahora):
+    """Transformación que suma un fallo y guarda su momento"""
+    def aplicar(estado):
+        fallos = estado['fallos'] + 1 if estado else 1
+        return {'fallos': fallos, 'ultimo': ahora}
+    return aplicar
+
+class LimitadorLogin:
+    """
+    Límite de intentos de login antes de buscar al usuario o calcular bcrypt
+    
+    Cada intento gasta una ficha del bucket de su IP y otra del bucket del
+    nombre de usuario. Además, a partir del fallo fallos_libres + 1 de una
+    misma IP sobre un mismo usuario, cada fallo duplica la espera obligatoria
+    antes del siguiente intento.
+    
+    Para que un ataque repartido entre muchas IPs no deje fuera al dueño de
+    la cuenta, la espera se limita a la IP que falla y una IP que ya entró
+    correctamente con ese usuario no gasta fichas de su bucket.
+    """
+    
+    def __init__(self, almacen, ip_capacidad=20, ip_recarga_por_minuto=10,
+                 usuario_capacidad=10, usuario_recarga_por_minuto=5,
+                 fallos_libres=3, espera_base_segundos=1, espera_maxima_segundos=300,
+                 ventana_fallos_segundos=900, vigencia_ip_conocida_segundos=30 * 86400):
+        """
+        Inicializa el limitador
+        
+        Args:
+            almacen: Almacén del estado (AlmacenMemoria o uno compartido)
+            ip_capacidad (int): Intentos seguidos permitidos por IP
+            ip_recarga_por_minuto (float): Intentos por minuto que recupera una IP
+            usuario_capacidad (int): Intentos seguidos permitidos por nombre de usuario
+            usuario_recarga_por_minuto (float): Intentos por minuto que recupera un usuario
+            fallos_libres (int): Fallos sin espera antes de empezar el backoff
+            espera_base_segundos (float): Primera espera del backoff
+            espera_maxima_segundos (float): Espera máxima del backoff
+            ventana_fallos_segundos (float): Tiempo sin fallos tras el que se olvidan
+            vigencia_ip_conocida_segundos (float): Tiempo que una IP con un login
+                correcto queda exenta del bucket de ese usuario
+        """
+        self.almacen = almacen
+        self.ip_capacidad = ip_capacidad
+        self.ip_por_segundo = ip_recarga_por_minuto / 60
+        self.usuario_capacidad = usuario_capacidad
+        self.usuario_por_segundo = usuario_recarga_por_minuto / 60
+        self.fallos_libres = fallos_libres
+        self.espera_base_segundos = espera_base_segundos
+        self.espera_maxima_segundos = espera_maxima_segundos
+        self.ventana_fallos_segundos = ventana_fallos_segundos
+        self.vigencia_ip_conocida_segundos = vigencia_ip_conocida_segundos
+        self._lock = threading.Lock()
+        # Métricas
+        self.permitidos = 0
+        self.rechazados_ip = 0
+        self.rechazados_usuario = 0
+        self.rechazados_espera = 0
+        self.fallos = 0
+    
+    def verificar(self, ip, nombre_usuario):
+        """
+        Decide si un intento de login puede continuar
+        
+        Args:
+            ip (str): Dirección del cliente
+            nombre_usuario (str): Nombre de usuario del intento
+        
+        Returns:
+            int: 0 si puede continuar, o segundos a esperar antes de reintentar
+        """
+        ahora = time.time()
+        nombre_usuario = self._normalizar(nombre_usuario)
+        
+        # El backoff se consulta primero y no gasta fichas
+        espera = self._espera_pendiente(ip, nombre_usuario, ahora)
+        if espera > 0:
+            return self._rechazar('rechazados_espera', espera)
+        
+        bucket_ip = self.almacen.modificar(
+            f'ip:{ip}',
+            _consumir_ficha(self.ip_capacidad, self.ip_por_segundo, ahora),
+            self.ip_capacidad / self.ip_por_segundo
+        )
+        if not bucket_ip['permitido']:
+            return self._rechazar('rechazados_ip', (1 - bucket_ip['fichas']) / self.ip_por_segundo)
+        
+        if self.almacen.obtener(self._clave_conocida(ip, nombre_usuario)):
+            with self._lock:
+                self.permitidos += 1
+            return 0
+        
+        bucket_usuario = self.almacen.modificar(
+            f'usuario:{nombre_usuario}',
+            _consumir_ficha(self.usuario_capacidad, self.usuario_por_segundo, ahora),
+            self.usuario_capacidad / self.usuario_por_segundo
+        )
+        if not bucket_usuario['permitido']:
+            return self._rechazar('rechazados_usuario', (1 - bucket_usuario['fichas']) / self.usuario_por_segundo)
+        
+        with self._lock:
+            self.permitidos += 1
+        return 0
+    
+    def registrar_fallo(self, ip, nombre_usuario):
+        """Cuenta un login fallido de la IP sobre el usuario"""
+        self.almacen.modificar(
+            self._clave_fallos(ip, self._normalizar(nombre_usuario)),
+            _registrar_fallo(time.time()),
+            self.ventana_fallos_segundos
+        )
+        with self._lock:
+            self.fallos += 1
+    
+    def registrar_exito(self, ip, nombre_usuario):
+        """Olvida los fallos de la IP sobre el usuario y la marca como conocida"""
+        nombre_usuario = self._normalizar(nombre_usuario)
+        ahora = time.time()
+        self.almacen.eliminar(self._clave_fallos(ip, nombre_usuario))
+        self.almacen.modificar(
+            self._clave_conocida(ip, nombre_usuario),
+            lambda estado: {'desde': estado['desde'] if estado else ahora},
+            self.vigencia_ip_conocida_segundos
+        )
+    
+    def estadisticas(self):
+        """Métricas del limitador en este worker"""
+        with self._lock:
+            rechazados = self.rechazados_ip + self.rechazados_usuario + self.rechazados_espera
+            return {
+                'permitidos': self.permitidos,
+                'rechazados': rechazados,
+                'rechazados_ip': self.rechazados_ip,
+                'rechazados_usuario': self.rechazados_usuario,
+                'rechazados_espera': self.rechazados_espera,
+                'fallos': self.fallos
+            }
+    
+    def _espera_pendiente(self, ip, nombre_usuario, ahora):
+        """Segundos que faltan para que termine el backoff (0 si no hay)"""
+        estado = self.almacen.obtener(self._clave_fallos(ip, nombre_usuario))
+        if not estado or estado['fallos'] <= self.fallos_libres:
+            return 0
+        
+        exponente = estado['fallos'] - self.fallos_libres - 1
+        espera = min(self.espera_maxima_segundos, self.espera_base_segundos * 2 ** exponente)
+        return max(0, estado['ultimo'] + espera - ahora)
+    
+    def _rechazar(self, contador, espera):
+        """Cuenta el rechazo y devuelve la espera redondeada hacia arriba"""
+        with self._lock:
+            setattr(self, contador, getattr(self, contador) + 1)
+        return max(1, math.ceil(espera))
+    
+    @staticmethod
+    def _normalizar(nombre_usuario):
+        """Nombre de usuario tal como se usa en las claves"""
+        return str(nombre_usuario or '').strip().lower()
+    
+    @staticmethod
+    def _clave_fallos(ip, nombre_usuario):
+        """Clave del contador de fallos de una IP sobre un usuario"""
+        return f'fallos:{ip}:{nombre_usuario}'
+    
+    @staticmethod
+    def _clave_conocida(ip, nombre_usuario):
+        """Clave que marca una IP con un login correcto de un usuario"""
+        return f'conocida:{ip}:{nombre_usuario}'
@@ -0,0 +1,164 @@
+"""
+lote.py - Despacho de varias peticiones de la API dentro de una sola
+"""
+import logging
+from urllib.parse import unquote, urlsplit
+from flask import current_app
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RequestRedirect
+from werkzeug.test import EnvironBuilder
+
+logger = logging.getLogger(__name__)
+
+# Clave del entorno WSGI con el usuario ya verificado por la petición del lote.
+# Los clientes no pueden fijarla: las cabeceras HTTP llegan como HTTP_*.
+ENTORNO_USUARIO_VERIFICADO = 'lumenik.usuario_verificado'
+
+METODOS_LOTE = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+
+class DespachadorLote:
+    """Ejecuta sub-peticiones a través del mapa de URLs de Flask"""
+    
+    def __init__(self, consultas, maximo_peticiones=20, endpoint_lote='lote.ejecutar_lote'):
+        """
+        Inicializa el despachador
+        
+        Args:
+            consultas (ConsultasParalelas): Pool para las lecturas concurrentes
+            maximo_peticiones (int): Sub-peticiones permitidas por lote
+            endpoint_lote (str): Endpoint de Flask del propio lote (no puede anidarse)
+        """
+        self.consultas = consultas
+        self.maximo_peticiones = maximo_peticiones
+        self.endpoint_lote = endpoint_lote
+    
+    def validar(self, peticiones):
+        """
+        Valida la lista de sub-peticiones
+        
+        Returns:
+            str: Mensaje de error o None
+        """
+        if not isinstance(peticiones, list) or not peticiones:
+            return 'Se requiere una lista de peticiones'
+        
+        if len(peticiones) > self.maximo_peticiones:
+            return f'Máximo {self.maximo_peticiones} peticiones por lote'
+        
+        for indice, peticion in enumerate(peticiones):
+            if not isinstance(peticion, dict):
+                return f'Petición {indice}: debe ser un objeto con metodo, ruta y cuerpo'
+            
+            metodo = str(peticion.get('metodo', 'GET')).upper()
+            ruta = peticion.get('ruta')
+            
+            if metodo not in METODOS_LOTE:
+                return f'Petición {indice}: método inválido. Debe ser: {", ".join(METODOS_LOTE)}'
+            
+            if not isinstance(ruta, str):
+                return f'Petición {indice}: la ruta debe empezar con /api/'
+            
+            # La sub-petición se despacha con la ruta decodificada ('/api/%6cote' es '/api/lote')
+            ruta = unquote(ruta.partition('?')[0])
+            if not ruta.startswith('/api/'):
+                return f'Petición {indice}: la ruta debe empezar con /api/'
+            
+            if self._endpoint(ruta, metodo) == self.endpoint_lote:
+                return f'Petición {indice}: no se pueden anidar lotes'
+        
+        return None
+    
+    @staticmethod
+    def _endpoint(ruta, metodo):
+        """Endpoint de Flask al que llegaría la sub-petición (None si no hay ninguno)"""
+        adaptador = current_app.url_map.bind('')
+        try:
+            return adaptador.match(ruta, metodo)[0]
+        except RequestRedirect as redireccion:
+            # Barra final u otra forma canónica: se resuelve la ruta a la que redirige
+            try:
+                return adaptador.match(unquote(urlsplit(redireccion.new_url).path), metodo)[0]
+            except HTTPException:
+                return None
+        except HTTPException:
+            return None
+    
+    def despachar(self, app, peticiones, usuario, cabeceras=None, direccion_remota=None):
+        """
+        Ejecuta las sub-peticiones y devuelve sus respuestas en el mismo orden
+        
+        Las lecturas (GET) seguidas se ejecutan a la vez; cada escritura espera a
+        que terminen las anteriores y se ejecuta sola, así el lote respeta el
+        orden en que el cliente envió las escrituras.
+        
+        Args:
+            app: Aplicación Flask
+            peticiones (list): Sub-peticiones ya validadas
+            usuario (dict): Payload del token verificado una sola vez para todo el lote
+            cabeceras (dict): Cabeceras a copiar en cada sub-petición (opcional)
+            direccion_remota (str): IP del cliente del lote, para que el límite de
+                login de cada sub-petición cuente contra ella (opcional)
+        
+        Returns:
+            list: {estado, cuerpo} por sub-petición
+        """
+        respuestas = [None] * len(peticiones)
+        lecturas = {}
+        
+        for indice, peticion in enumerate(peticiones):
+            metodo = str(peticion.get('metodo', 'GET')).upper()
+            ejecutar = self._preparar(app, metodo, peticion, usuario, cabeceras, direccion_remota)
+            
+            if metodo == 'GET':
+                lecturas[indice] = ejecutar
+                continue
+            
+            self._ejecutar_lecturas(lecturas, respuestas)
+            respuestas[indice] = ejecutar()
+        
+        self._ejecutar_lecturas(lecturas, respuestas)
+        return respuestas
+    
+    def _ejecutar_lecturas(self, lecturas, respuestas):
+        """Ejecuta en paralelo las lecturas acumuladas"""
+        if not lecturas:
+            return
+        
+        resultados, _ = self.consultas.ejecutar(lecturas)
+        for indice, respuesta in resultados.items():
+            respuestas[indice] = respuesta
+        lecturas.clear()
+    
+    @staticmethod
+    def _preparar(app, metodo, peticion, usuario, cabeceras, direccion_remota=None):
+        """Devuelve una función que despacha la sub-petición en su propio contexto"""
+        ruta, _, consulta = peticion['ruta'].partition('?')
+        constructor = EnvironBuilder(
+            path=ruta,
+            query_string=consulta,
+            method=metodo,
+            headers=cabeceras or {},
+            json=peticion.get('cuerpo') if metodo != 'GET' else None,
+            environ_base={'REMOTE_ADDR': direccion_remota} if direccion_remota else None
+        )
+        entorno = constructor.get_environ()
+        entorno[ENTORNO_USUARIO_VERIFICADO] = usuario
+        
+        def ejecutar():
+            try:
+                with app.request_context(entorno):
+                    respuesta = app.full_dispatch_request()
+            except Exception:
+                logger.exception('Sub-petición %s %s fallida', metodo, peticion['ruta'])
+                return {'estado': 500, 'cuerpo': {'error': 'Error interno del servidor'}}
+            
+            try:
+                if respuesta.is_streamed:
+                    return {'estado': 400, 'cuerpo': {'error': 'Las respuestas en streaming no pueden ir en un lote'}}
+                if respuesta.is_json:
+                    return {'estado': respuesta.status_code, 'cuerpo': respuesta.get_json()}
+                return {'estado': respuesta.status_code, 'cuerpo': respuesta.get_data(as_text=True)}
+            finally:
+                respuesta.close()
+        
+        return ejecutar
@@ -0,0 +1,53 @@
+"""
+paralelo.py - Ejecución concurrente de consultas independientes
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class ConsultasParalelas:
+    """Ejecuta varias consultas a la vez en un pool de hilos compartido"""
+    
+    def __init__(self, max_hilos=8):
+        """
+        Inicializa el pool
+        
+        Args:
+            max_hilos (int): Consultas que pueden correr a la vez entre todas las peticiones
+        """
+        self._pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix='consultas')
+    
+    def ejecutar(self, consultas):
+        """
+        Ejecuta las consultas en paralelo y espera a que terminen todas
+        
+        Args:
+            consultas (dict): nombre -> función sin argumentos
+        
+        Returns:
+            tuple: (resultados por nombre, milisegundos por nombre)
+        
+        Raises:
+            Exception: La primera excepción de una consulta, tras esperar al resto
+        """
+        futuros = {nombre: self._pool.submit(self._medir, consulta) for nombre, consulta in consultas.items()}
+        
+        resultados = {}
+        tiempos = {}
+        error = None
+        for nombre, futuro in futuros.items():
+            try:
+                resultados[nombre], tiempos[nombre] = futuro.result()
+            except Exception as e:
+                error = error or e
+        
+        if error:
+            raise error
+        
+        return resultados, tiempos
+    
+    @staticmethod
+    def _medir(consulta):
+        """Ejecuta una consulta y devuelve (resultado, milisegundos)"""
+        inicio = time.perf_counter()
+        resultado = consulta()
+        return resultado, round((time.perf_counter() - inicio) * 1000, 2)
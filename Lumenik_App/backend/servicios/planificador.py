@@ -0,0 +1,153 @@
+"""
+planificador.py - Asignación automática de trabajos según la carga de los empleados
+"""
+import logging
+import heapq
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Una instalación pendiente pesa como estos GB aunque sea pequeña (preparación, copia, pruebas)
+GB_POR_TRABAJO = 10.0
+
+def gb_trabajo(trabajo):
+    """GB de los juegos de un trabajo (total_gb en los registros anteriores a gb_seleccion)"""
+    gb = trabajo.get('gb_seleccion')
+    if gb is None:
+        gb = trabajo.get('total_gb')
+    return float(gb or 0)
+
+def planificar(trabajos, empleados, cargas, gb_por_trabajo=GB_POR_TRABAJO):
+    """
+    Reparte trabajos entre empleados minimizando la carga abierta de cada uno
+    
+    Cada consola tiene un montículo con los empleados que la atienden (los que
+    no declaran consolas atienden todas). Asignar un trabajo cuesta O(log E), y
+    las entradas que quedan viejas en otros montículos se descartan al salir.
+    
+    Args:
+        trabajos (list): Dicts con _id, consola y gb_seleccion (o total_gb si son
+            anteriores a gb_seleccion), en orden de prioridad
+        empleados (list): Dicts con _id y consolas
+        cargas (dict): empleado_id -> {'trabajos': int, 'gb': float} abiertos
+    
+    Returns:
+        list: Tuplas (trabajo, empleado_id) con las asignaciones
+    """
+    puntaje = {}
+    consolas_de = {}
+    generales = []
+    consolas = set(t.get('consola') for t in trabajos)
+    
+    for empleado in empleados:
+        empleado_id = str(empleado['_id'])
+        carga = cargas.get(empleado_id, {})
+        puntaje[empleado_id] = carga.get('gb', 0.0) + gb_por_trabajo * carga.get('trabajos', 0)
+        consolas_de[empleado_id] = set(empleado.get('consolas') or [])
+        if not consolas_de[empleado_id]:
+            generales.append(empleado_id)
+        consolas |= consolas_de[empleado_id]
+    
+    # Los empleados generales compiten en todas las consolas
+    for empleado_id in generales:
+        consolas_de[empleado_id] = consolas
+    
+    monticulos = {consola: [] for consola in consolas}
+    for empleado_id, suyas in consolas_de.items():
+        for consola in suyas:
+            monticulos[consola].append((puntaje[empleado_id], empleado_id))
+    for monticulo in monticulos.values():
+        heapq.heapify(monticulo)
+    
+    asignaciones = []
+    for trabajo in trabajos:
+        monticulo = monticulos.get(trabajo.get('consola'))
+        
+        # Descartar entradas cuyo puntaje cambió por una asignación anterior
+        while monticulo and monticulo[0][0] != puntaje[monticulo[0][1]]:
+            heapq.heappop(monticulo)
+        if not monticulo:
+            continue
+        
+        _, empleado_id = heapq.heappop(monticulo)
+        asignaciones.append((trabajo, empleado_id))
+        
+        puntaje[empleado_id] += gb_trabajo(trabajo) + gb_por_trabajo
+        for consola in consolas_de[empleado_id]:
+            heapq.heappush(monticulos[consola], (puntaje[empleado_id], empleado_id))
+    
+    return asignaciones
+
+class PlanificadorAsignacion:
+    """Asigna periódicamente los trabajos sin asignar a los empleados activos"""
+    
+    def __init__(self, repo_trabajo, repo_usuario, intervalo_segundos=30, limite_pasada=1000):
+        """
+        Inicializa el planificador
+        
+        Args:
+            repo_trabajo: Repositorio de trabajos
+            repo_usuario: Repositorio de usuarios
+            intervalo_segundos (float): Tiempo entre pasadas
+            limite_pasada (int): Máximo de trabajos a asignar por pasada
+        """
+        self.repo_trabajo = repo_trabajo
+        self.repo_usuario = repo_usuario
+        self.intervalo_segundos = intervalo_segundos
+        self.limite_pasada = limite_pasada
+        self._detener = threading.Event()
+        self._hilo = None
+        self.ultima_pasada = None
+    
+    def ejecutar_pasada(self):
+        """
+        Ejecuta una pasada de asignación
+        
+        Los trabajos pendientes de empleados que ya no están activos vuelven a
+        repartirse, así que desactivar a alguien rebalancea su cola.
+        
+        Returns:
+            dict: Resumen de la pasada
+        """
+        inicio = time.perf_counter()
+        
+        empleados = self.repo_usuario.obtener_por_rol('empleado')
+        ids_activos = [str(e['_id']) for e in empleados]
+        
+        trabajos = self.repo_trabajo.obtener_asignables(ids_activos, self.limite_pasada)
+        asignaciones = []
+        if trabajos and empleados:
+            cargas = self.repo_trabajo.obtener_carga_por_empleado(ids_activos)
+            asignaciones = planificar(trabajos, empleados, cargas)
+            self.repo_trabajo.asignar_lote(asignaciones)
+        
+        self.ultima_pasada = {
+            'empleados_activos': len(empleados),
+            'trabajos_en_cola': len(trabajos),
+            'asignados': len(asignaciones),
+            'duracion_ms': round((time.perf_counter() - inicio) * 1000, 2)
+        }
+        return self.ultima_pasada
+    
+    def iniciar(self):
+        """Inicia las pasadas periódicas en un hilo de fondo"""
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._ciclo, name='planificador-asignacion', daemon=True)
+        self._hilo.start()
+    
+    def detener(self):
+        """Detiene el hilo de fondo"""
+        self._detener.set()
+        if self._hilo:
+            self._hilo.join(timeout=self.intervalo_segundos)
+    
+    def _ciclo(self):
+        """Bucle del hilo de fondo"""
+        while not self._detener.wait(self.intervalo_segundos):
+            try:
+                self.ejecutar_pasada()
+            except Exception:
+                logger.exception('Pasada del planificador fallida')
@@ -0,0 +1,89 @@
+"""
+politica_contrasenas.py - Parámetros de los hashes de contraseña y calibración del costo
+"""
+import re
+import time
+import bcrypt
+
+ALGORITMO = 'bcrypt'
+COSTO_MINIMO = 10  # Por debajo de esto no se recomienda bcrypt en producción
+COSTO_MAXIMO = 16
+
+# Formato modular de bcrypt: $2b$<costo>$<sal+hash>
+_FORMATO_BCRYPT = re.compile(r'^\$2[abxy]?\$(\d{2})\$')
+
+def parametros_hash(hash_guardado):
+    """
+    Lee el algoritmo y el costo con que se generó un hash
+    
+    Un hash bcrypt guarda ambos datos en su prefijo, así que cada hash ya
+    registra sus propios parámetros sin campos adicionales en el usuario.
+    
+    Args:
+        hash_guardado (str): Hash almacenado
+    
+    Returns:
+        dict: {algoritmo, costo} o None si el formato no se reconoce
+    """
+    coincidencia = _FORMATO_BCRYPT.match(hash_guardado or '')
+    if not coincidencia:
+        return None
+    return {'algoritmo': ALGORITMO, 'costo': int(coincidencia.group(1))}
+
+def necesita_rehash(hash_guardado, costo_objetivo):
+    """
+    Indica si un hash debe regenerarse con los parámetros actuales
+    
+    Args:
+        hash_guardado (str): Hash almacenado
+        costo_objetivo (int): Costo configurado (BCRYPT_RONDAS)
+    
+    Returns:
+        bool: True si el algoritmo o el costo difieren del objetivo
+    """
+    parametros = parametros_hash(hash_guardado)
+    if parametros is None:
+        return False  # Formato desconocido: no se puede verificar, no se toca
+    return parametros['costo'] != costo_objetivo
+
+def medir_costo(costo, repeticiones=3):
+    """
+    Mide la latencia de una verificación bcrypt con un costo dado
+    
+    Returns:
+        float: Milisegundos (mediana de las repeticiones)
+    """
+    hash_prueba = bcrypt.hashpw(b'calibracion-lumenik', bcrypt.gensalt(costo))
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        bcrypt.checkpw(b'calibracion-lumenik', hash_prueba)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return sorted(tiempos)[len(tiempos) // 2]
+
+def calibrar(latencia_objetivo_ms, costo_minimo=COSTO_MINIMO, costo_maximo=COSTO_MAXIMO):
+    """
+    Busca el mayor costo cuya verificación no supera la latencia objetivo
+    
+    Cada punto de costo duplica el tiempo, así que se mide desde el mínimo y se
+    detiene en cuanto un costo excede el objetivo.
+    
+    Args:
+        latencia_objetivo_ms (float): Latencia máxima aceptable por verificación
+        costo_minimo (int): Costo más bajo a considerar
+        costo_maximo (int): Costo más alto a considerar
+    
+    Returns:
+        tuple: (costo recomendado, lista de (costo, ms) medidos)
+    """
+    mediciones = []
+    recomendado = costo_minimo
+    
+    for costo in range(costo_minimo, costo_maximo + 1):
+        ms = medir_costo(costo)
+        mediciones.append((costo, ms))
+        if ms > latencia_objetivo_ms:
+            break
+        recomendado = costo
+    
+    return recomendado, mediciones
@@ -0,0 +1,163 @@
+"""
+revocaciones.py - Índice en memoria de usuarios revocados para token_requerido
+"""
+import logging
+import threading
+from datetime import timedelta
+
+logger = logging.getLogger(__name__)
+
+class IndiceRevocaciones:
+    """
+    Copia en memoria de la colección de revocaciones
+    
+    token_requerido consulta este índice en cada petición: un conjunto de
+    usuarios revocados y un diccionario usuario -> no_valido_antes, ambos con
+    costo O(1) y sin ir a la base de datos. Un hilo de fondo trae solo las
+    revocaciones nuevas cada intervalo_ms, así que un cambio hecho en otro
+    worker tarda como máximo ese intervalo en aplicarse aquí; en el worker
+    que lo registra se aplica al instante.
+    """
+    
+    # Se relee un poco hacia atrás para no perder escrituras de otros workers
+    # cuyo reloj va ligeramente atrasado
+    MARGEN_RELECTURA = timedelta(seconds=5)
+    
+    def __init__(self, repo_revocacion, intervalo_ms=1000):
+        """
+        Inicializa el índice
+        
+        Args:
+            repo_revocacion: Repositorio de revocaciones
+            intervalo_ms (int): Cada cuánto se traen las revocaciones nuevas
+        """
+        self.repo_revocacion = repo_revocacion
+        self.intervalo_ms = intervalo_ms
+        self._revocados = set()
+        self._no_valido_antes = {}
+        self._fechas = {}
+        self._ultima_fecha = None
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+        # Métricas
+        self.consultas = 0
+        self.rechazos = 0
+        self.refrescos = 0
+        self.errores = 0
+    
+    def token_revocado(self, payload):
+        """
+        Indica si un token verificado pertenece a un usuario revocado
+        
+        Args:
+            payload (dict): Payload del JWT (usuario_id, iat)
+        
+        Returns:
+            bool: True si el usuario está revocado o el token es anterior a
+                su no_valido_antes
+        """
+        usuario_id = payload.get('usuario_id')
+        self.consultas += 1
+        
+        revocado = usuario_id in self._revocados
+        if not revocado:
+            # El iat del JWT tiene resolución de segundos
+            no_valido_antes = self._no_valido_antes.get(usuario_id)
+            revocado = no_valido_antes is not None and payload.get('iat', 0) < int(no_valido_antes)
+        
+        if revocado:
+            self.rechazos += 1
+        return revocado
+    
+    def registrar(self, usuario_id, revocado=True):
+        """
+        Registra una revocación en la base de datos y la aplica en este worker
+        
+        Args:
+            usuario_id (str): ID del usuario
+            revocado (bool): True al desactivar o eliminar, False al reactivar
+                (los tokens anteriores a la revocación siguen sin servir)
+        """
+        self._aplicar(self.repo_revocacion.registrar(usuario_id, revocado))
+    
+    def invalidar_anteriores(self, usuario_id):
+        """
+        Invalida los tokens emitidos hasta ahora (cambio de contraseña) y lo
+        aplica en este worker; el usuario sigue revocado o no como estaba
+        
+        Args:
+            usuario_id (str): ID del usuario
+        """
+        self._aplicar(self.repo_revocacion.invalidar_anteriores(usuario_id))
+    
+    def refrescar(self):
+        """
+        Trae las revocaciones registradas desde el último refresco
+        
+        Returns:
+            int: Revocaciones aplicadas
+        """
+        desde = self._ultima_fecha - self.MARGEN_RELECTURA if self._ultima_fecha else None
+        try:
+            documentos = self.repo_revocacion.obtener_desde(desde)
+        except Exception:
+            self.errores += 1
+            logger.exception('No se pudieron leer las revocaciones')
+            return 0
+        
+        for documento in documentos:
+            self._aplicar(documento)
+        self.refrescos += 1
+        return len(documentos)
+    
+    def iniciar(self):
+        """Carga todas las revocaciones e inicia el hilo de refresco"""
+        self.refrescar()
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._ciclo, name='indice-revocaciones', daemon=True)
+        self._hilo.start()
+    
+    def detener(self):
+        """Detiene el hilo de refresco"""
+        self._detener.set()
+        if self._hilo:
+            self._hilo.join(timeout=5)
+    
+    def estadisticas(self):
+        """Métricas del índice en este worker"""
+        return {
+            'revocados': len(self._revocados),
+            'con_no_valido_antes': len(self._no_valido_antes),
+            'consultas': self.consultas,
+            'rechazos': self.rechazos,
+            'refrescos': self.refrescos,
+            'errores': self.errores
+        }
+    
+    def _aplicar(self, documento):
+        """Aplica un documento de revocación al índice"""
+        usuario_id = documento['usuario_id']
+        with self._lock:
+            # El mismo cambio puede llegar más de una vez (registro local y
+            # refresco); solo se aplica si es más reciente que lo conocido
+            conocido = self._fechas.get(usuario_id)
+            if conocido is not None and documento['fecha'] < conocido:
+                return
+            
+            self._fechas[usuario_id] = documento['fecha']
+            self._no_valido_antes[usuario_id] = documento['no_valido_antes']
+            if documento['revocado']:
+                self._revocados.add(usuario_id)
+            else:
+                self._revocados.discard(usuario_id)
+            
+            if self._ultima_fecha is None or documento['fecha'] > self._ultima_fecha:
+                self._ultima_fecha = documento['fecha']
+    
+    def _ciclo(self):
+        """Bucle del hilo de fondo"""
+        while not self._detener.wait(self.intervalo_ms / 1000):
+            self.refrescar()
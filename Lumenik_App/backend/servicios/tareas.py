@@ -0,0 +1,80 @@
+"""
+tareas.py - Ejecución de tareas largas en segundo plano, reanudables tras un reinicio
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from modelos.tarea import Tarea
+
+logger = logging.getLogger(__name__)
+
+class EjecutorTareas:
+    """Ejecuta tareas registradas en hilos de fondo y guarda su progreso en MongoDB"""
+    
+    def __init__(self, repo_tarea, max_hilos=1, vigencia_segundos=120):
+        """
+        Inicializa el ejecutor
+        
+        Args:
+            repo_tarea: Repositorio de tareas
+            max_hilos (int): Tareas que pueden correr a la vez
+            vigencia_segundos (int): Tiempo sin latido tras el cual una tarea
+                en_progreso se considera huérfana y puede reanudarse
+        """
+        self.repo_tarea = repo_tarea
+        self.vigencia_segundos = vigencia_segundos
+        self._manejadores = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix='tareas')
+    
+    def registrar(self, tipo, manejador):
+        """
+        Registra el manejador de un tipo de tarea
+        
+        Args:
+            tipo (str): Tipo de tarea
+            manejador (callable): Recibe (tarea, reportar) y devuelve el resultado.
+                reportar(cursor, procesados) guarda el punto de reanudación; al
+                reanudar, tarea['cursor'] trae el último guardado.
+        """
+        self._manejadores[tipo] = manejador
+    
+    def encolar(self, tipo, parametros=None):
+        """
+        Crea una tarea y la programa para ejecutarse en segundo plano
+        
+        Returns:
+            str: ID de la tarea
+        """
+        if tipo not in self._manejadores:
+            raise ValueError(f'Tipo de tarea no registrado: {tipo}')
+        
+        tarea_id = self.repo_tarea.crear(Tarea(tipo, parametros))
+        self._pool.submit(self._ejecutar, tarea_id)
+        return tarea_id
+    
+    def reanudar_pendientes(self):
+        """Programa las tareas pendientes o huérfanas (por ejemplo, al iniciar la app)"""
+        tarea_ids = self.repo_tarea.obtener_reanudables(self.vigencia_segundos)
+        for tarea_id in tarea_ids:
+            self._pool.submit(self._ejecutar, tarea_id)
+        return len(tarea_ids)
+    
+    def _ejecutar(self, tarea_id):
+        """Toma la tarea y corre su manejador, registrando el resultado"""
+        tarea = self.repo_tarea.tomar(tarea_id, self.vigencia_segundos)
+        if not tarea:
+            return
+        
+        manejador = self._manejadores.get(tarea['tipo'])
+        if not manejador:
+            self.repo_tarea.finalizar(tarea_id, 'fallida', error=f"Tipo de tarea no registrado: {tarea['tipo']}")
+            return
+        
+        def reportar(cursor, procesados=0):
+            self.repo_tarea.guardar_progreso(tarea_id, cursor, procesados)
+        
+        try:
+            resultado = manejador(tarea, reportar)
+            self.repo_tarea.finalizar(tarea_id, 'completada', resultado=resultado)
+        except Exception as e:
+            logger.exception('Tarea %s (%s) fallida', tarea_id, tarea['tipo'])
+            self.repo_tarea.finalizar(tarea_id, 'fallida', error=str(e))
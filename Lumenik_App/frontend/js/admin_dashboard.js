@@ -5,6 +5,10 @@
 // Variables globales para filtrado
 let todosLosTrabajos = [];
 let todosLosUsuarios = [];
+let cursorUsuarios = null;
+// Usuarios ya cargados (id -> usuario), para mostrar el cliente de cada trabajo
+const directorioUsuarios = new Map();
+let temporizadorBusquedaUsuarios = null;
 let todosLosJuegos = [];
 
 document.addEventListener('DOMContentLoaded', async () => {
@@ -15,11 +19,8 @@ document.addEventListener('DOMContentLoaded', async () => {
     // Configurar logout
     configurarLogout();
     
-    // Cargar datos
-    await cargarEstadisticas();
-    await cargarUsuarios();
-    await cargarJuegos();
-    await cargarTrabajos();
+    // Cargar datos (una sola petición; las listas completas se piden después si hace falta)
+    await cargarPanelAdmin();
     
     // Configurar eventos
     configurarEventosAdmin();
@@ -64,19 +65,40 @@ function cambiarTab(tabName) {
             break;
     }
 }
+/**
+ * Carga estadísticas y la primera página de cada lista en una sola petición
+ */
+async function cargarPanelAdmin() {
+    try {
+        const panel = await obtenerPanelAdminAPI();
+        
+        mostrarEstadisticas(panel.estadisticas.usuarios, panel.estadisticas.juegos, panel.estadisticas.trabajos);
+        mostrarUsuarios(panel.usuarios.elementos);
+        mostrarJuegos(panel.juegos.elementos);
+        mostrarTrabajos(panel.trabajos.elementos);
+        
+        // Completar en segundo plano las listas que no cupieron en la primera página
+        if (panel.usuarios.hay_mas) cargarUsuarios();
+        if (panel.juegos.hay_mas) cargarJuegos();
+        if (panel.trabajos.hay_mas) cargarTrabajos();
+        
+    } catch (error) {
+        mostrarNotificacion('Error al cargar el panel: ' + error.mensaje, 'error');
+    }
+}
+
 /**
  * Carga estadísticas del sistema
  */
 async function cargarEstadisticas() {
     try {
-        const statsUsuarios = await obtenerEstadisticasUsuariosAPI();
-        const statsJuegos = await obtenerEstadisticasJuegosAPI();
-        const statsTrabajo = await obtenerEstadisticasTrabajoAPI();
+        const [statsUsuarios, statsJuegos, statsTrabajo] = await loteAPI([
+            { metodo: 'GET', ruta: '/usuarios/estadisticas' },
+            { metodo: 'GET', ruta: '/juegos/estadisticas' },
+            { metodo: 'GET', ruta: '/trabajos/estadisticas' }
+        ]);
         
-        document.getElementById('stat-usuarios').textContent = statsUsuarios.total_usuarios;
-        document.getElementById('stat-juegos').textContent = statsJuegos.total_juegos;
-        document.getElementById('stat-trabajos').textContent = statsTrabajo.completados;
-        document.getElementById('stat-ingresos').textContent = formatearDinero(statsTrabajo.ingresos_total);
+        mostrarEstadisticas(statsUsuarios, statsJuegos, statsTrabajo);
         
     } catch (error) {
         console.error('Error al cargar estadísticas:', error);
@@ -84,16 +106,41 @@ async function cargarEstadisticas() {
 }
 
 /**
- * Carga la lista de usuarios
+ * Muestra los cuadros de estadísticas
+ */
+function mostrarEstadisticas(statsUsuarios, statsJuegos, statsTrabajo) {
+    document.getElementById('stat-usuarios').textContent = statsUsuarios.total_usuarios;
+    document.getElementById('stat-juegos').textContent = statsJuegos ? statsJuegos.total_juegos : 0;
+    document.getElementById('stat-trabajos').textContent = statsTrabajo.completados;
+    document.getElementById('stat-ingresos').textContent = formatearDinero(statsTrabajo.ingresos_total);
+}
+
+/**
+ * Lee los filtros de la sección de usuarios (el servidor filtra y ordena)
+ */
+function obtenerFiltrosUsuarios() {
+    const ordenes = { asc: 'nombre', desc: '-nombre' };
+    return {
+        q: document.getElementById('buscar-usuario')?.value.trim() || '',
+        rol: document.getElementById('filtro-rol-usuario')?.value || '',
+        estado: document.getElementById('filtro-estado-usuario')?.value || '',
+        orden: ordenes[document.getElementById('filtro-orden-nombre')?.value] || ''
+    };
+}
+
+/**
+ * Carga la primera página de usuarios, o la siguiente si agregar es true
  */
-async function cargarUsuarios() {
+async function cargarUsuarios(agregar = false) {
     try {
-        const respuesta = await obtenerTodosUsuariosAPI();
-        // Filtrar: excluir al administrador de la lista
-        todosLosUsuarios = respuesta.usuarios.filter(u => u.rol !== 'administrador');
+        const filtros = obtenerFiltrosUsuarios();
+        if (agregar && cursorUsuarios) filtros.despues = cursorUsuarios;
         
-        // Aplicar filtros y ordenamiento
-        aplicarFiltrosUsuarios();
+        const respuesta = await obtenerTodosUsuariosAPI(filtros);
+        todosLosUsuarios = agregar ? todosLosUsuarios.concat(respuesta.usuarios) : respuesta.usuarios;
+        registrarUsuarios(respuesta.usuarios);
+        cursorUsuarios = respuesta.siguiente;
+        renderizarUsuarios(todosLosUsuarios);
         
     } catch (error) {
         mostrarNotificacion('Error al cargar usuarios: ' + error.mensaje, 'error');
@@ -101,55 +148,41 @@ async function cargarUsuarios() {
 }
 
 /**
- * Aplica filtros y ordenamiento a la lista de usuarios
+ * Muestra la primera página de usuarios que viene en el panel
  */
-function aplicarFiltrosUsuarios() {
-    const busqueda = document.getElementById('buscar-usuario')?.value.toLowerCase() || '';
-    const filtroEstado = document.getElementById('filtro-estado-usuario')?.value || '';
-    const orden = document.getElementById('filtro-orden-nombre')?.value || '';
-    
-    // Filtrar usuarios
-    let usuariosFiltrados = todosLosUsuarios.filter(usuario => {
-        // Filtro por búsqueda (nombre de usuario o nombre completo)
-        if (busqueda) {
-            const coincideNombreUsuario = usuario.nombre_usuario.toLowerCase().includes(busqueda);
-            const coincideNombre = usuario.nombre_completo.toLowerCase().includes(busqueda);
-            if (!coincideNombreUsuario && !coincideNombre) {
-                return false;
-            }
-        }
-        
-        // Filtro por estado
-        if (filtroEstado && usuario.estado !== filtroEstado) {
-            return false;
-        }
-        
-        return true;
-    });
-    
-    // Ordenar usuarios por rol (empleado primero) y luego por nombre si aplica
-    usuariosFiltrados.sort((a, b) => {
-        // Primero: ordenar por rol (empleado > cliente)
-        const rolOrder = { 'empleado': 0, 'cliente': 1 };
-        const ordenA = rolOrder[a.rol] !== undefined ? rolOrder[a.rol] : 99;
-        const ordenB = rolOrder[b.rol] !== undefined ? rolOrder[b.rol] : 99;
-        
-        if (ordenA !== ordenB) {
-            return ordenA - ordenB;
-        }
-        
-        // Segundo: ordenar por nombre si se selecciona
-        if (orden === 'asc') {
-            return a.nombre_completo.localeCompare(b.nombre_completo);
-        } else if (orden === 'desc') {
-            return b.nombre_completo.localeCompare(a.nombre_completo);
-        }
-        
-        return 0;
-    });
-    
-    // Renderizar usuarios filtrados
-    renderizarUsuarios(usuariosFiltrados);
+function mostrarUsuarios(usuarios) {
+    todosLosUsuarios = usuarios;
+    registrarUsuarios(usuarios);
+    cursorUsuarios = null;
+    renderizarUsuarios(todosLosUsuarios);
+}
+
+/**
+ * Agrega usuarios al directorio
+ */
+function registrarUsuarios(usuarios) {
+    usuarios.forEach(usuario => directorioUsuarios.set(usuario.id, usuario));
+}
+
+/**
+ * Agrega al directorio los clientes que vienen expandidos en los trabajos
+ * 
+ * La lista de usuarios viene paginada y filtrada, así que el cliente de un
+ * trabajo puede no estar cargado; los trabajos se piden con expandir=cliente.
+ */
+function registrarClientesTrabajos(trabajos) {
+    trabajos
+        .filter(trabajo => trabajo.cliente && !directorioUsuarios.has(trabajo.cliente.id))
+        .forEach(trabajo => directorioUsuarios.set(trabajo.cliente.id, trabajo.cliente));
+}
+
+/**
+ * Vuelve a pedir la lista con los filtros actuales (la búsqueda espera a que se deje de escribir)
+ */
+function aplicarFiltrosUsuarios(evento) {
+    clearTimeout(temporizadorBusquedaUsuarios);
+    const espera = evento && evento.type === 'input' ? 300 : 0;
+    temporizadorBusquedaUsuarios = setTimeout(() => cargarUsuarios(), espera);
 }
 
 /**
@@ -162,6 +195,7 @@ function renderizarUsuarios(usuarios) {
     if (!usuarios || usuarios.length === 0) {
         tbody.innerHTML = '<tr><td colspan="6" class="px-4 py-4 text-center text-gray-400">No hay usuarios que coincidan con los filtros</td></tr>';
         document.getElementById('usuarios-contador').textContent = 'Mostrando 0 usuarios';
+        document.getElementById('btn-mas-usuarios')?.classList.add('hidden');
         return;
     }
     
@@ -206,6 +240,7 @@ function renderizarUsuarios(usuarios) {
     
     // Actualizar contador
     document.getElementById('usuarios-contador').textContent = `Mostrando ${usuarios.length} usuarios`;
+    document.getElementById('btn-mas-usuarios')?.classList.toggle('hidden', !cursorUsuarios);
 }
 
 /**
@@ -245,10 +280,11 @@ async function eliminarUsuarioPermanente(usuarioId, nombreUsuario) {
         if (!confirmacion2) return;
         
         mostrarCarga(true);
-        await eliminarUsuarioAPI(usuarioId);
+        // El usuario se da de baja al instante; sus datos se borran en segundo plano
+        const resultado = await eliminarUsuarioAPI(usuarioId);
         mostrarCarga(false);
         
-        mostrarNotificacion('Usuario eliminado correctamente', 'exito');
+        mostrarNotificacion(resultado.mensaje || 'Usuario eliminado correctamente', 'exito');
         await cargarUsuarios();
         await cargarEstadisticas();
         
@@ -271,20 +307,27 @@ let juegoEnEdicion = null;
 async function cargarJuegos() {
     try {
         const respuesta = await obtenerTodosJuegosAPI();
-        todosLosJuegos = respuesta.juegos; // Guardar en variable global
-        paginaActualJuegos = 1;
-        
-        // Aplicar filtros
-        aplicarFiltrosJuegos();
-        
-        // Configurar listeners de paginación y filtros
-        configurarEventosJuegos();
+        mostrarJuegos(respuesta.juegos);
         
     } catch (error) {
         mostrarNotificacion('Error al cargar juegos: ' + error.mensaje, 'error');
     }
 }
 
+/**
+ * Guarda y muestra la lista de juegos
+ */
+function mostrarJuegos(juegos) {
+    todosLosJuegos = juegos; // Guardar en variable global
+    paginaActualJuegos = 1;
+    
+    // Aplicar filtros
+    aplicarFiltrosJuegos();
+    
+    // Configurar listeners de paginación y filtros
+    configurarEventosJuegos();
+}
+
 /**
  * Aplica filtros a la lista de juegos
  */
@@ -528,19 +571,8 @@ function formatearEstado(estado) {
  */
 async function cargarTrabajos() {
     try {
-        const respuesta = await obtenerTodosTrabajoAPI();
-        
-        // Guardar en variable global para filtros
-        todosLosTrabajos = respuesta.registros || [];
-        
-        // Si no hay trabajos
-        if (!todosLosTrabajos || todosLosTrabajos.length === 0) {
-            document.getElementById('trabajos-lista').innerHTML = '<p class="text-gray-400 text-center py-4">No hay trabajos registrados</p>';
-            return;
-        }
-        
-        // Renderizar todos los trabajos
-        renderizarTrabajos(todosLosTrabajos);
+        const respuesta = await obtenerTodosTrabajoAPI('cliente');
+        mostrarTrabajos(respuesta.registros);
         
     } catch (error) {
         console.error('Error al cargar trabajos:', error);
@@ -548,6 +580,24 @@ async function cargarTrabajos() {
     }
 }
 
+/**
+ * Guarda y muestra la lista de trabajos
+ */
+function mostrarTrabajos(registros) {
+    // Guardar en variable global para filtros
+    todosLosTrabajos = registros || [];
+    registrarClientesTrabajos(todosLosTrabajos);
+    
+    // Si no hay trabajos
+    if (todosLosTrabajos.length === 0) {
+        document.getElementById('trabajos-lista').innerHTML = '<p class="text-gray-400 text-center py-4">No hay trabajos registrados</p>';
+        return;
+    }
+    
+    // Renderizar todos los trabajos
+    renderizarTrabajos(todosLosTrabajos);
+}
+
 /**
  * Abre modal para crear usuario
  */
@@ -773,7 +823,9 @@ function configurarEventosAdmin() {
     const buscarUsuario = document.getElementById('buscar-usuario');
     const filtroOrden = document.getElementById('filtro-orden-nombre');
     const filtroEstado = document.getElementById('filtro-estado-usuario');
+    const filtroRol = document.getElementById('filtro-rol-usuario');
     const btnLimpiar = document.getElementById('btn-limpiar-filtros');
+    const btnMasUsuarios = document.getElementById('btn-mas-usuarios');
     
     if (buscarUsuario) {
         buscarUsuario.addEventListener('input', aplicarFiltrosUsuarios);
@@ -784,14 +836,21 @@ function configurarEventosAdmin() {
     if (filtroEstado) {
         filtroEstado.addEventListener('change', aplicarFiltrosUsuarios);
     }
+    if (filtroRol) {
+        filtroRol.addEventListener('change', aplicarFiltrosUsuarios);
+    }
     if (btnLimpiar) {
         btnLimpiar.addEventListener('click', () => {
             if (buscarUsuario) buscarUsuario.value = '';
             if (filtroOrden) filtroOrden.value = '';
             if (filtroEstado) filtroEstado.value = '';
+            if (filtroRol) filtroRol.value = '';
             aplicarFiltrosUsuarios();
         });
     }
+    if (btnMasUsuarios) {
+        btnMasUsuarios.addEventListener('click', () => cargarUsuarios(true));
+    }
     
     // Formulario de usuario
     document.getElementById('form-usuario').addEventListener('submit', async (e) => {
@@ -938,7 +997,7 @@ function aplicarFiltros() {
         
         // Filtrar por cliente (nombre o email)
         if (buscarCliente) {
-            const cliente = todosLosUsuarios.find(u => u.id === trabajo.cliente_id);
+            const cliente = directorioUsuarios.get(trabajo.cliente_id);
             if (!cliente) return false;
             
             const nombreMatch = cliente.nombre_completo.toLowerCase().includes(buscarCliente);
@@ -978,7 +1037,7 @@ function renderizarTrabajos(trabajos) {
         const tarjeta = document.createElement('div');
         
         // Obtener nombre del cliente
-        const cliente = todosLosUsuarios.find(u => u.id === trabajo.cliente_id);
+        const cliente = directorioUsuarios.get(trabajo.cliente_id);
         const nombreCliente = cliente ? cliente.nombre_completo : 'Cliente desconocido';
         const emailCliente = cliente ? cliente.email : 'N/A';
         
@@ -1065,7 +1124,7 @@ async function abrirModalGestionarTrabajo(trabajoId) {
         }
         
         // Encontrar cliente
-        const cliente = todosLosUsuarios.find(u => u.id === trabajo.cliente_id);
+        const cliente = directorioUsuarios.get(trabajo.cliente_id);
         const nombreCliente = cliente ? cliente.nombre_completo : 'Cliente desconocido';
         
         // Actualizar modal con datos del trabajo
@@ -1082,9 +1141,10 @@ async function abrirModalGestionarTrabajo(trabajoId) {
         document.getElementById('trabajo-pagado').textContent = formatearDinero(montoPagado);
         document.getElementById('trabajo-pendiente').textContent = formatearDinero(Math.max(0, saldoPendiente));
         
-        // Llenar historial de pagos
+        // Llenar historial de pagos (el listado no lo incluye, se pide el detalle)
         const historialDiv = document.getElementById('pagos-historial');
-        const pagos = trabajo.pagos || [];
+        const detalle = await obtenerTrabajoAPI(trabajoId);
+        const pagos = detalle.pagos || [];
         
         if (pagos.length === 0) {
             historialDiv.innerHTML = '<p class="text-gray-400 p-2">Sin pagos registrados aún</p>';
@@ -76,8 +76,14 @@ async function validarTokenAPI(token) {
 
 // ===== USUARIOS =====
 
-async function obtenerTodosUsuariosAPI() {
-    return await llamarAPI('/usuarios');
+async function obtenerTodosUsuariosAPI(filtros = {}) {
+    // filtros: rol, estado, q, orden, limite, despues (se omiten los vacíos)
+    const parametros = new URLSearchParams();
+    Object.entries(filtros).forEach(([clave, valor]) => {
+        if (valor) parametros.append(clave, valor);
+    });
+    const consulta = parametros.toString();
+    return await llamarAPI(consulta ? `/usuarios?${consulta}` : '/usuarios');
 }
 
 async function obtenerUsuarioAPI(usuarioId) {
@@ -157,16 +163,18 @@ async function obtenerEstadisticasJuegosAPI() {
 
 // ===== TRABAJOS =====
 
-async function obtenerTodosTrabajoAPI() {
-    return await llamarAPI('/trabajos');
+async function obtenerTodosTrabajoAPI(expandir = null) {
+    const parametros = expandir ? `?expandir=${expandir}` : '';
+    return await llamarAPI(`/trabajos${parametros}`);
 }
 
 async function obtenerTrabajoAPI(registroId) {
     return await llamarAPI(`/trabajos/${registroId}`);
 }
 
-async function obtenerTrabajoPorClienteAPI(clienteId) {
-    return await llamarAPI(`/trabajos/cliente/${clienteId}`);
+async function obtenerTrabajoPorClienteAPI(clienteId, incluirHistorial = false) {
+    const historial = incluirHistorial ? '?historial=true' : '';
+    return await llamarAPI(`/trabajos/cliente/${clienteId}${historial}`);
 }
 
 async function obtenerTrabajoPorEmpleadoAPI(empleadoId) {
@@ -181,6 +189,14 @@ async function obtenerTrabajosPendientesAPI(empleadoId = null) {
     return await llamarAPI(endpoint);
 }
 
+async function reclamarTrabajoAPI(consolas = null) {
+    return await llamarAPI('/trabajos/reclamar', 'POST', consolas ? { consolas } : {});
+}
+
+async function renovarReclamoTrabajoAPI(registroId) {
+    return await llamarAPI(`/trabajos/${registroId}/renovar-reclamo`, 'POST', {});
+}
+
 async function crearTrabajoAPI(datosTrabajo) {
     return await llamarAPI('/trabajos', 'POST', datosTrabajo);
 }
@@ -209,6 +225,39 @@ async function obtenerEstadisticasTrabajoAPI() {
     return await llamarAPI('/trabajos/estadisticas');
 }
 
+// ===== PANELES =====
+
+async function obtenerPanelEmpleadoAPI() {
+    return await llamarAPI('/empleado/panel');
+}
+
+async function obtenerPanelAdminAPI() {
+    return await llamarAPI('/admin/panel');
+}
+
+// ===== LOTES =====
+
+/**
+ * Envía varias peticiones en una sola llamada a /api/lote
+ * @param {Array} peticiones - [{metodo, ruta, cuerpo}] con rutas relativas a /api (ej. '/juegos')
+ * @returns {Promise<Array>} Respuestas en el mismo orden; lanza el primer error
+ */
+async function loteAPI(peticiones) {
+    const resultado = await llamarAPI('/lote', 'POST', {
+        peticiones: peticiones.map(p => ({ ...p, ruta: `/api${p.ruta}` }))
+    });
+    
+    return resultado.respuestas.map(respuesta => {
+        if (respuesta.estado >= 400) {
+            throw {
+                codigo: respuesta.estado,
+                mensaje: respuesta.cuerpo.error || respuesta.cuerpo.mensaje || 'Error desconocido'
+            };
+        }
+        return respuesta.cuerpo;
+    });
+}
+
 // ===== UTILIDADES API =====
 
 async function verificarSaludAPI() {
@@ -6,6 +6,7 @@ let juegosCargados = [];
 let juegosSeleccionados = [];
 let espacioTotalGB = 0;
 let trabajoEnEdicion = null; // Rastrear qué solicitud se está editando
+let versionEnEdicion = null; // Versión de la solicitud al entrar en edición
 
 // Variables para paginación y búsqueda
 let paginaActual = 1;
@@ -597,7 +598,8 @@ function generarBotonesEdicion(registroId, esEnEdicion, trabajoEnEdicionGlobal)
 async function cargarHistorial() {
     try {
         const usuario = obtenerUsuario();
-        const respuesta = await obtenerTrabajoPorClienteAPI(usuario.id);
+        // El historial del cliente incluye sus trabajos archivados
+        const respuesta = await obtenerTrabajoPorClienteAPI(usuario.id, true);
         
         const contenedor = document.getElementById('historial-container');
         contenedor.innerHTML = '';
@@ -752,6 +754,7 @@ async function editarTrabajo(trabajoId) {
         
         // Entrar en modo edición PRIMERO
         trabajoEnEdicion = trabajoId;
+        versionEnEdicion = trabajo.version ?? 0;
         
         // Fijar el espacio
         espacioTotalGB = trabajo.total_gb;
@@ -818,6 +821,7 @@ function cancelarEdicion() {
     
     if (confirm('¿Deseas cancelar la edición? Se perderán todos los cambios.')) {
         trabajoEnEdicion = null;
+        versionEnEdicion = null;
         juegosSeleccionados = [];
         espacioTotalGB = 0;
         
@@ -881,7 +885,8 @@ async function guardarEdicion(trabajoId) {
             consola: consola,
             juegos_instalados: juegosSeleccionados.map(j => j.id || j._id),
             total_gb: parseFloat(espacioTotalGB),
-            descripcion: `${juegosSeleccionados.length} juego(s): ${juegosLista} | ${gbUsado.toFixed(1)}GB`
+            descripcion: `${juegosSeleccionados.length} juego(s): ${juegosLista} | ${gbUsado.toFixed(1)}GB`,
+            version: versionEnEdicion
         };
         
         console.log('Guardando solicitud editada:', datosSolicitud);
@@ -899,6 +904,12 @@ async function guardarEdicion(trabajoId) {
         if (!responseUpdate.ok) {
             const error = await responseUpdate.json();
             console.error('Error al actualizar:', error);
+            if (responseUpdate.status === 409) {
+                // Otra persona modificó la solicitud mientras se editaba
+                mostrarNotificacion('La solicitud cambió mientras la editabas. Cancela la edición y vuelve a abrirla.', 'error');
+                mostrarCarga(false);
+                return;
+            }
             mostrarNotificacion('Error al actualizar: ' + (error.error || 'desconocido'), 'error');
             mostrarCarga(false);
             return;
@@ -909,6 +920,7 @@ async function guardarEdicion(trabajoId) {
         
         // Salir del modo edición
         trabajoEnEdicion = null;
+        versionEnEdicion = null;
         juegosSeleccionados = [];
         espacioTotalGB = 0;
         
@@ -2,6 +2,12 @@
  * empleado_dashboard.js - Lógica del panel del empleado
  */
 
+// Trabajos reclamados por este empleado: vuelven a la cola si el reclamo no se renueva
+let reclamosActivos = [];
+let temporizadorReclamos = null;
+// Hasta conocer la duración del reclamo se renueva cada 5 minutos (el servidor usa 30 por defecto)
+let intervaloRenovacionMs = 5 * 60 * 1000;
+
 document.addEventListener('DOMContentLoaded', async () => {
     // Verificar autenticación
     if (!verificarAutenticacion()) return;
@@ -10,134 +16,125 @@ document.addEventListener('DOMContentLoaded', async () => {
     // Configurar logout y tabs
     configurarLogout();
     
-    // Cargar datos iniciales
-    await cargarClientes();
-    await cargarTrabajosPendientes();
-    await cargarHistorialTrabajos();
+    // Cargar datos iniciales (una sola petición)
+    await cargarPanel();
     
     // Configurar eventos
     configurarEventosEmpleado();
+    
+    // Renovar al abrir el panel: el reclamo pudo quedar a punto de vencer
+    await renovarReclamos();
 });
 
 /**
- * Carga la lista de clientes del empleado
+ * Carga clientes, trabajos pendientes e historial en una sola petición
  */
-async function cargarClientes() {
+async function cargarPanel() {
     try {
-        const respuesta = await obtenerTodosUsuariosAPI();
-        const clientes = respuesta.usuarios.filter(u => {
-            // Simulamos que todos los clientes están asignados al empleado
-            return true;
-        });
-        
-        const tbody = document.getElementById('clientes-list');
-        tbody.innerHTML = '';
-        
-        clientes.forEach(cliente => {
-            const fila = document.createElement('tr');
-            fila.className = 'hover:bg-gray-700 transition';
-            fila.innerHTML = `
-                <td class="px-4 py-2">${cliente.nombre_completo}</td>
-                <td class="px-4 py-2">${cliente.telefono || 'N/A'}</td>
-                <td class="px-4 py-2">Calle Principal #123</td>
-                <td class="px-4 py-2">
-                    <button class="px-3 py-1 bg-purple-600 rounded text-sm hover:bg-purple-700 transition" 
-                            onclick="abrirModalTrabajo('${cliente.id}', '${cliente.nombre_completo}')">
-                        Registrar Trabajo
-                    </button>
-                </td>
-            `;
-            tbody.appendChild(fila);
-        });
-        
+        const panel = await obtenerPanelEmpleadoAPI();
+        mostrarClientes(panel.clientes);
+        mostrarTrabajosPendientes(panel.pendientes, panel.en_progreso);
+        mostrarHistorialTrabajos(panel.historial);
+        reclamosActivos = panel.en_progreso.filter(t => t.reclamo_expira).map(t => t.id);
     } catch (error) {
-        mostrarNotificacion('Error al cargar clientes: ' + error.mensaje, 'error');
+        mostrarNotificacion('Error al cargar el panel: ' + error.mensaje, 'error');
     }
 }
 
 /**
- * Carga los trabajos pendientes
+ * Muestra la lista de clientes
  */
-async function cargarTrabajosPendientes() {
-    try {
-        const usuario = obtenerUsuario();
-        const respuesta = await obtenerTrabajosPendientesAPI(usuario.id);
-        
-        const contenedor = document.getElementById('trabajos-pendientes');
-        contenedor.innerHTML = '';
-        
-        if (respuesta.registros.length === 0) {
-            contenedor.innerHTML = '<p class="text-gray-400 text-center py-4">No hay trabajos pendientes</p>';
-            return;
-        }
-        
-        respuesta.registros.forEach(trabajo => {
-            const tarjeta = document.createElement('div');
-            tarjeta.className = 'bg-gray-700 rounded-lg p-4 border-l-4 border-yellow-500';
-            tarjeta.innerHTML = `
-                <div class="flex justify-between items-start mb-2">
-                    <div>
-                        <p class="font-bold text-yellow-300">TRABAJO PENDIENTE</p>
-                        <p class="text-sm text-gray-400">${formatearFecha(trabajo.fecha_creacion)}</p>
-                    </div>
-                    <button class="px-3 py-1 bg-green-600 rounded text-sm hover:bg-green-700 transition"
-                            onclick="cambiarEstadoTrabajo('${trabajo.id}', 'completado')">
-                        Marcar Completado
-                    </button>
-                </div>
-                <p class="text-sm text-gray-300 mb-2">${trabajo.descripcion}</p>
-                <p class="text-sm text-gray-400">• ${trabajo.juegos_instalados.length} juego(s) instalados</p>
-            `;
-            contenedor.appendChild(tarjeta);
-        });
-        
-    } catch (error) {
-        console.error('Error al cargar trabajos pendientes:', error);
-    }
+function mostrarClientes(clientes) {
+    const tbody = document.getElementById('clientes-list');
+    tbody.innerHTML = '';
+    
+    clientes.forEach(cliente => {
+        const fila = document.createElement('tr');
+        fila.className = 'hover:bg-gray-700 transition';
+        fila.innerHTML = `
+            <td class="px-4 py-2">${cliente.nombre_completo}</td>
+            <td class="px-4 py-2">${cliente.telefono || 'N/A'}</td>
+            <td class="px-4 py-2">${cliente.direccion || 'N/A'}</td>
+            <td class="px-4 py-2">
+                <button class="px-3 py-1 bg-purple-600 rounded text-sm hover:bg-purple-700 transition" 
+                        onclick="abrirModalTrabajo('${cliente.id}', '${cliente.nombre_completo}')">
+                    Registrar Trabajo
+                </button>
+            </td>
+        `;
+        tbody.appendChild(fila);
+    });
 }
 
 /**
- * Carga el historial de trabajos
+ * Muestra los trabajos en progreso y la cola de pendientes
  */
-async function cargarHistorialTrabajos() {
-    try {
-        const usuario = obtenerUsuario();
-        const respuesta = await obtenerTrabajoPorEmpleadoAPI(usuario.id);
-        
-        const contenedor = document.getElementById('historial-trabajos');
-        contenedor.innerHTML = '';
-        
-        if (respuesta.registros.length === 0) {
-            contenedor.innerHTML = '<p class="text-gray-400 text-center py-4">No hay trabajos registrados</p>';
-            return;
-        }
-        
-        respuesta.registros.forEach(trabajo => {
-            const tarjeta = document.createElement('div');
-            const colorEstado = trabajo.estado === 'completado' ? 'green' : trabajo.estado === 'en_progreso' ? 'blue' : 'gray';
-            tarjeta.className = `bg-gray-700 rounded-lg p-4 border-l-4 border-${colorEstado}-500`;
-            tarjeta.innerHTML = `
-                <div class="flex justify-between items-start mb-2">
-                    <div>
-                        <p class="font-bold">${trabajo.tipo_servicio.toUpperCase()}</p>
-                        <p class="text-sm text-gray-400">${formatearFecha(trabajo.fecha_creacion)}</p>
-                    </div>
-                    <span class="px-3 py-1 rounded text-xs font-bold bg-${colorEstado}-900 text-${colorEstado}-300">
-                        ${trabajo.estado.toUpperCase()}
-                    </span>
-                </div>
-                <p class="text-sm text-gray-300 mb-2">${trabajo.descripcion}</p>
-                <div class="flex justify-between text-sm text-gray-400 mt-2">
-                    <span>${trabajo.juegos_instalados.length} juego(s)</span>
-                    <span>${formatearDinero(trabajo.costo)}</span>
+function mostrarTrabajosPendientes(pendientes, enProgreso) {
+    const contenedor = document.getElementById('trabajos-pendientes');
+    contenedor.innerHTML = '';
+    
+    const trabajos = [...enProgreso, ...pendientes];
+    if (trabajos.length === 0) {
+        contenedor.innerHTML = '<p class="text-gray-400 text-center py-4">No hay trabajos pendientes</p>';
+        return;
+    }
+    
+    trabajos.forEach(trabajo => {
+        const enCurso = trabajo.estado === 'en_progreso';
+        const tarjeta = document.createElement('div');
+        tarjeta.className = `bg-gray-700 rounded-lg p-4 border-l-4 ${enCurso ? 'border-blue-500' : 'border-yellow-500'}`;
+        tarjeta.innerHTML = `
+            <div class="flex justify-between items-start mb-2">
+                <div>
+                    <p class="font-bold ${enCurso ? 'text-blue-300' : 'text-yellow-300'}">${enCurso ? 'TRABAJO EN PROGRESO' : 'TRABAJO PENDIENTE'}</p>
+                    <p class="text-sm text-gray-400">${trabajo.cliente} · ${formatearFecha(trabajo.fecha_creacion)}</p>
                 </div>
-            `;
-            contenedor.appendChild(tarjeta);
-        });
-        
-    } catch (error) {
-        console.error('Error al cargar historial:', error);
+                <button class="px-3 py-1 bg-green-600 rounded text-sm hover:bg-green-700 transition"
+                        onclick="cambiarEstadoTrabajo('${trabajo.id}', 'completado')">
+                    Marcar Completado
+                </button>
+            </div>
+            <p class="text-sm text-gray-300 mb-2">${trabajo.descripcion}</p>
+            <p class="text-sm text-gray-400">• ${trabajo.juegos_instalados.length} juego(s) instalados</p>
+        `;
+        contenedor.appendChild(tarjeta);
+    });
+}
+
+/**
+ * Muestra el historial reciente de trabajos
+ */
+function mostrarHistorialTrabajos(historial) {
+    const contenedor = document.getElementById('historial-trabajos');
+    contenedor.innerHTML = '';
+    
+    if (historial.length === 0) {
+        contenedor.innerHTML = '<p class="text-gray-400 text-center py-4">No hay trabajos registrados</p>';
+        return;
     }
+    
+    historial.forEach(trabajo => {
+        const tarjeta = document.createElement('div');
+        const colorEstado = trabajo.estado === 'completado' ? 'green' : trabajo.estado === 'en_progreso' ? 'blue' : 'gray';
+        tarjeta.className = `bg-gray-700 rounded-lg p-4 border-l-4 border-${colorEstado}-500`;
+        tarjeta.innerHTML = `
+            <div class="flex justify-between items-start mb-2">
+                <div>
+                    <p class="font-bold">${trabajo.tipo_servicio.toUpperCase()}</p>
+                    <p class="text-sm text-gray-400">${formatearFecha(trabajo.fecha_creacion)}</p>
+                </div>
+                <span class="px-3 py-1 rounded text-xs font-bold bg-${colorEstado}-900 text-${colorEstado}-300">
+                    ${trabajo.estado.toUpperCase()}
+                </span>
+            </div>
+            <p class="text-sm text-gray-300 mb-2">${trabajo.descripcion}</p>
+            <div class="flex justify-between text-sm text-gray-400 mt-2">
+                <span>${trabajo.juegos_instalados.length} juego(s)</span>
+                <span>${formatearDinero(trabajo.costo)}</span>
+            </div>
+        `;
+        contenedor.appendChild(tarjeta);
+    });
 }
 
 /**
@@ -187,14 +184,66 @@ async function cambiarEstadoTrabajo(trabajoId, nuevoEstado) {
         mostrarNotificacion('Estado del trabajo actualizado', 'exito');
         
         // Recargar datos
-        await cargarTrabajosPendientes();
-        await cargarHistorialTrabajos();
+        await cargarPanel();
         
     } catch (error) {
         mostrarNotificacion('Error: ' + error.mensaje, 'error');
     }
 }
 
+/**
+ * Reclama el siguiente trabajo de la cola según las consolas del empleado
+ */
+async function reclamarSiguienteTrabajo() {
+    try {
+        const trabajo = await reclamarTrabajoAPI();
+        mostrarNotificacion(`Trabajo asignado: ${trabajo.descripcion || trabajo.tipo_servicio}`, 'exito');
+        await cargarPanel();
+        programarRenovacionReclamos();
+    } catch (error) {
+        const tipo = error.codigo === 404 ? 'advertencia' : 'error';
+        mostrarNotificacion(error.mensaje, tipo);
+    }
+}
+
+/**
+ * Renueva los reclamos de los trabajos en curso y programa la siguiente renovación
+ */
+async function renovarReclamos() {
+    let perdidos = 0;
+    
+    for (const trabajoId of reclamosActivos) {
+        try {
+            const respuesta = await renovarReclamoTrabajoAPI(trabajoId);
+            // Se renueva a un tercio de la duración, con margen para un fallo de red
+            intervaloRenovacionMs = respuesta.duracion_minutos * 60 * 1000 / 3;
+        } catch (error) {
+            if (error.codigo === 409) perdidos++;
+        }
+    }
+    
+    if (perdidos > 0) {
+        mostrarNotificacion(`${perdidos} trabajo(s) volvieron a la cola: el reclamo venció`, 'advertencia');
+        await cargarPanel();
+    }
+    
+    programarRenovacionReclamos();
+}
+
+/**
+ * Programa la próxima renovación si hay trabajos reclamados
+ */
+function programarRenovacionReclamos() {
+    if (temporizadorReclamos) {
+        clearTimeout(temporizadorReclamos);
+        temporizadorReclamos = null;
+    }
+    
+    if (reclamosActivos.length > 0) {
+        temporizadorReclamos = setTimeout(renovarReclamos, intervaloRenovacionMs);
+    }
+}
+
 /**
  * Configura los eventos del empleado
  */
@@ -202,6 +251,9 @@ function configurarEventosEmpleado() {
     // Cerrar modal
     document.getElementById('cerrar-modal').addEventListener('click', cerrarModalTrabajo);
     
+    // Tomar el siguiente trabajo de la cola
+    document.getElementById('reclamar-btn').addEventListener('click', reclamarSiguienteTrabajo);
+    
     // Enviar formulario de trabajo
     document.getElementById('form-trabajo').addEventListener('submit', async (e) => {
         e.preventDefault();
@@ -237,8 +289,7 @@ function configurarEventosEmpleado() {
             cerrarModalTrabajo();
             
             // Recargar datos
-            await cargarTrabajosPendientes();
-            await cargarHistorialTrabajos();
+            await cargarPanel();
             
         } catch (error) {
             mostrarCarga(false);